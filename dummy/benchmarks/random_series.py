@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Benchmark for the random series generation of the dummy component.
+
+   Compares the step by step generation in get_all_random_series to the NumPy based generation in
+   get_all_random_series_batch for result messages with different numbers of time series points per epoch.
+   The attributes are the ones in RANDOM_ATTRIBUTES with the number of time parts set to the benchmarked value.
+
+   Usage: python3 -m dummy.benchmarks.random_series --time-parts 6 100 1000 10000 --epochs 100 --output results.json
+"""
+
+import argparse
+import json
+import platform
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy
+
+from dummy import random_series
+from dummy.random_series import (
+    ATTRIBUTE_TYPE_TIMESERIES, RANDOM_ATTRIBUTES, RandomAttributes, get_all_random_series, get_all_random_series_batch,
+    get_random_initial_values)
+
+DEFAULT_TIME_PARTS = [6, 100, 1000, 10000]
+DEFAULT_EPOCHS = 100
+EPOCH_START_TIME = "2021-01-01T00:00:00.000Z"
+EPOCH_END_TIME = "2021-01-01T01:00:00.000Z"
+
+
+def get_random_attributes(time_parts: int) -> RandomAttributes:
+    """Returns the random attributes from RANDOM_ATTRIBUTES with the given number of time parts."""
+    return RandomAttributes({
+        attribute_name: (
+            dict(attribute_definition, time_parts=time_parts)
+            if attribute_definition["type"] == ATTRIBUTE_TYPE_TIMESERIES else attribute_definition)
+        for attribute_name, attribute_definition in RANDOM_ATTRIBUTES.items()
+    })
+
+
+def run_generator(generator_function: Callable[..., Dict[str, Any]], random_attributes: RandomAttributes,
+                  epochs: int) -> float:
+    """Generates the random values for the given number of epochs and returns the used time in seconds."""
+    start_values = get_random_initial_values(random_attributes)
+    start_time = time.perf_counter()
+    for _ in range(epochs):
+        generator_function(start_values, EPOCH_START_TIME, EPOCH_END_TIME, random_attributes=random_attributes)
+    return time.perf_counter() - start_time
+
+
+def run_benchmarks(time_parts_list: List[int], epochs: int) -> List[Dict[str, Any]]:
+    """Runs the benchmarks for the given numbers of time parts and returns the results."""
+    random_series.RANDOM_GENERATOR = numpy.random.default_rng(0)
+
+    results = []
+    for time_parts in time_parts_list:
+        random_attributes = get_random_attributes(time_parts)
+        for mode, generator_function in [("python", get_all_random_series), ("numpy", get_all_random_series_batch)]:
+            used_time = run_generator(generator_function, random_attributes, epochs)
+            results.append({
+                "mode": mode,
+                "time_parts": time_parts,
+                "epochs": epochs,
+                "seconds": used_time,
+                "milliseconds_per_epoch": 1000 * used_time / epochs,
+                "points_per_second": epochs * random_attributes.points_per_epoch / used_time
+            })
+    return results
+
+
+def main(arguments: Optional[List[str]] = None):
+    """Runs the benchmarks and writes the results in JSON format."""
+    parser = argparse.ArgumentParser(description="Dummy component random series benchmark")
+    parser.add_argument("--time-parts", type=int, nargs="+", default=DEFAULT_TIME_PARTS,
+                        help="the numbers of time series points per epoch")
+    parser.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS, help="the number of generated epochs")
+    parser.add_argument("--output", default="", help="the output file, standard output is used by default")
+    options = parser.parse_args(arguments)
+
+    results = {
+        "benchmark": "dummy_random_series",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": numpy.__version__,
+        "results": run_benchmarks(options.time_parts, options.epochs)
+    }
+
+    if options.output:
+        with open(options.output, mode="w", encoding="UTF-8") as output_file:
+            json.dump(results, output_file, indent=4)
+    else:
+        print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
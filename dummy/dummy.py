@@ -7,15 +7,18 @@
 """This module contains a dummy simulation component that has very simple internal logic."""
 
 import asyncio
-import random
-from typing import cast, Union
+import time
+from typing import Any, Dict, Optional, Tuple, Union, cast
 
 from tools.components import AbstractSimulationComponent
 from tools.exceptions.messages import MessageError
 from tools.messages import EpochMessage, ResultMessage, StatusMessage
 from tools.tools import FullLogger, load_environmental_variables
 
-from dummy.random_series import get_all_random_series, get_latest_values, get_random_initial_values
+from dummy.latency import LATENCY_MODEL_UNIFORM, ComponentRandom, UniformLatency, create_latency_model
+from dummy.profiles import load_payload_profile
+from dummy.random_series import get_all_random_series_batch, get_latest_values, get_random_initial_values
+from dummy.workload import EXECUTOR_PROCESS, CpuWorkload, create_workload, shutdown_executors
 
 LOGGER = FullLogger(__name__)
 
@@ -24,6 +27,10 @@ TIMEOUT_INTERVAL = 2.5
 
 # The names of the extra environmental variables used by the dummy component.
 SIMULATION_RESULT_MESSAGE_TOPIC = "SIMULATION_RESULT_MESSAGE_TOPIC"
+SIMULATION_LISTENING_MESSAGE_TOPIC = "SIMULATION_LISTENING_MESSAGE_TOPIC"
+LISTENING_MESSAGE_INTERVAL = "LISTENING_MESSAGE_INTERVAL"
+SIMULATION_EPOCH_MESSAGE_TOPIC = "SIMULATION_EPOCH_MESSAGE_TOPIC"
+TARGETED_EPOCH_MESSAGES = "TARGETED_EPOCH_MESSAGES"
 
 MIN_SLEEP_TIME = "MIN_SLEEP_TIME"
 MAX_SLEEP_TIME = "MAX_SLEEP_TIME"
@@ -33,6 +40,16 @@ SEND_MISS_CHANCE = "SEND_MISS_CHANCE"
 RECEIVE_MISS_CHANCE = "RECEIVE_MISS_CHANCE"
 WARNING_CHANCE = "WARNING_CHANCE"
 
+RESULT_PAYLOAD_PROFILE = "RESULT_PAYLOAD_PROFILE"
+RESULT_PAYLOAD_PROFILE_FILE = "RESULT_PAYLOAD_PROFILE_FILE"
+
+RANDOM_SEED = "RANDOM_SEED"
+LATENCY_MODEL = "LATENCY_MODEL"
+
+WORKLOAD = "WORKLOAD"
+WORKLOAD_EXECUTOR = "WORKLOAD_EXECUTOR"
+WORKLOAD_WORKERS = "WORKLOAD_WORKERS"
+
 
 class DummyComponent(AbstractSimulationComponent):
     """Class for holding the state of a dummy simulation component."""
@@ -48,15 +65,36 @@ class DummyComponent(AbstractSimulationComponent):
         # Load the dummy component specific environmental variables.
         env_variables = load_environmental_variables(
             (SIMULATION_RESULT_MESSAGE_TOPIC, str, "Result"),
+            (SIMULATION_LISTENING_MESSAGE_TOPIC, str, "Status.Listening"),
+            (LISTENING_MESSAGE_INTERVAL, float, 1.0),
+            (SIMULATION_EPOCH_MESSAGE_TOPIC, str, "Epoch"),
+            (TARGETED_EPOCH_MESSAGES, bool, True),
             (MIN_SLEEP_TIME, float, 2),
             (MAX_SLEEP_TIME, float, 15),
             (ERROR_CHANCE, float, 0.0),
             (SEND_MISS_CHANCE, float, 0.0),
             (RECEIVE_MISS_CHANCE, float, 0.0),
-            (WARNING_CHANCE, float, 0.0)
+            (WARNING_CHANCE, float, 0.0),
+            (RESULT_PAYLOAD_PROFILE, str, ""),
+            (RESULT_PAYLOAD_PROFILE_FILE, str, ""),
+            (RANDOM_SEED, str, ""),
+            (LATENCY_MODEL, str, LATENCY_MODEL_UNIFORM),
+            (WORKLOAD, str, ""),
+            (WORKLOAD_EXECUTOR, str, EXECUTOR_PROCESS),
+            (WORKLOAD_WORKERS, int, 1)
         )
 
         self._result_topic = cast(str, env_variables[SIMULATION_RESULT_MESSAGE_TOPIC])
+        self._listening_topic = cast(str, env_variables[SIMULATION_LISTENING_MESSAGE_TOPIC])
+        self._listening_interval = cast(float, env_variables[LISTENING_MESSAGE_INTERVAL])
+        # True, after the component has sent its first status message, i.e. the simulation has started.
+        self._simulation_started = False
+        # The topic for the epoch messages that the simulation manager resends only to this component.
+        if cast(bool, env_variables[TARGETED_EPOCH_MESSAGES]):
+            self._targeted_epoch_topic = ".".join([cast(str, env_variables[SIMULATION_EPOCH_MESSAGE_TOPIC]),
+                                                   self.component_name])
+        else:
+            self._targeted_epoch_topic = ""
 
         self._min_delay = cast(float, env_variables[MIN_SLEEP_TIME])
         self._max_delay = cast(float, env_variables[MAX_SLEEP_TIME])
@@ -65,47 +103,142 @@ class DummyComponent(AbstractSimulationComponent):
         self._receive_miss_chance = cast(float, env_variables[RECEIVE_MISS_CHANCE])
         self._warning_chance = cast(float, env_variables[WARNING_CHANCE])
 
+        # The attributes for the result messages are determined by the payload profile.
+        self._random_attributes = load_payload_profile(
+            cast(str, env_variables[RESULT_PAYLOAD_PROFILE]), cast(str, env_variables[RESULT_PAYLOAD_PROFILE_FILE]))
+
+        # The random number streams of the component are reproducible if a seed is given.
+        random_seed = cast(str, env_variables[RANDOM_SEED])
+        self._random = ComponentRandom(random_seed if random_seed else None, self.component_name)
+        # The latest epoch and attempt for each random chance. A resent message is a new attempt for the same epoch,
+        # so handling the resent messages does not change the random values for the other epochs.
+        self._chance_attempts: Dict[str, Tuple[int, int]] = {}
+        try:
+            self._latency_model = create_latency_model(
+                cast(str, env_variables[LATENCY_MODEL]), self._min_delay, self._max_delay, self.component_name)
+        except (OSError, ValueError) as error:
+            LOGGER.error("Could not create the latency model, using the uniform model: {}".format(error))
+            self._latency_model = UniformLatency(self._min_delay, self._max_delay)
+
+        # The optional CPU workload that is run for each epoch in addition to the latency.
+        self._workload: Optional[CpuWorkload] = None
+        workload_specification = cast(str, env_variables[WORKLOAD])
+        if workload_specification:
+            try:
+                self._workload = create_workload(
+                    workload_specification, cast(str, env_variables[WORKLOAD_EXECUTOR]),
+                    cast(int, env_variables[WORKLOAD_WORKERS]))
+            except ValueError as error:
+                LOGGER.error("Could not create the workload, no workload is used: {}".format(error))
+        # The compute time and the total processing time for the latest processed epoch.
+        self._compute_time: Optional[float] = None
+        self._processing_time: Optional[float] = None
+
         # Setup the first values of the randomly generated time series for the result messages.
-        self._last_result_values = get_random_initial_values()
+        self._last_result_values = get_random_initial_values(self._random_attributes, self._random.random_generator)
+
+    async def start(self) -> None:
+        """Starts the component. Also starts listening to the component specific epoch topic, if it is in use."""
+        await super().start()
+        if self._targeted_epoch_topic:
+            self._rabbitmq_client.add_listener(self._targeted_epoch_topic, self.targeted_epoch_message_handler)
 
     async def process_epoch(self) -> bool:
         """Starts a new epoch for the dummy component. Sends a status message when finished."""
         # At this point the simulation should be running and dummy ready to start the epoch.
 
         # Simulate an error possibility by using the random error chanche setting.
-        rand_error_chance = random.random()
+        rand_error_chance = self._get_chance_value(ERROR_CHANCE, self._latest_epoch)
         if rand_error_chance < self._error_chance:
             LOGGER.error("Encountered a random error.")
             await self.send_error_message("Random error")
             return False
 
         # No errors, do normal epoch handling.
-        rand_wait_time = random.uniform(self._min_delay, self._max_delay)
+        start_time = time.perf_counter()
+        self._compute_time = None
+        if self._workload is not None:
+            # The workload is run in an executor, so the component can handle other messages meanwhile.
+            workload_result = await self._workload.run(self._latest_epoch)
+            self._compute_time = workload_result.compute_time
+            LOGGER.info("Component {:s} used {:.3f} seconds of compute time for epoch {:d} ({:.3f} seconds "
+                        "including the wait for a free worker).".format(
+                            self.component_name, workload_result.compute_time, self._latest_epoch,
+                            workload_result.total_time))
+
+        rand_wait_time = self._latency_model.get_latency(
+            self._latest_epoch, self._random.get_epoch_random(self._latest_epoch))
         LOGGER.info("Component {:s} sending status message for epoch {:d} in {:.1f} seconds.".format(
             self.component_name, self._latest_epoch, rand_wait_time))
         await asyncio.sleep(rand_wait_time)
 
         await self._send_random_result_message()
+        self._processing_time = time.perf_counter() - start_time
         # The send_status_message call is in the start_epoch in AbstractSimulationComponent.
         return True
 
     async def epoch_message_handler(self, message_object: EpochMessage, message_routing_key: str) -> None:
         """Handles the received epoch messages."""
-        if random.random() < self._receive_miss_chance:
+        if self._get_chance_value(RECEIVE_MISS_CHANCE, message_object.epoch_number) < self._receive_miss_chance:
             # Simulate a connection error by not receiving an epoch message.
             LOGGER.warning("Received epoch message was ignored.")
             return
 
         await super().epoch_message_handler(message_object, message_routing_key)
 
+    async def targeted_epoch_message_handler(self, message_object: Any, message_routing_key: str) -> None:
+        """Handles the epoch messages that were sent only to this component."""
+        if isinstance(message_object, EpochMessage):
+            await self.epoch_message_handler(message_object, message_routing_key)
+        else:
+            LOGGER.warning("Received '{:s}' message when expecting for '{:s}' message".format(
+                str(type(message_object)), str(EpochMessage)))
+
     async def send_status_message(self) -> None:
         """Sends a new status message to the message bus."""
-        if self._latest_epoch > 0 and random.random() < self._send_miss_chance:
+        self._simulation_started = True
+        if (self._latest_epoch > 0 and
+                self._get_chance_value(SEND_MISS_CHANCE, self._latest_epoch) < self._send_miss_chance):
             # simulate connection error by not sending the status message for an epoch
             LOGGER.warning("No status message sent this time.")
         else:
             await super().send_status_message()
 
+    async def send_listening_message(self) -> None:
+        """Sends a message to the simulation manager telling that the component is listening to the message bus
+           and is ready for the simulation to start."""
+        # The listening message is not triggered by any other message, so it refers to itself.
+        message_id = next(self._message_id_generator)
+        listening_message = StatusMessage.from_json({
+            "Type": StatusMessage.CLASS_MESSAGE_TYPE,
+            "SimulationId": self.simulation_id,
+            "SourceProcessId": self.component_name,
+            "MessageId": message_id,
+            "EpochNumber": 0,
+            "TriggeringMessageIds": [message_id],
+            "Value": StatusMessage.STATUS_VALUES[0]
+        })
+        if listening_message is None:
+            LOGGER.error("Problem with creating a listening message")
+        else:
+            await self._rabbitmq_client.send_message(self._listening_topic, listening_message.bytes())
+
+    async def send_listening_messages(self) -> None:
+        """Sends the listening message every LISTENING_MESSAGE_INTERVAL seconds until the simulation has started,
+           so that the message reaches the simulation manager even if the manager starts listening later."""
+        while not self._simulation_started and not self.is_stopped:
+            await self.send_listening_message()
+            await asyncio.sleep(self._listening_interval)
+
+    def _get_chance_value(self, purpose: str, epoch_number: int) -> float:
+        """Returns the random value for the next attempt of the given purpose in the given epoch.
+           With a seed, the value depends only on the purpose, the epoch number and the number of earlier attempts
+           for the same purpose in the same epoch."""
+        attempt_epoch, attempt = self._chance_attempts.get(purpose, (epoch_number, -1))
+        attempt = attempt + 1 if attempt_epoch == epoch_number else 0
+        self._chance_attempts[purpose] = (epoch_number, attempt)
+        return self._random.get_chance_value(purpose, epoch_number, attempt)
+
     async def _send_random_result_message(self):
         """Sends a result message with random values and time series to the message bus."""
         random_result_message = self._get_result_message()
@@ -122,10 +255,18 @@ class DummyComponent(AbstractSimulationComponent):
             return None
 
         # Add a warning to the status message on a random chance
-        if random.random() < self._warning_chance:
+        if self._get_chance_value(WARNING_CHANCE, self._latest_epoch) < self._warning_chance:
             LOGGER.debug("Adding a warning to the status message.")
             status_message.warnings = ["warning.internal"]
 
+        # Report the timing of the workload in the status message description.
+        if self._workload is not None and self._compute_time is not None and self._processing_time is not None:
+            status_message.description = "ComputeTime={:.6f};ProcessingTime={:.6f}".format(
+                self._compute_time, self._processing_time)
+            LOGGER.info("Component {:s} sending status message for epoch {:d} after {:.3f} seconds of processing "
+                        "and {:.3f} seconds of compute time.".format(
+                            self.component_name, self._latest_epoch, self._processing_time, self._compute_time))
+
         return status_message
 
     def _get_result_message(self) -> Union[ResultMessage, None]:
@@ -148,9 +289,10 @@ class DummyComponent(AbstractSimulationComponent):
                 LOGGER.error("No epoch message found when trying to create result message")
                 return None
 
-            new_random_series_collection = get_all_random_series(
-                self._last_result_values, self._latest_epoch_message.start_time, self._latest_epoch_message.end_time)
-            self._last_result_values = get_latest_values(new_random_series_collection)
+            new_random_series_collection = get_all_random_series_batch(
+                self._last_result_values, self._latest_epoch_message.start_time, self._latest_epoch_message.end_time,
+                self._random.numpy_generator, self._random_attributes)
+            self._last_result_values = get_latest_values(new_random_series_collection, self._random_attributes)
             result_message.result_values = new_random_series_collection
         except MessageError:
             LOGGER.error("Error when creating values for result message")
@@ -162,12 +304,14 @@ class DummyComponent(AbstractSimulationComponent):
 async def start_dummy_component():
     """Start a dummy component for the simulation platform."""
     dummy_component = DummyComponent()
-    await asyncio.sleep(TIMEOUT_INTERVAL)
     await dummy_component.start()
+    listening_task = asyncio.create_task(dummy_component.send_listening_messages())
 
     # Wait in an endless loop until the DummyComponent is stopped or sys.exit() is called.
     while not dummy_component.is_stopped:
         await asyncio.sleep(TIMEOUT_INTERVAL)
+    listening_task.cancel()
+    shutdown_executors()
 
 
 if __name__ == "__main__":
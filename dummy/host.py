@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains a host process that runs several dummy components in the same event loop.
+
+   The hosted components share a small pool of message bus clients instead of each component opening its own
+   connections. The first client in the pool listens to the topics of all the hosted components and the received
+   messages are routed to the components through an in-process loopback bus using the RabbitMQ topic rules.
+   Each component handles its messages from its own queue, so a slow component does not delay the others.
+   The messages sent by the components are divided between the clients in the pool, each component always
+   using the same client.
+
+   Usage: DUMMY_HOST_COMPONENTS=500 DUMMY_HOST_NAME_PATTERN=dummy_{:d} python3 -u -m dummy.host
+"""
+
+import asyncio
+from typing import Any, List, Optional, Set, Union, cast
+
+from tools.clients import RabbitmqClient
+from tools.messages import AbstractMessage
+from tools.tools import FullLogger, load_environmental_variables
+
+from dummy.dummy import TIMEOUT_INTERVAL, DummyComponent
+from dummy.workload import shutdown_executors
+from loopback.bus import LoopbackBus, LoopbackClient, MessageCallback
+from loopback.simulation import component_rabbitmq_clients
+
+LOGGER = FullLogger(__name__)
+
+# The names of the environmental variables used by the host.
+__DUMMY_HOST_COMPONENTS = "DUMMY_HOST_COMPONENTS"
+__DUMMY_HOST_NAME_PATTERN = "DUMMY_HOST_NAME_PATTERN"
+__DUMMY_HOST_FIRST_INDEX = "DUMMY_HOST_FIRST_INDEX"
+__DUMMY_HOST_CONNECTIONS = "DUMMY_HOST_CONNECTIONS"
+
+DEFAULT_NAME_PATTERN = "dummy_{:d}"
+
+
+def get_component_names(component_count: int, name_pattern: str = DEFAULT_NAME_PATTERN,
+                        first_index: int = 1) -> List[str]:
+    """Returns the component names created by formatting the name pattern with the component indexes.
+       Raises ValueError if the pattern does not produce a unique name for each component."""
+    try:
+        component_names = [
+            name_pattern.format(index)
+            for index in range(first_index, first_index + component_count)
+        ]
+    except (IndexError, KeyError, ValueError) as error:
+        raise ValueError("Invalid component name pattern '{:s}': {}".format(name_pattern, error))
+
+    if len(set(component_names)) != len(component_names):
+        raise ValueError("The component name pattern '{:s}' does not produce unique names".format(name_pattern))
+    return component_names
+
+
+class HostedComponentClient(LoopbackClient):
+    """Message bus client for a hosted component. The component receives its messages through the loopback bus
+       of the host and the messages sent by the component are published using the given shared client."""
+
+    def __init__(self, component_host: "DummyComponentHost", sending_client: Any, **kwargs):
+        # the keyword arguments are the RabbitMQ connection parameters which include "host"
+        super().__init__(component_host.bus, **kwargs)
+        self.__component_host = component_host
+        self.__sending_client = sending_client
+
+    def add_listener(self, topic_names: Union[str, List[str]], callback_function: MessageCallback):
+        """Starts listening to the given topics. The host ensures that the shared client listens to the topics."""
+        super().add_listener(topic_names, callback_function)
+        self.__component_host.bind_topics([topic_names] if isinstance(topic_names, str) else topic_names)
+
+    async def send_message(self, topic_name: str, message_bytes: bytes):
+        """Publishes the given message using the shared client."""
+        await self.__sending_client.send_message(topic_name, message_bytes)
+
+
+class DummyComponentHost:
+    """Runs several dummy components in the same event loop using a shared pool of message bus clients."""
+
+    def __init__(self, component_names: List[str], simulation_id: Optional[str] = None,
+                 rabbitmq_clients: Optional[List[Any]] = None, connections: int = 1):
+        """Creates a dummy component for each given component name. The other dummy component settings are read
+           from the environmental variables. If rabbitmq_clients is not given, a pool of the given number of
+           RabbitMQ clients is created."""
+        if rabbitmq_clients is None:
+            rabbitmq_clients = [RabbitmqClient() for _ in range(max(connections, 1))]
+        self.__rabbitmq_clients = rabbitmq_clients
+        self.__bus = LoopbackBus()
+        self.__bound_topics: Set[str] = set()
+        self.__listening = False
+        self.__listening_tasks: List[asyncio.Task] = []
+
+        self.__components: List[DummyComponent] = []
+        with component_rabbitmq_clients(self.__create_client):
+            for component_name in component_names:
+                if simulation_id is None:
+                    dummy_component = DummyComponent(component_name=component_name)
+                else:
+                    dummy_component = DummyComponent(simulation_id=simulation_id, component_name=component_name)
+                self.__components.append(dummy_component)
+
+        LOGGER.info("Dummy component host created with {:d} components and {:d} message bus clients.".format(
+            len(self.__components), len(self.__rabbitmq_clients)))
+
+    @property
+    def bus(self) -> LoopbackBus:
+        """The loopback bus that is used to route the received messages to the hosted components."""
+        return self.__bus
+
+    @property
+    def components(self) -> List[DummyComponent]:
+        """The hosted dummy components."""
+        return self.__components
+
+    @property
+    def bound_topics(self) -> List[str]:
+        """The topics that the shared client is listening to."""
+        return sorted(self.__bound_topics)
+
+    @property
+    def is_stopped(self) -> bool:
+        """Returns True, if all the hosted components are stopped."""
+        return all(dummy_component.is_stopped for dummy_component in self.__components)
+
+    def bind_topics(self, topic_names: List[str]):
+        """Ensures that the shared client listens to the given topics. Before the host is started, the topics are
+           only collected, so that the shared client can start listening to all of them at once."""
+        new_topics = set(topic_names) - self.__bound_topics
+        if not new_topics:
+            return
+        self.__bound_topics.update(new_topics)
+        if self.__listening:
+            self.__rabbitmq_clients[0].add_listener(sorted(new_topics), self.__forward_message)
+
+    async def start(self):
+        """Starts the hosted components, starts listening to their topics and starts sending the listening messages
+           until the simulation has started."""
+        for dummy_component in self.__components:
+            await dummy_component.start()
+
+        self.__listening = True
+        self.__rabbitmq_clients[0].add_listener(sorted(self.__bound_topics), self.__forward_message)
+        LOGGER.info("Listening to {:d} topics for {:d} components.".format(
+            len(self.__bound_topics), len(self.__components)))
+
+        self.__listening_tasks = [
+            asyncio.create_task(dummy_component.send_listening_messages())
+            for dummy_component in self.__components
+        ]
+
+    async def close(self):
+        """Stops sending the listening messages and the message routing and closes the shared clients."""
+        for listening_task in self.__listening_tasks:
+            listening_task.cancel()
+        await self.__bus.close()
+        for rabbitmq_client in self.__rabbitmq_clients:
+            await rabbitmq_client.close()
+
+    async def __forward_message(self, message_object: Union[AbstractMessage, Any], message_routing_key: str):
+        """Forwards a received message to the hosted components that listen to the topic."""
+        self.__bus.publish_object(message_routing_key, message_object)
+
+    def __create_client(self, **kwargs: Any) -> HostedComponentClient:
+        """Returns a client for a new hosted component. The components are divided evenly between the shared
+           clients."""
+        sending_client = self.__rabbitmq_clients[len(self.__components) % len(self.__rabbitmq_clients)]
+        return HostedComponentClient(self, sending_client, **kwargs)
+
+
+async def start_dummy_host():
+    """Starts the dummy component host process."""
+    env_variables = load_environmental_variables(
+        (__DUMMY_HOST_COMPONENTS, int, 1),
+        (__DUMMY_HOST_NAME_PATTERN, str, DEFAULT_NAME_PATTERN),
+        (__DUMMY_HOST_FIRST_INDEX, int, 1),
+        (__DUMMY_HOST_CONNECTIONS, int, 1)
+    )
+    try:
+        component_names = get_component_names(
+            cast(int, env_variables[__DUMMY_HOST_COMPONENTS]),
+            cast(str, env_variables[__DUMMY_HOST_NAME_PATTERN]),
+            cast(int, env_variables[__DUMMY_HOST_FIRST_INDEX]))
+    except ValueError as error:
+        LOGGER.error(str(error))
+        return
+
+    dummy_host = DummyComponentHost(component_names, connections=cast(int, env_variables[__DUMMY_HOST_CONNECTIONS]))
+    await dummy_host.start()
+
+    # Wait in an endless loop until all the hosted components are stopped.
+    while not dummy_host.is_stopped:
+        await asyncio.sleep(TIMEOUT_INTERVAL)
+    await dummy_host.close()
+    shutdown_executors()
+
+
+if __name__ == "__main__":
+    asyncio.run(start_dummy_host())
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains the seeded random number streams and the latency models for the dummy component.
+
+   The latency model determines how long the dummy component takes to process an epoch. The model is given
+   as a specification string "name:parameter=value,parameter=value" where the name is one of
+   - "uniform" with parameters min and max (default: MIN_SLEEP_TIME and MAX_SLEEP_TIME)
+   - "fixed" with parameter value
+   - "lognormal" with parameters median and sigma
+   - "pareto" with parameters scale (the minimum latency) and shape
+   - "trace" with parameter file, a CSV file with the columns EpochNumber, Latency and optionally ComponentName
+
+   When a seed is given, the latency for each epoch is drawn from a random number stream that depends only on
+   the seed, the component name and the epoch number, so the latencies are the same in every run regardless of
+   for example resent epoch messages.
+"""
+
+import abc
+import csv
+import hashlib
+import math
+import random
+from typing import Dict, List, Optional
+
+import numpy
+
+LATENCY_MODEL_FIXED = "fixed"
+LATENCY_MODEL_UNIFORM = "uniform"
+LATENCY_MODEL_LOGNORMAL = "lognormal"
+LATENCY_MODEL_PARETO = "pareto"
+LATENCY_MODEL_TRACE = "trace"
+
+TRACE_EPOCH_NUMBER = "EpochNumber"
+TRACE_LATENCY = "Latency"
+TRACE_COMPONENT_NAME = "ComponentName"
+
+
+class ComponentRandom:
+    """The random number streams for one component. Without a seed, the streams are not reproducible."""
+
+    def __init__(self, seed: Optional[str], component_name: str):
+        self.__seed = seed
+        self.__component_name = component_name
+        if seed is None:
+            self.__random = random.Random()
+            self.__numpy_generator = numpy.random.default_rng()
+        else:
+            self.__random = random.Random(self.__get_seed_value())
+            self.__numpy_generator = numpy.random.default_rng(self.__get_seed_value("numpy"))
+
+    @property
+    def seed(self) -> Optional[str]:
+        """The seed for the streams or None."""
+        return self.__seed
+
+    @property
+    def random_generator(self) -> random.Random:
+        """The random number generator for the component."""
+        return self.__random
+
+    @property
+    def numpy_generator(self) -> numpy.random.Generator:
+        """The NumPy random number generator for the component."""
+        return self.__numpy_generator
+
+    def get_epoch_random(self, epoch_number: int) -> random.Random:
+        """Returns the random number generator for the given epoch. With a seed, the generator depends only on
+           the seed, the component name and the epoch number. Otherwise, the component generator is returned."""
+        if self.__seed is None:
+            return self.__random
+        return random.Random(self.__get_seed_value("epoch", str(epoch_number)))
+
+    def get_chance_value(self, purpose: str, epoch_number: int, attempt: int = 0) -> float:
+        """Returns a random value from [0, 1) for the given purpose, epoch and attempt. With a seed, the value depends
+           only on the seed, the component name, the purpose, the epoch number and the attempt, so it does not depend
+           on the other random draws. Otherwise, the value is drawn from the component generator."""
+        if self.__seed is None:
+            return self.__random.random()
+        return self.__get_seed_value(purpose, str(epoch_number), str(attempt)) / 2 ** 64
+
+    def __get_seed_value(self, *extra_parts: str) -> int:
+        """Returns an integer seed calculated from the seed, the component name and the given extra parts."""
+        seed_string = ":".join([str(self.__seed), self.__component_name] + list(extra_parts))
+        return int.from_bytes(hashlib.sha256(seed_string.encode("UTF-8")).digest()[:8], "big")
+
+
+class LatencyModel(abc.ABC):
+    """Base class for the latency models."""
+
+    @abc.abstractmethod
+    def get_latency(self, epoch_number: int, random_generator: random.Random) -> float:
+        """Returns the latency in seconds for the given epoch using the given random number generator."""
+
+
+class FixedLatency(LatencyModel):
+    """The same latency for every epoch."""
+
+    def __init__(self, value: float):
+        self.__value = value
+
+    def get_latency(self, epoch_number: int, random_generator: random.Random) -> float:
+        """Returns the fixed latency."""
+        return self.__value
+
+
+class UniformLatency(LatencyModel):
+    """Latency from the uniform distribution between min_value and max_value."""
+
+    def __init__(self, min_value: float, max_value: float):
+        self.__min_value = min_value
+        self.__max_value = max_value
+
+    def get_latency(self, epoch_number: int, random_generator: random.Random) -> float:
+        """Returns a random latency from the uniform distribution."""
+        return random_generator.uniform(self.__min_value, self.__max_value)
+
+
+class LogNormalLatency(LatencyModel):
+    """Latency from the log-normal distribution with the given median and shape parameter sigma."""
+
+    def __init__(self, median: float, sigma: float):
+        self.__mu = math.log(median)
+        self.__sigma = sigma
+
+    def get_latency(self, epoch_number: int, random_generator: random.Random) -> float:
+        """Returns a random latency from the log-normal distribution."""
+        return random_generator.lognormvariate(self.__mu, self.__sigma)
+
+
+class ParetoLatency(LatencyModel):
+    """Heavy-tailed latency from the Pareto distribution with the given minimum value (scale) and shape.
+       The smaller the shape, the heavier the tail. With shape <= 1, the mean is infinite."""
+
+    def __init__(self, scale: float, shape: float):
+        self.__scale = scale
+        self.__shape = shape
+
+    def get_latency(self, epoch_number: int, random_generator: random.Random) -> float:
+        """Returns a random latency from the Pareto distribution."""
+        return self.__scale * random_generator.paretovariate(self.__shape)
+
+
+class TraceLatency(LatencyModel):
+    """Latencies from a recorded trace. For the epochs that are not in the trace,
+       the recorded latencies are repeated in the epoch order."""
+
+    def __init__(self, latencies: Dict[int, float]):
+        if not latencies:
+            raise ValueError("The latency trace is empty")
+        self.__latencies = latencies
+        self.__latency_list = [latencies[epoch_number] for epoch_number in sorted(latencies)]
+
+    def get_latency(self, epoch_number: int, random_generator: random.Random) -> float:
+        """Returns the recorded latency for the given epoch."""
+        latency = self.__latencies.get(epoch_number, None)
+        if latency is None:
+            latency = self.__latency_list[(epoch_number - 1) % len(self.__latency_list)]
+        return latency
+
+
+def load_latency_trace(file_name: str, component_name: str) -> Dict[int, float]:
+    """Returns the latencies for the given component from the given CSV file. If the file has the column
+       ComponentName, only the rows for the given component are used. Raises OSError if the file cannot be read
+       and ValueError if the file is not a valid trace file."""
+    latencies: Dict[int, float] = {}
+    with open(file_name, mode="r", encoding="UTF-8", newline="") as trace_file:
+        reader = csv.DictReader(trace_file)
+        if reader.fieldnames is None or not {TRACE_EPOCH_NUMBER, TRACE_LATENCY}.issubset(reader.fieldnames):
+            raise ValueError("The trace file {:s} should have the columns {:s} and {:s}".format(
+                file_name, TRACE_EPOCH_NUMBER, TRACE_LATENCY))
+        for row in reader:
+            if TRACE_COMPONENT_NAME in row and row[TRACE_COMPONENT_NAME] != component_name:
+                continue
+            try:
+                latencies[int(row[TRACE_EPOCH_NUMBER])] = float(row[TRACE_LATENCY])
+            except (TypeError, ValueError):
+                raise ValueError("Invalid row in the trace file {:s}: {}".format(file_name, row))
+    return latencies
+
+
+def parse_model_parameters(parameter_string: str) -> Dict[str, str]:
+    """Returns the parameters from the string "parameter=value,parameter=value"."""
+    parameters = {}
+    for parameter in parameter_string.split(","):
+        if not parameter.strip():
+            continue
+        parameter_name, separator, parameter_value = parameter.partition("=")
+        if not separator:
+            raise ValueError("Invalid latency model parameter: {:s}".format(parameter))
+        parameters[parameter_name.strip()] = parameter_value.strip()
+    return parameters
+
+
+def create_latency_model(specification: str, min_sleep_time: float, max_sleep_time: float,
+                         component_name: str) -> LatencyModel:
+    """Returns the latency model for the given specification "name:parameter=value,...".
+       Raises ValueError if the specification is not valid."""
+    model_name, _, parameter_string = specification.partition(":")
+    model_name = model_name.strip().lower()
+    parameters = parse_model_parameters(parameter_string)
+    required_parameters: Dict[str, List[str]] = {
+        LATENCY_MODEL_FIXED: ["value"],
+        LATENCY_MODEL_UNIFORM: [],
+        LATENCY_MODEL_LOGNORMAL: ["median", "sigma"],
+        LATENCY_MODEL_PARETO: ["scale", "shape"],
+        LATENCY_MODEL_TRACE: ["file"]
+    }
+    if model_name not in required_parameters:
+        raise ValueError("Unknown latency model: {:s}".format(model_name))
+    missing_parameters = [
+        parameter_name
+        for parameter_name in required_parameters[model_name]
+        if parameter_name not in parameters
+    ]
+    if missing_parameters:
+        raise ValueError("Missing parameters for the {:s} latency model: {:s}".format(
+            model_name, ", ".join(missing_parameters)))
+
+    if model_name == LATENCY_MODEL_TRACE:
+        return TraceLatency(load_latency_trace(parameters["file"], component_name))
+
+    try:
+        values = {
+            parameter_name: float(parameter_value)
+            for parameter_name, parameter_value in parameters.items()
+        }
+    except ValueError:
+        raise ValueError("The parameters for the {:s} latency model must be numbers".format(model_name))
+    if any(value < 0.0 for value in values.values()):
+        raise ValueError("The parameters for the {:s} latency model cannot be negative".format(model_name))
+
+    if model_name == LATENCY_MODEL_FIXED:
+        return FixedLatency(values["value"])
+    if model_name == LATENCY_MODEL_UNIFORM:
+        return UniformLatency(values.get("min", min_sleep_time), values.get("max", max_sleep_time))
+    if values.get("median", 1.0) <= 0.0 or values.get("shape", 1.0) <= 0.0:
+        raise ValueError("The median and the shape for the {:s} latency model must be positive".format(model_name))
+    if model_name == LATENCY_MODEL_LOGNORMAL:
+        return LogNormalLatency(values["median"], values["sigma"])
+    return ParetoLatency(values["scale"], values["shape"])
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains the payload profiles that determine the attributes in the dummy component result messages.
+
+   A profile is an object with the following optional attributes:
+   - "attributes": explicit attribute definitions in the format of RANDOM_ATTRIBUTES in dummy.random_series
+   - "simple_attributes": the number of generated simple attributes named Value1, Value2, ...
+   - "timeseries_attributes": the number of generated time series attributes named Series1, Series2, ...
+   - "series_per_attribute": the number of series in each generated time series attribute named S1, S2, ...
+   - "time_parts": the number of time steps in the generated time series, each series contains time_parts + 1 values
+   - "min", "max", "max_difference" and "unit": the value range, the maximum change between two consecutive
+     values and the unit of measure for the generated attributes
+
+   The generated attributes are added after the explicitly defined attributes. The profile is compiled into
+   a RandomAttributes object once when the dummy component is created.
+"""
+
+import json
+import os
+from typing import Any, Dict
+
+from tools.tools import FullLogger
+
+from dummy.random_series import (
+    ATTRIBUTE_TYPE_SIMPLE, ATTRIBUTE_TYPE_TIMESERIES, DEFAULT_RANDOM_ATTRIBUTES, RANDOM_ATTRIBUTES, RandomAttributes)
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+LOGGER = FullLogger(__name__)
+
+DEFAULT_PROFILE_NAME = "default"
+
+# The default values for the generated attributes.
+DEFAULT_GENERATED_ATTRIBUTE = {
+    "series_per_attribute": 3,
+    "time_parts": 6,
+    "min": 0.0,
+    "max": 100.0,
+    "max_difference": 5.0,
+    "unit": "kW"
+}
+
+# The predefined profiles that can be selected by name.
+PROFILES = {
+    DEFAULT_PROFILE_NAME: {
+        "attributes": RANDOM_ATTRIBUTES
+    },
+    "small": {
+        "simple_attributes": 1
+    },
+    "large": {
+        "simple_attributes": 20,
+        "timeseries_attributes": 20,
+        "series_per_attribute": 3,
+        "time_parts": 96
+    },
+    "extreme": {
+        "simple_attributes": 100,
+        "timeseries_attributes": 100,
+        "series_per_attribute": 10,
+        "time_parts": 1000
+    }
+}
+
+YAML_FILE_EXTENSIONS = (".yaml", ".yml")
+
+
+def get_profile_definitions(profile: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Returns the attribute definitions in the format of RANDOM_ATTRIBUTES for the given profile.
+       Raises ValueError if the profile is not valid."""
+    if not isinstance(profile, dict):
+        raise ValueError("The profile is not an object")
+    unknown_attributes = set(profile) - {"attributes", "simple_attributes", "timeseries_attributes"} - set(
+        DEFAULT_GENERATED_ATTRIBUTE)
+    if unknown_attributes:
+        raise ValueError("Unknown profile attributes: {:s}".format(", ".join(sorted(unknown_attributes))))
+
+    definitions = dict(profile.get("attributes", {}))
+    settings = dict(DEFAULT_GENERATED_ATTRIBUTE, **{
+        setting_name: setting_value
+        for setting_name, setting_value in profile.items()
+        if setting_name in DEFAULT_GENERATED_ATTRIBUTE
+    })
+    try:
+        simple_attributes = int(profile.get("simple_attributes", 0))
+        timeseries_attributes = int(profile.get("timeseries_attributes", 0))
+        series_per_attribute = int(settings["series_per_attribute"])
+    except (TypeError, ValueError):
+        raise ValueError("The attribute and series counts must be integers")
+    if simple_attributes < 0 or timeseries_attributes < 0 or series_per_attribute < 1:
+        raise ValueError("The attribute counts cannot be negative and each attribute must have at least one series")
+
+    for attribute_index in range(1, simple_attributes + 1):
+        definitions["Value{:d}".format(attribute_index)] = {
+            "type": ATTRIBUTE_TYPE_SIMPLE,
+            "min": settings["min"],
+            "max": settings["max"]
+        }
+    for attribute_index in range(1, timeseries_attributes + 1):
+        definitions["Series{:d}".format(attribute_index)] = {
+            "type": ATTRIBUTE_TYPE_TIMESERIES,
+            "sub_types": ["S{:d}".format(series_index) for series_index in range(1, series_per_attribute + 1)],
+            "unit": settings["unit"],
+            "min": settings["min"],
+            "max": settings["max"],
+            "max_difference": settings["max_difference"],
+            "time_parts": settings["time_parts"]
+        }
+
+    if not definitions:
+        raise ValueError("The profile does not define any attributes")
+    return definitions
+
+
+def compile_profile(profile: Dict[str, Any]) -> RandomAttributes:
+    """Returns the compiled random attributes for the given profile. Raises ValueError if the profile is not valid."""
+    return RandomAttributes(get_profile_definitions(profile))
+
+
+def read_profile_file(file_name: str) -> Dict[str, Any]:
+    """Reads a profile from the given JSON file or from a YAML file if PyYAML is installed.
+       Raises OSError if the file cannot be read and ValueError if the file does not contain a valid document."""
+    with open(file_name, mode="r", encoding="UTF-8") as profile_file:
+        if os.path.splitext(file_name)[1].lower() in YAML_FILE_EXTENSIONS:
+            if yaml is None:
+                raise ValueError("PyYAML is required for reading the YAML file {:s}".format(file_name))
+            try:
+                return yaml.safe_load(profile_file)
+            except yaml.YAMLError as error:
+                raise ValueError(str(error))
+        return json.load(profile_file)
+
+
+def load_payload_profile(profile: str = "", profile_file: str = "") -> RandomAttributes:
+    """Returns the compiled random attributes for the result messages.
+
+       If profile_file is given, the profile is read from the file. Otherwise, profile can be the name of
+       a predefined profile in PROFILES or a profile in JSON format. The default profile is used if neither
+       is given or if the given profile is not valid."""
+    try:
+        if profile_file:
+            profile_name = profile_file
+            random_attributes = compile_profile(read_profile_file(profile_file))
+        elif profile and profile != DEFAULT_PROFILE_NAME:
+            profile_name = profile if profile in PROFILES else "inline profile"
+            random_attributes = compile_profile(PROFILES[profile] if profile in PROFILES else json.loads(profile))
+        else:
+            return DEFAULT_RANDOM_ATTRIBUTES
+    except (OSError, ValueError) as error:
+        LOGGER.error("Could not load the payload profile, using the default profile: {}".format(error))
+        return DEFAULT_RANDOM_ATTRIBUTES
+
+    LOGGER.info("Using payload profile '{:s}' with {:d} attributes, {:d} time series and {:d} values per epoch".format(
+        profile_name, len(random_attributes.definitions), random_attributes.series_count,
+        random_attributes.points_per_epoch))
+    return random_attributes
@@ -4,10 +4,22 @@
 # This source code is licensed under the MIT license. See LICENSE in the repository root directory.
 # Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
 
-"""This module contains a function that can be used to generate random series of numbers."""
+"""This module contains a function that can be used to generate random series of numbers.
 
+   The function get_all_random_series_batch is a NumPy based alternative to get_all_random_series for result
+   messages with long time series. It draws the random numbers for all the attributes at once and generates
+   the bounded random walks in vectorized chunks.
+
+   The attribute definitions are given as RandomAttributes objects that are compiled from dictionaries in
+   the format of RANDOM_ATTRIBUTES. The definitions are checked and the values needed by the generator
+   functions are collected when the object is created. By default, RANDOM_ATTRIBUTES is used.
+"""
+
+import datetime
 import random
-from typing import Dict, List, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+import numpy
 
 from tools.datetime_tools import to_utc_datetime_object
 from tools.exceptions.messages import MessageError
@@ -20,6 +32,12 @@ ATTRIBUTE_TYPE_SIMPLE = "simple"
 ATTRIBUTE_TYPE_TIMESERIES = "timeseries"
 N_DIGITS = 1
 
+# The maximum number of values that are generated at once as a free random walk in get_all_random_series_batch.
+BATCH_CHUNK_SIZE = 128
+
+# The default random number generator for get_all_random_series_batch.
+RANDOM_GENERATOR = numpy.random.default_rng()
+
 # These settings are used in determining the composition of the result messages in the dummy components.
 RANDOM_ATTRIBUTES = {
     "DummyValue": {
@@ -53,15 +71,123 @@ RANDOM_ATTRIBUTES = {
 }
 
 
-def get_random_initial_values() -> Dict[str, Dict[str, float]]:
-    """Returns randomly chosen initial values for the random time series attributes."""
+class TimeSeriesAttribute(NamedTuple):
+    """The definition of a random time series attribute."""
+    name: str
+    sub_types: List[str]
+    unit: str
+    min_value: float
+    max_value: float
+    max_difference: float
+    time_parts: int
+
+
+class RandomAttributes:
+    """Compiled random attribute definitions for the result messages.
+       Raises ValueError if the given definitions are not valid."""
+
+    def __init__(self, definitions: Dict[str, Dict[str, Any]]):
+        self.__definitions = definitions
+        self.__simple_attributes: List[str] = []
+        simple_min_values: List[float] = []
+        simple_max_values: List[float] = []
+        self.__timeseries_attributes: List[TimeSeriesAttribute] = []
+
+        for attribute_name, attribute_definition in definitions.items():
+            if not isinstance(attribute_definition, dict):
+                raise ValueError("The definition for {:s} is not an object".format(attribute_name))
+            try:
+                attribute_type = attribute_definition["type"]
+                min_value = float(attribute_definition["min"])
+                max_value = float(attribute_definition["max"])
+                if attribute_type == ATTRIBUTE_TYPE_SIMPLE:
+                    max_difference = 0.0
+                elif attribute_type == ATTRIBUTE_TYPE_TIMESERIES:
+                    sub_types = [str(sub_type) for sub_type in attribute_definition["sub_types"]]
+                    unit = str(attribute_definition["unit"])
+                    max_difference = float(attribute_definition["max_difference"])
+                    time_parts = int(attribute_definition["time_parts"])
+                else:
+                    raise ValueError("Unknown type '{}' for {:s}".format(attribute_type, attribute_name))
+            except (KeyError, TypeError) as error:
+                raise ValueError("Invalid definition for {:s}: {}".format(attribute_name, error))
+
+            if min_value > max_value:
+                raise ValueError("The minimum value is larger than the maximum value for {:s}".format(attribute_name))
+            if attribute_type == ATTRIBUTE_TYPE_SIMPLE:
+                self.__simple_attributes.append(attribute_name)
+                simple_min_values.append(min_value)
+                simple_max_values.append(max_value)
+                continue
+
+            if not sub_types or len(set(sub_types)) != len(sub_types):
+                raise ValueError("The sub types for {:s} are empty or not unique".format(attribute_name))
+            if max_difference <= 0.0 or time_parts < 1:
+                raise ValueError("The maximum difference and the number of time parts for {:s} must be positive".format(
+                    attribute_name))
+            self.__timeseries_attributes.append(TimeSeriesAttribute(
+                attribute_name, sub_types, unit, min_value, max_value, max_difference, time_parts))
+
+        self.__simple_min_values = numpy.array(simple_min_values)
+        self.__simple_max_values = numpy.array(simple_max_values)
+
+    @property
+    def definitions(self) -> Dict[str, Dict[str, Any]]:
+        """The attribute definitions in the format of RANDOM_ATTRIBUTES."""
+        return self.__definitions
+
+    @property
+    def simple_attributes(self) -> List[str]:
+        """The names of the simple attributes."""
+        return self.__simple_attributes
+
+    @property
+    def simple_min_values(self) -> numpy.ndarray:
+        """The minimum values for the simple attributes."""
+        return self.__simple_min_values
+
+    @property
+    def simple_max_values(self) -> numpy.ndarray:
+        """The maximum values for the simple attributes."""
+        return self.__simple_max_values
+
+    @property
+    def timeseries_attributes(self) -> List[TimeSeriesAttribute]:
+        """The definitions of the time series attributes."""
+        return self.__timeseries_attributes
+
+    @property
+    def series_count(self) -> int:
+        """The total number of time series in the time series attributes."""
+        return sum(len(attribute.sub_types) for attribute in self.__timeseries_attributes)
+
+    @property
+    def points_per_epoch(self) -> int:
+        """The total number of generated values for one result message."""
+        return len(self.__simple_attributes) + sum(
+            len(attribute.sub_types) * (attribute.time_parts + 1) for attribute in self.__timeseries_attributes)
+
+
+DEFAULT_RANDOM_ATTRIBUTES = RandomAttributes(RANDOM_ATTRIBUTES)
+
+
+def get_definitions(random_attributes: Optional[RandomAttributes]) -> Dict[str, Dict[str, Any]]:
+    """Returns the attribute definitions for the given random attributes or RANDOM_ATTRIBUTES if None is given."""
+    return RANDOM_ATTRIBUTES if random_attributes is None else random_attributes.definitions
+
+
+def get_random_initial_values(random_attributes: Optional[RandomAttributes] = None,
+                              random_generator: Optional[random.Random] = None) -> Dict[str, Dict[str, float]]:
+    """Returns randomly chosen initial values for the random time series attributes.
+       The values are drawn from the given random number generator or from the random module."""
+    uniform = random.uniform if random_generator is None else random_generator.uniform
     initial_values = {}
-    for random_attribute_name, random_attribute_definition in RANDOM_ATTRIBUTES.items():
+    for random_attribute_name, random_attribute_definition in get_definitions(random_attributes).items():
         if random_attribute_definition["type"] == ATTRIBUTE_TYPE_TIMESERIES:
             initial_values[random_attribute_name] = {}
             for sub_type in random_attribute_definition["sub_types"]:
                 initial_values[random_attribute_name][sub_type] = round(
-                    random.uniform(random_attribute_definition["min"], random_attribute_definition["max"]), N_DIGITS)
+                    uniform(random_attribute_definition["min"], random_attribute_definition["max"]), N_DIGITS)
 
     return initial_values
 
@@ -84,9 +210,10 @@ def get_random_series(random_series_length: int, start_value: float, min_value:
 
 
 def get_random_time_series(random_attribute_name: str, start_values: Dict[str, float],
-                           start_time: str, end_time: str) -> Union[TimeSeriesBlock, None]:
+                           start_time: str, end_time: str,
+                           random_attributes: Optional[RandomAttributes] = None) -> Union[TimeSeriesBlock, None]:
     """Returns a randomly generated time series block for a result message."""
-    random_attribute_definition = RANDOM_ATTRIBUTES.get(random_attribute_name, None)
+    random_attribute_definition = get_definitions(random_attributes).get(random_attribute_name, None)
     if random_attribute_definition is None or random_attribute_definition["type"] != ATTRIBUTE_TYPE_TIMESERIES:
         return None
 
@@ -119,28 +246,127 @@ def get_random_time_series(random_attribute_name: str, start_values: Dict[str, f
     })
 
 
-def get_all_random_series(start_values: Dict[str, Dict[str, float]],
-                          start_time: str, end_time: str) -> Dict[str, Union[float, TimeSeriesBlock]]:
+def get_all_random_series(start_values: Dict[str, Dict[str, float]], start_time: str, end_time: str,
+                          random_attributes: Optional[RandomAttributes] = None) \
+        -> Dict[str, Union[float, TimeSeriesBlock]]:
     """Returns a dictionary containing new random values for all the defined random attributes."""
     new_series_collection = {}
-    for random_attribute_name, random_attribute_definition in RANDOM_ATTRIBUTES.items():
+    for random_attribute_name, random_attribute_definition in get_definitions(random_attributes).items():
         if random_attribute_definition["type"] == ATTRIBUTE_TYPE_SIMPLE:
             new_series_collection[random_attribute_name] = round(
                 random.uniform(random_attribute_definition["min"], random_attribute_definition["max"]), N_DIGITS)
         else:
             new_random_series = get_random_time_series(
-                random_attribute_name, start_values[random_attribute_name], start_time, end_time)
+                random_attribute_name, start_values[random_attribute_name], start_time, end_time, random_attributes)
             if isinstance(new_random_series, TimeSeriesBlock):
                 new_series_collection[random_attribute_name] = new_random_series
 
     return new_series_collection
 
 
-def get_latest_values(random_series_collection: Dict[str, Union[float, TimeSeriesBlock]]) \
-        -> Dict[str, Dict[str, float]]:
+def get_time_index(start_time: str, end_time: str, time_parts: int) -> List[datetime.datetime]:
+    """Returns the time index that divides the given time interval into time_parts equal parts."""
+    start_time_object = to_utc_datetime_object(start_time)
+    time_step = (to_utc_datetime_object(end_time) - start_time_object) / time_parts
+    return [
+        start_time_object + index * time_step
+        for index in range(0, time_parts + 1)
+    ]
+
+
+def get_bounded_random_walk(uniform_values: numpy.ndarray, start_value: float, min_value: float, max_value: float,
+                            max_difference: float) -> numpy.ndarray:
+    """Returns a random series that starts from start_value and has the same distribution as the series
+       from get_random_series. The given uniform random values from [0, 1) determine the steps.
+
+       As long as the previous value is at least max_difference away from min_value and max_value, the step
+       is not limited and the rounded series is the start value plus the cumulative sum of the rounded steps.
+       The series is generated in chunks using the cumulative sum and each chunk is cut at the first value
+       from which the next step would be limited. The limited steps are generated one at a time."""
+    uniform_list = uniform_values.tolist()
+    free_steps = ((2.0 * uniform_values - 1.0) * max_difference).round(N_DIGITS)
+    low_limit = min_value + max_difference
+    high_limit = max_value - max_difference
+
+    random_series = numpy.empty(len(uniform_list) + 1)
+    random_series[0] = start_value
+    previous_value = start_value
+    position = 0
+    while position < len(uniform_list):
+        # the limited steps
+        while position < len(uniform_list) and not low_limit <= previous_value <= high_limit:
+            low_value = max(previous_value - max_difference, min_value)
+            high_value = min(previous_value + max_difference, max_value)
+            previous_value = round(low_value + (high_value - low_value) * uniform_list[position], N_DIGITS)
+            position += 1
+            random_series[position] = previous_value
+        if position >= len(uniform_list):
+            break
+
+        # the free steps until the first value from which the next step would be limited
+        free_walk = (previous_value + free_steps[position:position + BATCH_CHUNK_SIZE].cumsum()).round(N_DIGITS)
+        limited_values = (free_walk < low_limit) | (free_walk > high_limit)
+        first_limited = int(limited_values.argmax())
+        accepted_values = first_limited + 1 if limited_values[first_limited] else len(free_walk)
+        random_series[position + 1:position + 1 + accepted_values] = free_walk[:accepted_values]
+        position += accepted_values
+        previous_value = float(random_series[position])
+
+    return random_series
+
+
+def get_all_random_series_batch(start_values: Dict[str, Dict[str, float]], start_time: str, end_time: str,
+                                generator: Optional[numpy.random.Generator] = None,
+                                random_attributes: Optional[RandomAttributes] = None) \
+        -> Dict[str, Union[float, TimeSeriesBlock]]:
+    """Returns a dictionary containing new random values for all the defined random attributes.
+       The result has the same structure and distribution as the result from get_all_random_series and
+       the start values are updated in the same way. The random numbers are drawn from the given
+       NumPy random number generator or from RANDOM_GENERATOR."""
+    if generator is None:
+        generator = RANDOM_GENERATOR
+    if random_attributes is None:
+        random_attributes = DEFAULT_RANDOM_ATTRIBUTES
+
+    simple_values = generator.uniform(
+        random_attributes.simple_min_values, random_attributes.simple_max_values).round(N_DIGITS)
+    new_series_collection: Dict[str, Union[float, TimeSeriesBlock]] = dict(
+        zip(random_attributes.simple_attributes, simple_values.tolist()))
+
+    # the time index is the same for all attributes with the same number of time parts
+    time_indexes: Dict[int, List[datetime.datetime]] = {}
+    for attribute in random_attributes.timeseries_attributes:
+        if attribute.time_parts not in time_indexes:
+            time_indexes[attribute.time_parts] = get_time_index(start_time, end_time, attribute.time_parts)
+
+        attribute_start_values = start_values[attribute.name]
+        uniform_values = generator.random((len(attribute.sub_types), attribute.time_parts))
+        random_series_collection = {}
+        for sub_type, sub_type_uniform_values in zip(attribute.sub_types, uniform_values):
+            new_random_series = get_bounded_random_walk(
+                sub_type_uniform_values, attribute_start_values[sub_type], attribute.min_value,
+                attribute.max_value, attribute.max_difference).tolist()
+            attribute_start_values[sub_type] = new_random_series[-1]
+            random_series_collection[sub_type] = ValueArrayBlock.from_json({
+                "UnitOfMeasure": attribute.unit,
+                "Values": new_random_series
+            })
+
+        new_random_series_block = TimeSeriesBlock.from_json({
+            "TimeIndex": time_indexes[attribute.time_parts],
+            "Series": random_series_collection
+        })
+        if isinstance(new_random_series_block, TimeSeriesBlock):
+            new_series_collection[attribute.name] = new_random_series_block
+
+    return new_series_collection
+
+
+def get_latest_values(random_series_collection: Dict[str, Union[float, TimeSeriesBlock]],
+                      random_attributes: Optional[RandomAttributes] = None) -> Dict[str, Dict[str, float]]:
     """Returns a dictionary containing the latest values for all the series in the collection.
        Raises TimeseriesError if not all attributes are included in the given random_series_collection."""
-    for random_attribute in RANDOM_ATTRIBUTES:
+    for random_attribute in get_definitions(random_attributes):
         if random_attribute not in random_series_collection:
             raise MessageError("Missing attribute: {:s}".format(random_attribute))
 
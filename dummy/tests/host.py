@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the dummy component host."""
+
+import asyncio
+import os
+from typing import Any, List, Tuple
+import unittest
+
+import aiounittest
+
+from dummy.host import DummyComponentHost, get_component_names
+from loopback.bus import LoopbackBus, LoopbackClient
+from manager.manager import SimulationManager
+
+SIMULATION_ID = "2020-01-01T00:00:00.000Z"
+
+
+class CountingClient(LoopbackClient):
+    """Loopback client that stores the topics of the added listeners and counts the sent messages."""
+    def __init__(self, bus: LoopbackBus):
+        super().__init__(bus)
+        self.listened_topics: List[Tuple[str, ...]] = []
+        self.sent_messages = 0
+
+    def add_listener(self, topic_names: Any, callback_function: Any):
+        """Stores the topics and starts listening to them."""
+        self.listened_topics.append(tuple(topic_names))
+        super().add_listener(topic_names, callback_function)
+
+    async def send_message(self, topic_name: str, message_bytes: bytes):
+        """Counts and publishes the message."""
+        self.sent_messages += 1
+        await super().send_message(topic_name, message_bytes)
+
+
+class TestComponentNames(unittest.TestCase):
+    """Unit tests for the component name generation."""
+
+    def test_component_names(self):
+        """Tests the names created from the name pattern."""
+        self.assertEqual(get_component_names(3), ["dummy_1", "dummy_2", "dummy_3"])
+        self.assertEqual(get_component_names(2, "load_{:03d}", 9), ["load_009", "load_010"])
+        for name_pattern in ["dummy", "dummy_{:d}_{:d}", "dummy_{name}"]:
+            with self.subTest(name_pattern=name_pattern):
+                with self.assertRaises(ValueError):
+                    get_component_names(2, name_pattern)
+
+
+class TestDummyComponentHost(aiounittest.AsyncTestCase):
+    """Unit tests for the DummyComponentHost class."""
+
+    os.environ["MIN_SLEEP_TIME"] = "0"
+    os.environ["MAX_SLEEP_TIME"] = "0"
+    os.environ["ERROR_CHANCE"] = "0"
+    os.environ["SEND_MISS_CHANCE"] = "0"
+    os.environ["RECEIVE_MISS_CHANCE"] = "0"
+
+    async def test_hosted_simulation(self):
+        """Tests a simulation where all the components are run by one host using two shared clients."""
+        component_names = get_component_names(20)
+        broker = LoopbackBus()
+        shared_clients = [CountingClient(broker), CountingClient(broker)]
+        manager_client = LoopbackClient(broker)
+        manager = SimulationManager(
+            SIMULATION_ID, "manager", "name", "description", ",".join(component_names), "2020-01-01T00:00:00.000Z",
+            3600, 3, 60.0, 1, "Epoch", "SimState", "Status.Ready", "Status.Error", rabbitmq_client=manager_client)
+        manager_client.add_listener(manager.listened_topics, manager.general_message_handler)
+
+        host = DummyComponentHost(component_names, SIMULATION_ID, rabbitmq_clients=shared_clients)
+        self.assertEqual([component.component_name for component in host.components], component_names)
+        await host.start()
+
+        # the shared client listens to the topics of all the components at once
+        self.assertEqual(len(shared_clients[0].listened_topics), 1)
+        self.assertEqual(len(shared_clients[1].listened_topics), 0)
+        self.assertIn("Epoch.dummy_20", host.bound_topics)
+
+        self.assertTrue(await manager.wait_for_components(5.0))
+        await manager.start()
+        for _ in range(100):
+            if manager.is_stopped and host.is_stopped:
+                break
+            await asyncio.sleep(0.05)
+            await broker.join()
+            await host.bus.join()
+
+        self.assertTrue(manager.is_stopped)
+        self.assertTrue(host.is_stopped)
+        self.assertEqual(manager.epoch_number, 4)
+        # listening message, 4 status messages and 3 result messages for each component
+        self.assertEqual(shared_clients[0].sent_messages, 10 * 8)
+        self.assertEqual(shared_clients[1].sent_messages, 10 * 8)
+
+        await host.close()
+        await broker.close()
+
+    async def test_late_manager(self):
+        """Tests that the components resend the listening messages until the manager that starts listening
+           after the components have started receives them."""
+        component_names = get_component_names(5)
+        broker = LoopbackBus()
+        shared_client = CountingClient(broker)
+        os.environ["LISTENING_MESSAGE_INTERVAL"] = "0.05"
+        try:
+            host = DummyComponentHost(component_names, SIMULATION_ID, rabbitmq_clients=[shared_client])
+        finally:
+            del os.environ["LISTENING_MESSAGE_INTERVAL"]
+        await host.start()
+        # the first listening messages are sent before anyone is listening to them
+        await asyncio.sleep(0.1)
+        await broker.join()
+
+        manager_client = LoopbackClient(broker)
+        manager = SimulationManager(
+            SIMULATION_ID, "manager", "name", "description", ",".join(component_names), "2020-01-01T00:00:00.000Z",
+            3600, 1, 60.0, 1, "Epoch", "SimState", "Status.Ready", "Status.Error", rabbitmq_client=manager_client)
+        manager_client.add_listener(manager.listened_topics, manager.general_message_handler)
+        self.assertTrue(await manager.wait_for_components(1.0))
+
+        await manager.start()
+        for _ in range(100):
+            if manager.is_stopped and host.is_stopped:
+                break
+            await asyncio.sleep(0.05)
+            await broker.join()
+            await host.bus.join()
+        self.assertTrue(host.is_stopped)
+
+        # no more listening messages are sent after the simulation has started
+        sent_messages = shared_client.sent_messages
+        await asyncio.sleep(0.1)
+        self.assertEqual(shared_client.sent_messages, sent_messages)
+
+        await host.close()
+        await broker.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
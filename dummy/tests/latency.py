@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the latency models and the seeded random number streams of the dummy component."""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import unittest
+from typing import Any, Dict, List
+
+import aiounittest
+
+from tools.messages import MessageGenerator, StatusMessage
+
+from dummy.dummy import DummyComponent
+from dummy.latency import (
+    ComponentRandom, FixedLatency, LatencyModel, LogNormalLatency, ParetoLatency, TraceLatency, UniformLatency,
+    create_latency_model, load_latency_trace)
+from loopback.bus import LoopbackBus, LoopbackClient
+from loopback.simulation import loopback_rabbitmq_clients
+
+SIMULATION_ID = "2020-01-01T00:00:00.000Z"
+
+
+def get_latencies(latency_model: LatencyModel, component_random: ComponentRandom, epochs: int) -> List[float]:
+    """Returns the latencies for the epochs from 1 to the given number of epochs."""
+    return [
+        latency_model.get_latency(epoch_number, component_random.get_epoch_random(epoch_number))
+        for epoch_number in range(1, epochs + 1)
+    ]
+
+
+class TestComponentRandom(unittest.TestCase):
+    """Unit tests for the ComponentRandom class."""
+
+    def test_seeded_streams(self):
+        """Tests that the seeded streams are reproducible and different for different components."""
+        first_random = ComponentRandom("experiment", "dummy_1")
+        second_random = ComponentRandom("experiment", "dummy_1")
+        other_random = ComponentRandom("experiment", "dummy_2")
+
+        self.assertEqual([first_random.random_generator.random() for _ in range(5)],
+                         [second_random.random_generator.random() for _ in range(5)])
+        self.assertEqual(first_random.numpy_generator.random(5).tolist(),
+                         second_random.numpy_generator.random(5).tolist())
+        self.assertNotEqual(first_random.get_epoch_random(1).random(), other_random.get_epoch_random(1).random())
+
+        # the epoch streams do not depend on the use of the other streams or on the order of the epochs
+        first_random.random_generator.random()
+        self.assertEqual(first_random.get_epoch_random(3).random(), second_random.get_epoch_random(3).random())
+        self.assertNotEqual(first_random.get_epoch_random(3).random(), first_random.get_epoch_random(4).random())
+
+    def test_chance_values(self):
+        """Tests that the seeded chance values depend only on the purpose, the epoch and the attempt."""
+        first_random = ComponentRandom("experiment", "dummy_1")
+        second_random = ComponentRandom("experiment", "dummy_1")
+
+        first_values = [first_random.get_chance_value("warning", epoch_number) for epoch_number in range(1, 101)]
+        self.assertTrue(all(0.0 <= value < 1.0 for value in first_values))
+        self.assertGreater(len(set(first_values)), 90)
+
+        # the values do not depend on the other draws or on the order of the epochs
+        second_random.random_generator.random()
+        second_random.get_chance_value("warning", 50, attempt=1)
+        second_values = [
+            second_random.get_chance_value("warning", epoch_number)
+            for epoch_number in range(100, 0, -1)
+        ]
+        self.assertEqual(second_values, first_values[::-1])
+        self.assertNotEqual(first_random.get_chance_value("warning", 1), first_random.get_chance_value("error", 1))
+        self.assertNotEqual(first_random.get_chance_value("warning", 1),
+                            first_random.get_chance_value("warning", 1, attempt=1))
+
+    def test_unseeded_streams(self):
+        """Tests that without a seed the component stream is used for the epochs."""
+        component_random = ComponentRandom(None, "dummy_1")
+        self.assertIsNone(component_random.seed)
+        self.assertIs(component_random.get_epoch_random(1), component_random.random_generator)
+
+
+class TestLatencyModels(unittest.TestCase):
+    """Unit tests for the latency models."""
+
+    def test_distributions(self):
+        """Tests the values from the random latency models."""
+        component_random = ComponentRandom("experiment", "dummy_1")
+        self.assertEqual(get_latencies(FixedLatency(1.5), component_random, 3), [1.5, 1.5, 1.5])
+
+        uniform_latencies = get_latencies(UniformLatency(1.0, 2.0), component_random, 1000)
+        self.assertTrue(all(1.0 <= latency <= 2.0 for latency in uniform_latencies))
+
+        lognormal_latencies = get_latencies(LogNormalLatency(2.0, 0.5), component_random, 1000)
+        self.assertAlmostEqual(statistics.median(lognormal_latencies), 2.0, delta=0.2)
+
+        pareto_latencies = get_latencies(ParetoLatency(0.5, 1.5), component_random, 1000)
+        self.assertGreaterEqual(min(pareto_latencies), 0.5)
+        self.assertGreater(max(pareto_latencies), 10 * statistics.median(pareto_latencies))
+
+        self.assertEqual(lognormal_latencies, get_latencies(
+            LogNormalLatency(2.0, 0.5), ComponentRandom("experiment", "dummy_1"), 1000))
+
+        # the base class cannot be used as a latency model
+        with self.assertRaises(TypeError):
+            LatencyModel()  # pylint: disable=abstract-class-instantiated
+
+    def test_trace(self):
+        """Tests loading a latency trace and repeating it."""
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "trace.csv")
+            with open(file_name, mode="w", encoding="UTF-8") as trace_file:
+                trace_file.write("EpochNumber,ComponentName,Latency\n")
+                trace_file.write("1,dummy_1,0.5\n2,dummy_1,1.5\n3,dummy_1,2.5\n1,dummy_2,9.0\n")
+
+            self.assertEqual(load_latency_trace(file_name, "dummy_2"), {1: 9.0})
+            latency_model = create_latency_model("trace:file={:s}".format(file_name), 0.0, 1.0, "dummy_1")
+            self.assertIsInstance(latency_model, TraceLatency)
+            self.assertEqual(get_latencies(latency_model, ComponentRandom(None, "dummy_1"), 7),
+                             [0.5, 1.5, 2.5, 0.5, 1.5, 2.5, 0.5])
+
+            with self.assertRaises(ValueError):
+                create_latency_model("trace:file={:s}".format(file_name), 0.0, 1.0, "dummy_3")
+
+    def test_create_latency_model(self):
+        """Tests creating the latency models from the specification strings."""
+        self.assertIsInstance(create_latency_model("uniform", 0.0, 1.0, "dummy"), UniformLatency)
+        self.assertIsInstance(create_latency_model("fixed:value=2", 0.0, 1.0, "dummy"), FixedLatency)
+        self.assertIsInstance(create_latency_model("LogNormal: median=2, sigma=0.5", 0.0, 1.0, "dummy"),
+                              LogNormalLatency)
+        self.assertIsInstance(create_latency_model("pareto:scale=1,shape=1.2", 0.0, 1.0, "dummy"), ParetoLatency)
+
+        for specification in ["unknown", "fixed", "fixed:value", "fixed:value=fast", "uniform:min=-1",
+                              "lognormal:median=0,sigma=1", "pareto:scale=1,shape=0", "trace:file=missing.csv"]:
+            with self.subTest(specification=specification):
+                with self.assertRaises((OSError, ValueError)):
+                    create_latency_model(specification, 0.0, 1.0, "dummy")
+
+
+
+class TestResentMessages(aiounittest.AsyncTestCase):
+    """Tests that the resent messages do not change the random outcomes of the seeded dummy component."""
+
+    async def run_component(self, resend: bool) -> Dict[int, Any]:
+        """Runs the dummy component for 20 epochs and returns the warnings from the first status message
+           for each epoch. If resend is True, each epoch message is sent twice."""
+        bus = LoopbackBus()
+        os.environ["RANDOM_SEED"] = "experiment"
+        os.environ["WARNING_CHANCE"] = "0.5"
+        os.environ["MIN_SLEEP_TIME"] = "0"
+        os.environ["MAX_SLEEP_TIME"] = "0"
+        try:
+            with loopback_rabbitmq_clients(bus):
+                component = DummyComponent(simulation_id=SIMULATION_ID, component_name="dummy_1")
+        finally:
+            for variable_name in ["RANDOM_SEED", "WARNING_CHANCE", "MIN_SLEEP_TIME", "MAX_SLEEP_TIME"]:
+                del os.environ[variable_name]
+
+        manager_client = LoopbackClient(bus)
+        status_messages: List[StatusMessage] = []
+
+        async def status_callback(message_object: Any, message_routing_key: str):
+            status_messages.append(message_object)
+
+        async def send_message(topic_name: str, message_bytes: bytes):
+            await manager_client.send_message(topic_name, message_bytes)
+            for _ in range(3):
+                await asyncio.sleep(0.01)
+                await bus.join()
+
+        manager_client.add_listener(["Status.Ready"], status_callback)
+        await component.start()
+        message_generator = MessageGenerator(SIMULATION_ID, "manager")
+        await send_message("SimState", message_generator.get_simulation_state_message(
+            SimulationState="running", TriggeringMessageIds=["manager-0"]).bytes())
+        for epoch_number in range(1, 21):
+            epoch_message_bytes = message_generator.get_epoch_message(
+                EpochNumber=epoch_number, TriggeringMessageIds=[status_messages[-1].message_id],
+                StartTime="2020-01-01T{:02d}:00:00.000Z".format(epoch_number - 1),
+                EndTime="2020-01-01T{:02d}:00:00.000Z".format(epoch_number)).bytes()
+            await send_message("Epoch", epoch_message_bytes)
+            if resend:
+                await send_message("Epoch.dummy_1", epoch_message_bytes)
+
+        # the status message was sent again for each resent epoch message
+        self.assertEqual(len(status_messages), 41 if resend else 21)
+        await send_message("SimState", message_generator.get_simulation_state_message(
+            SimulationState="stopped", TriggeringMessageIds=["manager-0"]).bytes())
+        await bus.close()
+
+        warnings: Dict[int, Any] = {}
+        for status_message in status_messages:
+            warnings.setdefault(status_message.epoch_number, status_message.warnings)
+        return warnings
+
+    async def test_outcomes_with_resends(self):
+        """Tests that the random outcomes are the same with and without resent messages."""
+        warnings = await self.run_component(resend=False)
+        self.assertEqual(len(warnings), 21)
+        self.assertTrue(any(warnings.values()))
+        self.assertFalse(all(warnings.values()))
+        self.assertEqual(await self.run_component(resend=True), warnings)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the payload profiles of the dummy component."""
+
+import json
+import os
+import tempfile
+import unittest
+
+from tools.messages import TimeSeriesBlock
+
+from dummy.profiles import PROFILES, compile_profile, load_payload_profile
+from dummy.random_series import (
+    DEFAULT_RANDOM_ATTRIBUTES, RANDOM_ATTRIBUTES, get_all_random_series_batch, get_latest_values,
+    get_random_initial_values)
+
+EPOCH_START_TIME = "2020-01-01T00:00:00.000Z"
+EPOCH_END_TIME = "2020-01-01T01:00:00.000Z"
+
+
+class TestPayloadProfiles(unittest.TestCase):
+    """Unit tests for the payload profiles."""
+
+    def test_generated_profile(self):
+        """Tests the attributes generated from the attribute counts."""
+        random_attributes = compile_profile({
+            "attributes": {"Power": RANDOM_ATTRIBUTES["Current"]},
+            "simple_attributes": 2,
+            "timeseries_attributes": 3,
+            "series_per_attribute": 4,
+            "time_parts": 10,
+            "unit": "kWh"
+        })
+        self.assertEqual(list(random_attributes.definitions),
+                         ["Power", "Value1", "Value2", "Series1", "Series2", "Series3"])
+        self.assertEqual(random_attributes.simple_attributes, ["Value1", "Value2"])
+        self.assertEqual(random_attributes.series_count, 3 + 3 * 4)
+        self.assertEqual(random_attributes.points_per_epoch, 2 + 3 * 7 + 3 * 4 * 11)
+        self.assertEqual(random_attributes.timeseries_attributes[1].sub_types, ["S1", "S2", "S3", "S4"])
+        self.assertEqual(random_attributes.timeseries_attributes[1].unit, "kWh")
+
+        start_values = get_random_initial_values(random_attributes)
+        random_series_collection = get_all_random_series_batch(
+            start_values, EPOCH_START_TIME, EPOCH_END_TIME, random_attributes=random_attributes)
+        self.assertEqual(set(random_series_collection), set(random_attributes.definitions))
+        series_block = random_series_collection["Series3"]
+        self.assertIsInstance(series_block, TimeSeriesBlock)
+        if isinstance(series_block, TimeSeriesBlock):
+            self.assertEqual(len(series_block.series["S4"].values), 11)
+        self.assertEqual(get_latest_values(random_series_collection, random_attributes), start_values)
+
+    def test_invalid_profiles(self):
+        """Tests that invalid profiles are rejected."""
+        for profile in [
+                [], {}, {"simple_attributes": -1}, {"simple_attributes": "many"}, {"unknown": 1},
+                {"timeseries_attributes": 1, "series_per_attribute": 0},
+                {"timeseries_attributes": 1, "time_parts": 0},
+                {"simple_attributes": 1, "min": 10, "max": 0},
+                {"attributes": {"Value": {"type": "unknown", "min": 0, "max": 1}}},
+                {"attributes": {"Value": {"type": "timeseries", "min": 0, "max": 1}}}]:
+            with self.subTest(profile=profile):
+                with self.assertRaises(ValueError):
+                    compile_profile(profile)  # type: ignore
+
+    def test_load_profile(self):
+        """Tests loading the profile by name, from JSON and from a file."""
+        self.assertIs(load_payload_profile(), DEFAULT_RANDOM_ATTRIBUTES)
+        self.assertIs(load_payload_profile("default"), DEFAULT_RANDOM_ATTRIBUTES)
+        self.assertEqual(load_payload_profile("large").points_per_epoch, 20 + 20 * 3 * 97)
+        self.assertEqual(load_payload_profile(json.dumps({"simple_attributes": 5})).simple_attributes,
+                         ["Value1", "Value2", "Value3", "Value4", "Value5"])
+        for profile in PROFILES:
+            with self.subTest(profile=profile):
+                self.assertGreater(load_payload_profile(profile).points_per_epoch, 0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "profile.json")
+            with open(file_name, mode="w", encoding="UTF-8") as profile_file:
+                json.dump({"timeseries_attributes": 1, "time_parts": 100}, profile_file)
+            random_attributes = load_payload_profile("small", file_name)
+            self.assertEqual(random_attributes.points_per_epoch, 3 * 101)
+
+            # the default profile is used for invalid profiles
+            self.assertIs(load_payload_profile("", os.path.join(directory, "missing.json")), DEFAULT_RANDOM_ATTRIBUTES)
+        self.assertIs(load_payload_profile("not a profile"), DEFAULT_RANDOM_ATTRIBUTES)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,9 +6,29 @@
 
 """Unit test module for the random time series for DummyComponent."""
 
+import copy
 import unittest
+from typing import List
+
+import numpy
+
+from tools.messages import TimeSeriesBlock
 
 # from dummy.random_series import get_all_random_series, get_latest_values, get_random_initial_values
+from dummy.random_series import (
+    ATTRIBUTE_TYPE_SIMPLE, N_DIGITS, RANDOM_ATTRIBUTES, get_all_random_series_batch, get_bounded_random_walk,
+    get_random_initial_values)
+
+
+def get_reference_series(uniform_values: List[float], start_value: float, min_value: float, max_value: float,
+                         max_difference: float) -> List[float]:
+    """Returns the random series generated like in get_random_series using the given uniform random values."""
+    random_series = [start_value]
+    for uniform_value in uniform_values:
+        low_value = max(random_series[-1] - max_difference, min_value)
+        high_value = min(random_series[-1] + max_difference, max_value)
+        random_series.append(round(low_value + (high_value - low_value) * uniform_value, N_DIGITS))
+    return random_series
 
 
 class TestDummyRandomSeries(unittest.TestCase):
@@ -23,5 +43,69 @@ class TestDummyRandomSeries(unittest.TestCase):
         # TODO: implement test_several_series for DummyRandomSeries
 
 
+class TestBatchRandomSeries(unittest.TestCase):
+    """Unit tests for the NumPy based random series generation."""
+
+    def test_bounded_random_walk(self):
+        """Tests that the vectorized random walk gives the same series as the step by step generation."""
+        generator = numpy.random.default_rng(12345)
+        for start_value, min_value, max_value, max_difference in [
+                (50.0, 0.0, 100.0, 5.0), (2.0, 0.0, 100.0, 5.0), (225.0, 150.0, 300.0, 10.0), (1.0, 0.0, 3.0, 2.5)]:
+            uniform_values = generator.random(2000)
+            random_series = get_bounded_random_walk(uniform_values, start_value, min_value, max_value, max_difference)
+            reference_series = get_reference_series(
+                uniform_values.tolist(), start_value, min_value, max_value, max_difference)
+
+            self.assertEqual(len(random_series), len(reference_series))
+            numpy.testing.assert_allclose(random_series, reference_series, rtol=0.0, atol=1e-9)
+            self.assertGreaterEqual(random_series.min(), min_value)
+            self.assertLessEqual(random_series.max(), max_value)
+
+    def test_all_random_series_batch(self):
+        """Tests the structure and the limits of the values generated for all the random attributes."""
+        start_values = get_random_initial_values()
+        previous_values = copy.deepcopy(start_values)
+        random_series_collection = get_all_random_series_batch(
+            start_values, "2020-01-01T00:00:00.000Z", "2020-01-01T01:00:00.000Z", numpy.random.default_rng(1))
+
+        self.assertEqual(set(random_series_collection), set(RANDOM_ATTRIBUTES))
+        for attribute_name, attribute_definition in RANDOM_ATTRIBUTES.items():
+            attribute_values = random_series_collection[attribute_name]
+            if attribute_definition["type"] == ATTRIBUTE_TYPE_SIMPLE:
+                self.assertIsInstance(attribute_values, float)
+                self.assertTrue(attribute_definition["min"] <= attribute_values <= attribute_definition["max"])
+                continue
+
+            self.assertIsInstance(attribute_values, TimeSeriesBlock)
+            self.assertEqual(len(attribute_values.time_index), attribute_definition["time_parts"] + 1)
+            self.assertEqual(set(attribute_values.series), set(attribute_definition["sub_types"]))
+            for sub_type, series_block in attribute_values.series.items():
+                values = series_block.values
+                self.assertEqual(len(values), attribute_definition["time_parts"] + 1)
+                self.assertEqual(values[0], previous_values[attribute_name][sub_type])
+                self.assertEqual(values[-1], start_values[attribute_name][sub_type])
+                for previous_value, value in zip(values[:-1], values[1:]):
+                    self.assertLessEqual(abs(value - previous_value), attribute_definition["max_difference"] + 1e-9)
+                    self.assertTrue(attribute_definition["min"] <= value <= attribute_definition["max"])
+                    self.assertEqual(value, round(value, N_DIGITS))
+
+    def test_seeded_generator(self):
+        """Tests that the same seed gives the same values."""
+        start_values = get_random_initial_values()
+        random_values = [
+            get_all_random_series_batch(
+                copy.deepcopy(start_values), "2020-01-01T00:00:00.000Z", "2020-01-01T01:00:00.000Z",
+                numpy.random.default_rng(7))
+            for _ in range(2)
+        ]
+        for attribute_name, attribute_definition in RANDOM_ATTRIBUTES.items():
+            if attribute_definition["type"] == ATTRIBUTE_TYPE_SIMPLE:
+                self.assertEqual(random_values[0][attribute_name], random_values[1][attribute_name])
+            else:
+                for sub_type in attribute_definition["sub_types"]:
+                    self.assertEqual(random_values[0][attribute_name].series[sub_type].values,
+                                     random_values[1][attribute_name].series[sub_type].values)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the CPU workloads of the dummy component."""
+
+import asyncio
+
+import aiounittest
+
+from dummy.workload import (
+    EXECUTOR_PROCESS, EXECUTOR_THREAD, BusyLoopWork, MatrixSolveWork, create_workload, run_matrix_solve,
+    shutdown_executors)
+
+
+class TestCpuWorkload(aiounittest.AsyncTestCase):
+    """Unit tests for the CpuWorkload class."""
+
+    def tearDown(self):
+        shutdown_executors()
+
+    async def test_busy_loop_does_not_block(self):
+        """Tests that the event loop keeps running while the busy loop is run in a process pool."""
+        workload = create_workload("busy:seconds=0.3", EXECUTOR_PROCESS)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        workload_result = await workload.run(1)
+        ticker_task.cancel()
+
+        self.assertGreaterEqual(workload_result.compute_time, 0.3)
+        self.assertGreaterEqual(workload_result.total_time, workload_result.compute_time)
+        self.assertGreater(ticks, 10)
+
+    async def test_shared_workers(self):
+        """Tests that the runs wait for a free worker when the executor is shared."""
+        workloads = [create_workload("busy:seconds=0.1", EXECUTOR_THREAD, workers=1) for _ in range(3)]
+        workload_results = await asyncio.gather(*(workload.run(1) for workload in workloads))
+        self.assertGreaterEqual(max(workload_result.total_time for workload_result in workload_results), 0.25)
+        self.assertTrue(all(workload_result.compute_time < 0.2 for workload_result in workload_results))
+
+    async def test_matrix_solve(self):
+        """Tests the matrix solve workload."""
+        workload_result = await create_workload("matrix:size=50,repeat=2", EXECUTOR_THREAD).run(3)
+        self.assertGreater(workload_result.compute_time, 0.0)
+        self.assertGreater(run_matrix_solve(10, 1, 1), 0.0)
+
+    def test_create_workload(self):
+        """Tests creating the workloads from the specification strings."""
+        self.assertEqual(create_workload("busy:seconds=1").executor_type, EXECUTOR_PROCESS)
+        self.assertIsInstance(BusyLoopWork(0.0)(1), float)
+        self.assertIsInstance(MatrixSolveWork(2, 1)(1), float)
+
+        for specification, executor_type, workers in [
+                ("unknown", EXECUTOR_PROCESS, 1),
+                ("busy", EXECUTOR_PROCESS, 1),
+                ("busy:seconds=-1", EXECUTOR_THREAD, 1),
+                ("matrix:size=0", EXECUTOR_THREAD, 1),
+                ("matrix:size=big", EXECUTOR_THREAD, 1),
+                ("busy:seconds=1", "gpu", 1),
+                ("busy:seconds=1", EXECUTOR_THREAD, 0)]:
+            with self.subTest(specification=specification, executor_type=executor_type, workers=workers):
+                with self.assertRaises(ValueError):
+                    create_workload(specification, executor_type, workers)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains the CPU workloads that the dummy component can run for each epoch.
+
+   The workload is given as a specification string "name:parameter=value,parameter=value" where the name is one of
+   - "busy" with parameter seconds: a pure Python busy loop that runs for the given time
+   - "matrix" with parameters size and repeat (default 1): solves a random linear system of the given size
+
+   The workload is run in a process pool or in a thread pool, so that the event loop of the component can handle
+   the messages while the work is being done. A pure Python busy loop holds the global interpreter lock,
+   so it should be run in a process pool. The executors are shared by all the components in the same process.
+"""
+
+import asyncio
+import concurrent.futures
+import time
+from typing import Callable, Dict, NamedTuple, Tuple
+
+import numpy
+
+from dummy.latency import parse_model_parameters
+
+WORKLOAD_BUSY = "busy"
+WORKLOAD_MATRIX = "matrix"
+
+EXECUTOR_PROCESS = "process"
+EXECUTOR_THREAD = "thread"
+
+# The shared executors with the executor type and the number of workers as keys.
+_EXECUTORS: Dict[Tuple[str, int], concurrent.futures.Executor] = {}
+
+
+class WorkloadResult(NamedTuple):
+    """The timing of one workload run in seconds."""
+    compute_time: float  # the time used by the work itself
+    total_time: float  # the time including the wait for a free worker
+
+
+def run_busy_loop(seconds: float) -> float:
+    """Runs a busy loop for the given time and returns the used time in seconds."""
+    start_time = time.perf_counter()
+    end_time = start_time + seconds
+    while time.perf_counter() < end_time:
+        pass
+    return time.perf_counter() - start_time
+
+
+def run_matrix_solve(size: int, repeat: int, seed: int) -> float:
+    """Solves repeat random linear systems of the given size and returns the used time in seconds."""
+    start_time = time.perf_counter()
+    generator = numpy.random.default_rng(seed)
+    for _ in range(repeat):
+        # adding size to the diagonal makes the matrix diagonally dominant and thus not singular
+        matrix = generator.random((size, size)) + size * numpy.eye(size)
+        numpy.linalg.solve(matrix, generator.random(size))
+    return time.perf_counter() - start_time
+
+
+def get_executor(executor_type: str, workers: int) -> concurrent.futures.Executor:
+    """Returns the shared executor of the given type with the given number of workers."""
+    executor = _EXECUTORS.get((executor_type, workers), None)
+    if executor is None:
+        if executor_type == EXECUTOR_PROCESS:
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        _EXECUTORS[(executor_type, workers)] = executor
+    return executor
+
+
+def shutdown_executors():
+    """Shuts down all the shared executors."""
+    for executor in _EXECUTORS.values():
+        executor.shutdown(wait=False)
+    _EXECUTORS.clear()
+
+
+class CpuWorkload:
+    """A CPU workload that is run in a shared executor."""
+
+    def __init__(self, work_function: Callable[[int], float], executor_type: str = EXECUTOR_PROCESS,
+                 workers: int = 1):
+        """The work function is called with a seed and it should return the used time in seconds.
+           The function must be defined at the module level if a process pool is used."""
+        self.__work_function = work_function
+        self.__executor_type = executor_type
+        self.__workers = workers
+
+    @property
+    def executor_type(self) -> str:
+        """The executor type, either "process" or "thread"."""
+        return self.__executor_type
+
+    async def run(self, seed: int) -> WorkloadResult:
+        """Runs the workload in the executor without blocking the event loop and returns the timing."""
+        start_time = time.perf_counter()
+        compute_time = await asyncio.get_running_loop().run_in_executor(
+            get_executor(self.__executor_type, self.__workers), self.__work_function, seed)
+        return WorkloadResult(compute_time, time.perf_counter() - start_time)
+
+
+class BusyLoopWork:
+    """Busy loop work function that can be given to a process pool."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def __call__(self, seed: int) -> float:
+        return run_busy_loop(self.seconds)
+
+
+class MatrixSolveWork:
+    """Matrix solve work function that can be given to a process pool."""
+
+    def __init__(self, size: int, repeat: int):
+        self.size = size
+        self.repeat = repeat
+
+    def __call__(self, seed: int) -> float:
+        return run_matrix_solve(self.size, self.repeat, seed)
+
+
+def create_workload(specification: str, executor_type: str = EXECUTOR_PROCESS, workers: int = 1) -> CpuWorkload:
+    """Returns the workload for the given specification "name:parameter=value,...".
+       Raises ValueError if the specification is not valid."""
+    if executor_type not in (EXECUTOR_PROCESS, EXECUTOR_THREAD):
+        raise ValueError("Unknown workload executor: {:s}".format(executor_type))
+    if workers < 1:
+        raise ValueError("The number of workload workers must be positive")
+
+    workload_name, _, parameter_string = specification.partition(":")
+    workload_name = workload_name.strip().lower()
+    parameters = parse_model_parameters(parameter_string)
+    try:
+        if workload_name == WORKLOAD_BUSY:
+            seconds = float(parameters["seconds"])
+            if seconds < 0.0:
+                raise ValueError("The busy loop duration cannot be negative")
+            return CpuWorkload(BusyLoopWork(seconds), executor_type, workers)
+        if workload_name == WORKLOAD_MATRIX:
+            size = int(parameters["size"])
+            repeat = int(parameters.get("repeat", "1"))
+            if size < 1 or repeat < 1:
+                raise ValueError("The matrix size and the number of repeats must be positive")
+            return CpuWorkload(MatrixSolveWork(size, repeat), executor_type, workers)
+    except KeyError as error:
+        raise ValueError("Missing parameter for the {:s} workload: {}".format(workload_name, error))
+    raise ValueError("Unknown workload: {:s}".format(workload_name))
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Benchmark for the listener recording mode.
+
+   Compares the sustained message rate of the recording mode to the logging of the decoded messages that
+   the listener uses by default. The logging path decodes each message, re-encodes it with the json method
+   and writes it through a Python logger to a file, like the listener does. The recording path writes
+   the raw message bytes using the MessageRecorder. No message bus is involved in either path.
+
+   Usage: python3 -m listener.benchmarks.recording --messages 200000 --attributes 20 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from loopback.bus import LoopbackBus
+from listener.recorder import MessageRecorder, get_recording_files
+
+BENCHMARK_SIMULATION_ID = "2021-01-01T00:00:00.000Z"
+DEFAULT_MESSAGES = 200000
+DEFAULT_ATTRIBUTES = 20
+
+
+def get_result_messages(message_count: int, attribute_count: int) -> List[Tuple[str, bytes]]:
+    """Returns the given number of result messages with the given number of result attributes
+       as (routing key, message bytes) pairs."""
+    messages = []
+    for index in range(message_count):
+        component_name = "component_{:d}".format(index % 100)
+        message_json: Dict[str, Any] = {
+            "Type": "Result",
+            "SimulationId": BENCHMARK_SIMULATION_ID,
+            "SourceProcessId": component_name,
+            "MessageId": "{:s}-{:d}".format(component_name, index // 100 + 1),
+            "Timestamp": "2021-01-01T00:00:00.000Z",
+            "EpochNumber": index // 100 + 1,
+            "TriggeringMessageIds": ["manager-{:d}".format(index // 100 + 1)]
+        }
+        for attribute_index in range(attribute_count):
+            message_json["Attribute{:d}".format(attribute_index)] = index * 0.001 + attribute_index
+        messages.append(("Result.{:s}".format(component_name), json.dumps(message_json).encode("UTF-8")))
+    return messages
+
+
+def run_logging(messages: List[Tuple[str, bytes]], directory: str) -> float:
+    """Decodes and logs the given messages like the default listener and returns the used time in seconds."""
+    bus = LoopbackBus()
+    logger = logging.Logger("listener_benchmark", logging.INFO)
+    log_handler = logging.FileHandler(os.path.join(directory, "listener.log"), encoding="UTF-8")
+    log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(log_handler)
+
+    start_time = time.perf_counter()
+    for routing_key, message_bytes in messages:
+        message_object = bus.decode_message(message_bytes)
+        if message_object.simulation_id == BENCHMARK_SIMULATION_ID:
+            logger.info("{:s} : {:s}".format(routing_key, str(message_object.json())))
+    log_handler.close()
+    return time.perf_counter() - start_time
+
+
+async def run_recording(messages: List[Tuple[str, bytes]], directory: str) -> float:
+    """Records the given messages and returns the used time in seconds including the final flush."""
+    recorder = MessageRecorder(os.path.join(directory, "recording.rec"))
+    recorder.start()
+
+    start_time = time.perf_counter()
+    for routing_key, message_bytes in messages:
+        recorder.record(routing_key, message_bytes)
+    await recorder.close()
+    return time.perf_counter() - start_time
+
+
+def get_result(mode: str, messages: List[Tuple[str, bytes]], used_time: float, output_bytes: int) -> Dict[str, Any]:
+    """Returns the benchmark result for one mode."""
+    message_bytes = sum(len(message_bytes) for _, message_bytes in messages)
+    return {
+        "mode": mode,
+        "messages": len(messages),
+        "seconds": used_time,
+        "messages_per_second": len(messages) / used_time,
+        "input_megabytes_per_second": message_bytes / used_time / 1024 ** 2,
+        "output_megabytes": output_bytes / 1024 ** 2
+    }
+
+
+def run_benchmarks(message_count: int, attribute_count: int) -> List[Dict[str, Any]]:
+    """Runs the logging and the recording benchmarks and returns the results."""
+    messages = get_result_messages(message_count, attribute_count)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        used_time = run_logging(messages, directory)
+        results.append(get_result(
+            "logging", messages, used_time, os.path.getsize(os.path.join(directory, "listener.log"))))
+
+        used_time = asyncio.run(run_recording(messages, directory))
+        results.append(get_result(
+            "recording", messages, used_time,
+            sum(os.path.getsize(file_name) for file_name in get_recording_files(
+                os.path.join(directory, "recording.rec")))))
+    return results
+
+
+def main(arguments: Optional[List[str]] = None):
+    """Runs the benchmarks and writes the results in JSON format."""
+    parser = argparse.ArgumentParser(description="Listener recording benchmark")
+    parser.add_argument("--messages", type=int, default=DEFAULT_MESSAGES, help="the number of messages")
+    parser.add_argument("--attributes", type=int, default=DEFAULT_ATTRIBUTES,
+                        help="the number of result attributes in each message")
+    parser.add_argument("--output", default="", help="the output file, standard output is used by default")
+    options = parser.parse_args(arguments)
+
+    results = {
+        "benchmark": "listener_recording",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": run_benchmarks(options.messages, options.attributes)
+    }
+
+    if options.output:
+        with open(options.output, mode="w", encoding="UTF-8") as output_file:
+            json.dump(results, output_file, indent=4)
+    else:
+        print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
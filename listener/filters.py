@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains helpers for selecting the messages the listener handles before the messages are decoded.
+
+   The topic filters are given to the message bus as binding keys, so the broker only delivers the messages
+   from the selected topics. The simulation filter checks the SimulationId attribute directly from the raw
+   message bytes, so the messages from the other simulations can be discarded without decoding them.
+"""
+
+import json
+import re
+from typing import List
+
+DEFAULT_TOPICS = "#"
+
+
+def parse_topics(topics: str) -> List[str]:
+    """Returns the list of binding keys from the given comma separated list.
+       Returns the binding key for all topics, if the list is empty."""
+    topic_list = [
+        topic.strip()
+        for topic in topics.split(",")
+        if topic.strip()
+    ]
+    return topic_list if topic_list else [DEFAULT_TOPICS]
+
+
+class SimulationIdFilter:
+    """Checks whether a raw message belongs to the given simulation without decoding the message."""
+
+    def __init__(self, simulation_id: str):
+        self.__simulation_id = simulation_id
+        # the value is searched in the JSON encoded form, so the possible escape characters are taken into account
+        self.__pattern = re.compile(
+            rb'"SimulationId"\s*:\s*' + re.escape(json.dumps(simulation_id).encode("UTF-8")) + rb'\s*[,}]')
+        self.__accepted = 0
+        self.__rejected = 0
+
+    @property
+    def simulation_id(self) -> str:
+        """The simulation id for the accepted messages."""
+        return self.__simulation_id
+
+    @property
+    def accepted(self) -> int:
+        """The number of accepted messages."""
+        return self.__accepted
+
+    @property
+    def rejected(self) -> int:
+        """The number of rejected messages."""
+        return self.__rejected
+
+    def matches(self, message_bytes: bytes) -> bool:
+        """Returns True, if the given message has the simulation id of the filter."""
+        if self.__pattern.search(message_bytes) is None:
+            self.__rejected += 1
+            return False
+        self.__accepted += 1
+        return True
@@ -4,28 +4,57 @@
 # This source code is licensed under the MIT license. See LICENSE in the repository root directory.
 # Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
 
-"""This module contains a listener simulation component that prints out all messages from the message bus."""
+"""This module contains a listener simulation component that prints out all messages from the message bus.
+   In the recording mode, the listener writes the raw messages to recording files instead (see listener.recorder).
+   In the statistics mode, the listener only keeps aggregated message statistics (see listener.statistics)."""
 
 import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, cast
 
 from tools.clients import RabbitmqClient
 from tools.messages import AbstractMessage
 from tools.tools import FullLogger, load_environmental_variables
 
+from loopback.bus import decode_message
+from listener.filters import DEFAULT_TOPICS, SimulationIdFilter, parse_topics
+from listener.raw_consumer import create_raw_consumer
+from listener.recorder import MessageRecorder
+from listener.statistics import ListenerStatistics
+
 LOGGER = FullLogger(__name__)
 
 __SIMULATION_ID = "SIMULATION_ID"
+__LISTENER_TOPICS = "LISTENER_TOPICS"
+__LISTENER_ALL_SIMULATIONS = "LISTENER_ALL_SIMULATIONS"
+__LISTENER_RECORD_FILE = "LISTENER_RECORD_FILE"
+__LISTENER_RECORD_MAX_FILE_SIZE = "LISTENER_RECORD_MAX_FILE_SIZE"
+__LISTENER_RECORD_FLUSH_SIZE = "LISTENER_RECORD_FLUSH_SIZE"
+__LISTENER_RECORD_FLUSH_INTERVAL = "LISTENER_RECORD_FLUSH_INTERVAL"
+__LISTENER_STATISTICS = "LISTENER_STATISTICS"
+__LISTENER_STATISTICS_INTERVAL = "LISTENER_STATISTICS_INTERVAL"
+__LISTENER_STATISTICS_FILE = "LISTENER_STATISTICS_FILE"
+__LISTENER_STATISTICS_SAMPLES = "LISTENER_STATISTICS_SAMPLES"
+__LISTENER_STATISTICS_EPOCHS = "LISTENER_STATISTICS_EPOCHS"
 
 
 class ListenerComponent:
-    """Class for the message bus listener component."""
-    LISTENED_TOPICS = "#"
+    """Class for the message bus listener component.
+       The topics are given to the message bus as binding keys, so only the messages from those topics are received.
+       If no message bus client is given, the messages are given to raw_message_handler by a raw message consumer.
+       The raw messages are checked with the simulation filter, if it is given, before decoding them."""
+    LISTENED_TOPICS = DEFAULT_TOPICS
 
-    def __init__(self, rabbitmq_client: RabbitmqClient, simulation_id: str):
+    def __init__(self, rabbitmq_client: Optional[RabbitmqClient], simulation_id: str,
+                 topics: Optional[List[str]] = None, simulation_filter: Optional[SimulationIdFilter] = None):
         self.__rabbitmq_client = rabbitmq_client
         self.__simulation_id = simulation_id
+        self.__simulation_filter = simulation_filter
 
-        self.__rabbitmq_client.add_listener(ListenerComponent.LISTENED_TOPICS, self.simulation_message_handler)
+        if self.__rabbitmq_client is not None:
+            self.__rabbitmq_client.add_listener(
+                ListenerComponent.LISTENED_TOPICS if topics is None else topics, self.simulation_message_handler)
 
     @property
     def simulation_id(self):
@@ -46,11 +75,137 @@ class ListenerComponent:
             LOGGER.warning("Received '{:s}' message when expecting for '{:s}' message".format(
                 str(type(message_object)), str(AbstractMessage)))
 
+    def raw_message_handler(self, message_bytes: bytes, message_routing_key: str):
+        """Prints out the received message, if it passes the simulation filter.
+           The messages from the other simulations are discarded without decoding them."""
+        if self.__simulation_filter is not None and not self.__simulation_filter.matches(message_bytes):
+            return
+
+        message_object = decode_message(message_bytes)
+        if isinstance(message_object, AbstractMessage):
+            LOGGER.info("{:s} : {:s}".format(message_routing_key, str(message_object.json())))
+        else:
+            LOGGER.warning("Received '{:s}' message when expecting for '{:s}' message".format(
+                str(type(message_object)), str(AbstractMessage)))
+
+
+class RecordingListenerComponent:
+    """Class for the message bus listener component that records the raw messages without decoding them.
+       If a simulation filter is given, only the messages for the filter's simulation are recorded."""
+    LISTENED_TOPICS = DEFAULT_TOPICS
+
+    def __init__(self, recorder: MessageRecorder, simulation_id: str,
+                 simulation_filter: Optional[SimulationIdFilter] = None):
+        self.__recorder = recorder
+        self.__simulation_id = simulation_id
+        self.__simulation_filter = simulation_filter
+
+    @property
+    def simulation_id(self):
+        """The simulation ID for the simulation."""
+        return self.__simulation_id
+
+    @property
+    def recorder(self) -> MessageRecorder:
+        """The recorder that is used to write the messages."""
+        return self.__recorder
+
+    def raw_message_handler(self, message_bytes: bytes, message_routing_key: str):
+        """Records the received message as it is."""
+        if self.__simulation_filter is None or self.__simulation_filter.matches(message_bytes):
+            self.__recorder.record(message_routing_key, message_bytes)
+
+
+class StatisticsListenerComponent:
+    """Class for the message bus listener component that keeps aggregated statistics of the raw messages.
+       A summary of the statistics is logged every interval seconds and when the simulation has stopped.
+       If a file name is given, the summaries are also appended to the file in the JSON lines format."""
+
+    def __init__(self, statistics: ListenerStatistics, simulation_id: str, interval: float = 10.0,
+                 file_name: str = "", simulation_filter: Optional[SimulationIdFilter] = None):
+        self.__statistics = statistics
+        self.__simulation_id = simulation_id
+        self.__interval = interval
+        self.__file_name = file_name
+        self.__simulation_filter = simulation_filter
+        self.__summary_task: Optional[asyncio.Task] = None
+        self.__final_summary_written = False
+
+    @property
+    def simulation_id(self):
+        """The simulation ID for the simulation."""
+        return self.__simulation_id
+
+    @property
+    def statistics(self) -> ListenerStatistics:
+        """The collected message statistics."""
+        return self.__statistics
+
+    def start(self):
+        """Starts writing the periodic summaries."""
+        if self.__summary_task is None and self.__interval > 0:
+            self.__summary_task = asyncio.create_task(self.__write_summaries())
+
+    async def stop(self):
+        """Stops the periodic summaries and writes the final summary if it has not been written yet."""
+        if self.__summary_task is not None:
+            self.__summary_task.cancel()
+            try:
+                await self.__summary_task
+            except asyncio.CancelledError:
+                pass
+            self.__summary_task = None
+        if not self.__final_summary_written:
+            self.write_summary(final=True)
+
+    def raw_message_handler(self, message_bytes: bytes, message_routing_key: str):
+        """Adds the received message to the statistics."""
+        if self.__simulation_filter is not None and not self.__simulation_filter.matches(message_bytes):
+            return
+        self.__statistics.add_message(message_routing_key, message_bytes, time.perf_counter())
+        if self.__statistics.simulation_stopped and not self.__final_summary_written:
+            self.write_summary(final=True)
+
+    def write_summary(self, final: bool = False) -> Dict[str, Any]:
+        """Writes a summary of the statistics to the log and to the statistics file and returns the summary."""
+        summary = dict(
+            SimulationId=self.__simulation_id,
+            Final=final,
+            **self.__statistics.get_summary(time.perf_counter()))
+        summary_json = json.dumps(summary)
+        LOGGER.info("Message statistics: {:s}".format(summary_json))
+        if self.__file_name:
+            try:
+                with open(self.__file_name, mode="a", encoding="UTF-8") as statistics_file:
+                    statistics_file.write(summary_json + "\n")
+            except OSError as file_error:
+                LOGGER.error("Could not write to the statistics file {:s}: {}".format(self.__file_name, file_error))
+        if final:
+            self.__final_summary_written = True
+        return summary
+
+    async def __write_summaries(self):
+        """Writes a summary every interval seconds."""
+        while True:
+            await asyncio.sleep(self.__interval)
+            self.write_summary()
+
 
 async def start_listener_component():
     """Start a listener component for the simulation platform."""
     env_variables = load_environmental_variables(
-        (__SIMULATION_ID, str)
+        (__SIMULATION_ID, str),
+        (__LISTENER_TOPICS, str, DEFAULT_TOPICS),
+        (__LISTENER_ALL_SIMULATIONS, bool, False),
+        (__LISTENER_RECORD_FILE, str, ""),
+        (__LISTENER_RECORD_MAX_FILE_SIZE, int, 256 * 1024 ** 2),
+        (__LISTENER_RECORD_FLUSH_SIZE, int, 1024 ** 2),
+        (__LISTENER_RECORD_FLUSH_INTERVAL, float, 1.0),
+        (__LISTENER_STATISTICS, bool, False),
+        (__LISTENER_STATISTICS_INTERVAL, float, 10.0),
+        (__LISTENER_STATISTICS_FILE, str, ""),
+        (__LISTENER_STATISTICS_SAMPLES, int, 1000),
+        (__LISTENER_STATISTICS_EPOCHS, int, 10)
     )
 
     simulation_id = env_variables[__SIMULATION_ID]
@@ -58,9 +213,58 @@ async def start_listener_component():
         LOGGER.error("No simulation id found.")
         return
 
-    ListenerComponent(RabbitmqClient(), simulation_id)
-    while True:
-        await asyncio.sleep(3600)
+    topics = parse_topics(cast(str, env_variables[__LISTENER_TOPICS]))
+    simulation_filter = None if env_variables[__LISTENER_ALL_SIMULATIONS] else SimulationIdFilter(simulation_id)
+    record_file = cast(str, env_variables[__LISTENER_RECORD_FILE])
+    if record_file:
+        recorder = MessageRecorder(
+            file_name=record_file,
+            max_file_size=cast(int, env_variables[__LISTENER_RECORD_MAX_FILE_SIZE]),
+            flush_size=cast(int, env_variables[__LISTENER_RECORD_FLUSH_SIZE]),
+            flush_interval=cast(float, env_variables[__LISTENER_RECORD_FLUSH_INTERVAL]))
+        recorder.start()
+        listener = RecordingListenerComponent(recorder, simulation_id, simulation_filter)
+        consumer = create_raw_consumer(topics, listener.raw_message_handler)
+        await consumer.start()
+        try:
+            while True:
+                await asyncio.sleep(3600)
+        finally:
+            await consumer.close()
+            await recorder.close()
+            if simulation_filter is not None:
+                LOGGER.info("Discarded {:d} messages from other simulations".format(simulation_filter.rejected))
+
+    elif env_variables[__LISTENER_STATISTICS]:
+        statistics_listener = StatisticsListenerComponent(
+            statistics=ListenerStatistics(
+                sample_size=cast(int, env_variables[__LISTENER_STATISTICS_SAMPLES]),
+                max_epochs=cast(int, env_variables[__LISTENER_STATISTICS_EPOCHS])),
+            simulation_id=simulation_id,
+            interval=cast(float, env_variables[__LISTENER_STATISTICS_INTERVAL]),
+            file_name=cast(str, env_variables[__LISTENER_STATISTICS_FILE]),
+            simulation_filter=simulation_filter)
+        statistics_listener.start()
+        consumer = create_raw_consumer(topics, statistics_listener.raw_message_handler)
+        await consumer.start()
+        try:
+            while True:
+                await asyncio.sleep(3600)
+        finally:
+            await consumer.close()
+            await statistics_listener.stop()
+
+    else:
+        listener = ListenerComponent(None, simulation_id, topics, simulation_filter)
+        consumer = create_raw_consumer(topics, listener.raw_message_handler)
+        await consumer.start()
+        try:
+            while True:
+                await asyncio.sleep(3600)
+        finally:
+            await consumer.close()
+            if simulation_filter is not None:
+                LOGGER.info("Discarded {:d} messages from other simulations".format(simulation_filter.rejected))
 
 
 if __name__ == "__main__":
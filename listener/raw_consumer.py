@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains a RabbitMQ consumer that gives the received messages to the callback without decoding them.
+
+   The consumer uses the same RABBITMQ_* environmental variables for the connection settings as the RabbitmqClient
+   from the simulation-tools library.
+"""
+
+import ssl
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
+
+import aio_pika
+
+from tools.tools import FullLogger, load_environmental_variables
+
+LOGGER = FullLogger(__name__)
+
+__RABBITMQ_HOST = "RABBITMQ_HOST"
+__RABBITMQ_PORT = "RABBITMQ_PORT"
+__RABBITMQ_LOGIN = "RABBITMQ_LOGIN"
+__RABBITMQ_PASSWORD = "RABBITMQ_PASSWORD"
+__RABBITMQ_SSL = "RABBITMQ_SSL"
+__RABBITMQ_SSL_VERSION = "RABBITMQ_SSL_VERSION"
+__RABBITMQ_EXCHANGE = "RABBITMQ_EXCHANGE"
+__RABBITMQ_EXCHANGE_AUTODELETE = "RABBITMQ_EXCHANGE_AUTODELETE"
+__RABBITMQ_EXCHANGE_DURABLE = "RABBITMQ_EXCHANGE_DURABLE"
+
+# the callback is called with the message body and the routing key
+RawMessageCallback = Callable[[bytes, str], None]
+
+
+class RawMessageConsumer:
+    """Consumes the messages from the given topics of a RabbitMQ topic exchange.
+       The callback is called synchronously for each message with the unmodified message body and the routing key,
+       so the callback should not block. The messages are consumed without acknowledgements."""
+
+    def __init__(self, topics: List[str], callback: RawMessageCallback, host: str = "localhost", port: int = 5672,
+                 login: str = "", password: str = "", use_ssl: bool = False, ssl_version: str = "PROTOCOL_TLS",
+                 exchange: str = "", exchange_autodelete: bool = False, exchange_durable: bool = False,
+                 prefetch_count: int = 0):
+        self.__topics = topics
+        self.__callback = callback
+        self.__connection_parameters: Dict[str, Any] = {
+            "host": host,
+            "port": port,
+            "login": login,
+            "password": password,
+            "ssl": use_ssl
+        }
+        if use_ssl:
+            self.__connection_parameters["ssl_options"] = {"ssl_version": getattr(ssl, ssl_version)}
+        self.__exchange_name = exchange
+        self.__exchange_autodelete = exchange_autodelete
+        self.__exchange_durable = exchange_durable
+        self.__prefetch_count = prefetch_count
+
+        self.__connection: Optional[aio_pika.RobustConnection] = None
+
+    async def start(self):
+        """Connects to the message bus and starts consuming the messages."""
+        self.__connection = await aio_pika.connect_robust(**self.__connection_parameters)
+        channel = await self.__connection.channel()
+        if self.__prefetch_count > 0:
+            await channel.set_qos(prefetch_count=self.__prefetch_count)
+        exchange = await channel.declare_exchange(
+            self.__exchange_name, aio_pika.ExchangeType.TOPIC,
+            auto_delete=self.__exchange_autodelete, durable=self.__exchange_durable)
+
+        queue = await channel.declare_queue("", exclusive=True)
+        for topic in self.__topics:
+            await queue.bind(exchange, routing_key=topic)
+        await queue.consume(self.__on_message, no_ack=True)
+        LOGGER.info("Consuming raw messages from topics {:s} at exchange {:s}".format(
+            ", ".join(self.__topics), self.__exchange_name))
+
+    async def close(self):
+        """Closes the connection to the message bus."""
+        if self.__connection is not None:
+            await self.__connection.close()
+            self.__connection = None
+
+    def __on_message(self, message: aio_pika.IncomingMessage):
+        """Forwards the received message to the callback."""
+        self.__callback(message.body, message.routing_key)
+
+
+def get_rabbitmq_environmental_variables() -> List[Tuple[Any, ...]]:
+    """Returns the definitions for the environmental variables used for the RabbitMQ connection."""
+    return [
+        (__RABBITMQ_HOST, str, "localhost"),
+        (__RABBITMQ_PORT, int, 5672),
+        (__RABBITMQ_LOGIN, str, ""),
+        (__RABBITMQ_PASSWORD, str, ""),
+        (__RABBITMQ_SSL, bool, False),
+        (__RABBITMQ_SSL_VERSION, str, "PROTOCOL_TLS"),
+        (__RABBITMQ_EXCHANGE, str, ""),
+        (__RABBITMQ_EXCHANGE_AUTODELETE, bool, False),
+        (__RABBITMQ_EXCHANGE_DURABLE, bool, False)
+    ]
+
+
+def create_raw_consumer(topics: List[str], callback: RawMessageCallback,
+                        prefetch_count: int = 0) -> RawMessageConsumer:
+    """Creates a new raw message consumer using the connection settings from the environmental variables."""
+    env_variables = load_environmental_variables(*get_rabbitmq_environmental_variables())
+    return RawMessageConsumer(
+        topics=topics,
+        callback=callback,
+        host=cast(str, env_variables[__RABBITMQ_HOST]),
+        port=cast(int, env_variables[__RABBITMQ_PORT]),
+        login=cast(str, env_variables[__RABBITMQ_LOGIN]),
+        password=cast(str, env_variables[__RABBITMQ_PASSWORD]),
+        use_ssl=cast(bool, env_variables[__RABBITMQ_SSL]),
+        ssl_version=cast(str, env_variables[__RABBITMQ_SSL_VERSION]),
+        exchange=cast(str, env_variables[__RABBITMQ_EXCHANGE]),
+        exchange_autodelete=cast(bool, env_variables[__RABBITMQ_EXCHANGE_AUTODELETE]),
+        exchange_durable=cast(bool, env_variables[__RABBITMQ_EXCHANGE_DURABLE]),
+        prefetch_count=prefetch_count)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains a recorder that writes the raw messages from the message bus to rotating binary files.
+
+   Each recording file starts with the 8 byte magic header RECORDING_FILE_MAGIC. It is followed by the records
+   that each consist of a fixed size record header and the record data. The record header contains the receive
+   timestamp as seconds since the epoch (little-endian double), the length of the routing key in bytes
+   (unsigned short) and the length of the message body in bytes (unsigned int). The record data contains
+   the routing key in UTF-8 encoding followed by the unmodified message body.
+"""
+
+import asyncio
+import glob
+import os
+import struct
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from tools.tools import FullLogger
+
+LOGGER = FullLogger(__name__)
+
+RECORDING_FILE_MAGIC = b"SIMREC01"
+RECORD_HEADER = struct.Struct("<dHI")
+
+# the receive timestamp, the routing key and the message body
+Record = Tuple[float, str, bytes]
+
+
+class MessageRecorder:
+    """Records raw messages to binary files. The records are collected to a buffer that is written to the file
+       when the buffer size reaches flush_size bytes or at least every flush_interval seconds. When the current
+       file has grown to max_file_size bytes, the recording continues in a new file. The files are named
+       by adding a running index before the file extension, e.g. "recording.00000.rec"."""
+
+    def __init__(self, file_name: str, max_file_size: int = 256 * 1024 ** 2, flush_size: int = 1024 ** 2,
+                 flush_interval: float = 1.0):
+        self.__recording_name = file_name
+        self.__max_file_size = max_file_size
+        self.__flush_size = flush_size
+        self.__flush_interval = flush_interval
+
+        self.__buffer = bytearray()
+        self.__file_index = -1
+        self.__file_name = ""
+        self.__file_size = 0
+        self.__recording_file = None
+        self.__flush_task: Optional[asyncio.Task] = None
+
+        self.__messages = 0
+        self.__message_bytes = 0
+
+    @property
+    def file_name(self) -> str:
+        """The name of the current recording file. Empty string, if the recording has not been started."""
+        return self.__file_name
+
+    @property
+    def messages(self) -> int:
+        """The number of recorded messages."""
+        return self.__messages
+
+    @property
+    def message_bytes(self) -> int:
+        """The total size of the recorded message bodies in bytes."""
+        return self.__message_bytes
+
+    def start(self):
+        """Opens the first recording file and, if called within a running event loop,
+           starts the task that flushes the buffer periodically."""
+        if self.__recording_file is None:
+            self.__open_next_file()
+        try:
+            if self.__flush_task is None and self.__flush_interval > 0:
+                self.__flush_task = asyncio.get_running_loop().create_task(self.__flush_periodically())
+        except RuntimeError:
+            LOGGER.debug("No running event loop, the recording buffer is flushed only based on its size")
+
+    def record(self, routing_key: str, message_bytes: bytes, timestamp: Optional[float] = None):
+        """Adds the given message to the recording buffer. Flushes the buffer if it has reached the flush size."""
+        routing_key_bytes = routing_key.encode("UTF-8")
+        self.__buffer += RECORD_HEADER.pack(
+            time.time() if timestamp is None else timestamp, len(routing_key_bytes), len(message_bytes))
+        self.__buffer += routing_key_bytes
+        self.__buffer += message_bytes
+        self.__messages += 1
+        self.__message_bytes += len(message_bytes)
+
+        if len(self.__buffer) >= self.__flush_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered records to the recording file.
+           A new file is started if the current file has reached the size limit."""
+        if not self.__buffer:
+            return
+        if self.__recording_file is None or self.__file_size >= self.__max_file_size:
+            self.__open_next_file()
+
+        # the buffer is cleared also after a write error so that the memory usage stays bounded
+        buffer, self.__buffer = self.__buffer, bytearray()
+        try:
+            self.__recording_file.write(buffer)
+            self.__recording_file.flush()
+        except OSError as file_error:
+            LOGGER.error("Could not write to the recording file {:s}: {}".format(self.__file_name, file_error))
+            return
+        self.__file_size += len(buffer)
+
+    async def close(self):
+        """Stops the periodic flushing, writes the remaining records and closes the recording file."""
+        if self.__flush_task is not None:
+            self.__flush_task.cancel()
+            try:
+                await self.__flush_task
+            except asyncio.CancelledError:
+                pass
+            self.__flush_task = None
+
+        self.flush()
+        self.__close_file()
+        LOGGER.info("Recorded {:d} messages with {:d} bytes".format(self.__messages, self.__message_bytes))
+
+    async def __flush_periodically(self):
+        """Flushes the recording buffer every flush interval."""
+        while True:
+            await asyncio.sleep(self.__flush_interval)
+            self.flush()
+
+    def __open_next_file(self):
+        """Closes the current recording file and opens the next one."""
+        self.__close_file()
+        self.__file_index += 1
+        self.__file_name = get_recording_file_name(self.__recording_name, self.__file_index)
+        self.__recording_file = open(self.__file_name, mode="wb")
+        self.__recording_file.write(RECORDING_FILE_MAGIC)
+        self.__recording_file.flush()
+        self.__file_size = len(RECORDING_FILE_MAGIC)
+        LOGGER.info("Recording messages to {:s}".format(self.__file_name))
+
+    def __close_file(self):
+        """Closes the current recording file."""
+        if self.__recording_file is not None:
+            self.__recording_file.close()
+            self.__recording_file = None
+
+
+def get_recording_file_name(file_name: str, file_index: int) -> str:
+    """Returns the name of the recording file with the given index."""
+    base_name, extension = os.path.splitext(file_name)
+    return "{:s}.{:05d}{:s}".format(base_name, file_index, extension)
+
+
+def get_recording_files(file_name: str) -> List[str]:
+    """Returns the names of the recording files that were created using the given file name in the recording order.
+       If the given file is itself a recording file, returns only that file."""
+    base_name, extension = os.path.splitext(file_name)
+    if os.path.isfile(file_name):
+        return [file_name]
+    return sorted(glob.glob("{:s}.[0-9][0-9][0-9][0-9][0-9]{:s}".format(glob.escape(base_name), extension)))
+
+
+def read_records(file_name: str) -> Iterator[Record]:
+    """Reads the records from the given recording file. An incomplete record at the end of the file,
+       e.g. from an interrupted recording, is ignored. Raises ValueError, if the file is not a recording file."""
+    with open(file_name, mode="rb") as recording_file:
+        if recording_file.read(len(RECORDING_FILE_MAGIC)) != RECORDING_FILE_MAGIC:
+            raise ValueError("{:s} is not a recording file".format(file_name))
+
+        while True:
+            record_header = recording_file.read(RECORD_HEADER.size)
+            if len(record_header) < RECORD_HEADER.size:
+                return
+            timestamp, routing_key_length, message_length = RECORD_HEADER.unpack(record_header)
+            record_data = recording_file.read(routing_key_length + message_length)
+            if len(record_data) < routing_key_length + message_length:
+                LOGGER.warning("Ignored an incomplete record at the end of {:s}".format(file_name))
+                return
+            yield timestamp, record_data[:routing_key_length].decode("UTF-8"), record_data[routing_key_length:]
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Replays the messages recorded by the listener (see listener.recorder) to the simulation manager or
+   to the listener through the loopback message bus.
+
+   The recording files are accessed through memory maps, so only the index is kept in memory. The index
+   contains the position, the receive timestamp, the topic and the epoch number for each record. It is built
+   by reading the record headers and by searching the EpochNumber attribute from the raw message bytes.
+   The messages can be replayed as fast as possible or with the original timing scaled by a speed factor.
+
+   When replaying to the simulation manager, the manager settings are read from the same environmental variables
+   as in the normal simulation manager and by default only the topics the manager listens to are replayed.
+   The manager sends its own epoch messages, so it is driven by the recorded status messages.
+
+   Usage: python3 -m listener.replay recording.rec --target manager --speed 0 --first-epoch 1 --last-epoch 100
+"""
+
+import argparse
+import asyncio
+import json
+import mmap
+import re
+import time
+from array import array
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set, cast
+
+from tools.tools import FullLogger, load_environmental_variables
+
+from listener.listener import ListenerComponent
+from listener.recorder import RECORD_HEADER, RECORDING_FILE_MAGIC, Record, get_recording_files
+from loopback.bus import LoopbackBus, LoopbackClient, topic_matches
+from manager.manager import create_manager, get_manager_environmental_variables
+
+LOGGER = FullLogger(__name__)
+
+EPOCH_NUMBER_PATTERN = re.compile(rb'"EpochNumber"\s*:\s*(-?\d+)')
+# the epoch number in the index for the messages without an epoch number
+NO_EPOCH = -1
+
+TARGET_NONE = "none"
+TARGET_MANAGER = "manager"
+TARGET_LISTENER = "listener"
+
+# the callback is called with the routing key and the message bytes
+ReplayCallback = Callable[[str, bytes], Awaitable[None]]
+
+
+class RecordingIndex:
+    """Index of the records in a single recording file. The file is accessed through a memory map."""
+
+    def __init__(self, file_name: str):
+        self.__file_name = file_name
+        self.__file = open(file_name, mode="rb")
+        try:
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.__file.close()
+            raise ValueError("{:s} is not a recording file".format(file_name))
+        if self.__map[:len(RECORDING_FILE_MAGIC)] != RECORDING_FILE_MAGIC:
+            self.close()
+            raise ValueError("{:s} is not a recording file".format(file_name))
+
+        self.__offsets = array("q")
+        self.__timestamps = array("d")
+        self.__epoch_numbers = array("q")
+        self.__topic_ids = array("I")
+        self.__topics: List[str] = []
+        self.__build()
+
+    @property
+    def file_name(self) -> str:
+        """The name of the recording file."""
+        return self.__file_name
+
+    @property
+    def topics(self) -> List[str]:
+        """The distinct topics in the recording file."""
+        return list(self.__topics)
+
+    @property
+    def epoch_numbers(self) -> Set[int]:
+        """The distinct epoch numbers in the recording file. The messages without an epoch number are not included."""
+        return set(self.__epoch_numbers) - {NO_EPOCH}
+
+    def __len__(self) -> int:
+        return len(self.__offsets)
+
+    def get_timestamp(self, record_index: int) -> float:
+        """Returns the receive timestamp for the record with the given index."""
+        return self.__timestamps[record_index]
+
+    def get_epoch_number(self, record_index: int) -> int:
+        """Returns the epoch number for the record with the given index or NO_EPOCH."""
+        return self.__epoch_numbers[record_index]
+
+    def get_record(self, record_index: int) -> Record:
+        """Returns the record with the given index."""
+        offset = self.__offsets[record_index]
+        _, routing_key_length, message_length = RECORD_HEADER.unpack_from(self.__map, offset)
+        message_start = offset + RECORD_HEADER.size + routing_key_length
+        return (
+            self.__timestamps[record_index],
+            self.__topics[self.__topic_ids[record_index]],
+            self.__map[message_start:message_start + message_length]
+        )
+
+    def select(self, first_epoch: Optional[int] = None, last_epoch: Optional[int] = None,
+               topics: Optional[List[str]] = None) -> Iterator[int]:
+        """Returns the indexes of the records in the given epoch range that match the given topic patterns.
+           If an epoch limit is given, the messages without an epoch number are not included."""
+        if topics is None:
+            topic_ids = None
+        else:
+            topic_ids = {
+                topic_id
+                for topic_id, topic_name in enumerate(self.__topics)
+                if any(topic_matches(topic, topic_name) for topic in topics)
+            }
+
+        for record_index in range(len(self.__offsets)):
+            if topic_ids is not None and self.__topic_ids[record_index] not in topic_ids:
+                continue
+            epoch_number = self.__epoch_numbers[record_index]
+            if first_epoch is not None and (epoch_number == NO_EPOCH or epoch_number < first_epoch):
+                continue
+            if last_epoch is not None and (epoch_number == NO_EPOCH or epoch_number > last_epoch):
+                continue
+            yield record_index
+
+    def close(self):
+        """Closes the memory map and the recording file."""
+        self.__map.close()
+        self.__file.close()
+
+    def __build(self):
+        """Builds the index by going through the record headers."""
+        topic_ids: Dict[str, int] = {}
+        file_size = len(self.__map)
+        position = len(RECORDING_FILE_MAGIC)
+        while position + RECORD_HEADER.size <= file_size:
+            timestamp, routing_key_length, message_length = RECORD_HEADER.unpack_from(self.__map, position)
+            routing_key_start = position + RECORD_HEADER.size
+            message_start = routing_key_start + routing_key_length
+            record_end = message_start + message_length
+            if record_end > file_size:
+                LOGGER.warning("Ignored an incomplete record at the end of {:s}".format(self.__file_name))
+                break
+
+            routing_key = self.__map[routing_key_start:message_start].decode("UTF-8")
+            topic_id = topic_ids.get(routing_key, None)
+            if topic_id is None:
+                topic_id = len(self.__topics)
+                topic_ids[routing_key] = topic_id
+                self.__topics.append(routing_key)
+            epoch_match = EPOCH_NUMBER_PATTERN.search(self.__map, message_start, record_end)
+
+            self.__offsets.append(position)
+            self.__timestamps.append(timestamp)
+            self.__topic_ids.append(topic_id)
+            self.__epoch_numbers.append(NO_EPOCH if epoch_match is None else int(epoch_match.group(1)))
+            position = record_end
+
+
+class RecordingReplay:
+    """Replays the records from the recording files created with the given file name."""
+
+    def __init__(self, file_name: str):
+        file_names = get_recording_files(file_name)
+        if not file_names:
+            raise ValueError("No recording files found for {:s}".format(file_name))
+        self.__indexes: List[RecordingIndex] = []
+        try:
+            for recording_file in file_names:
+                self.__indexes.append(RecordingIndex(recording_file))
+        except (OSError, ValueError):
+            self.close()
+            raise
+
+    def __enter__(self) -> "RecordingReplay":
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(len(index) for index in self.__indexes)
+
+    @property
+    def topics(self) -> List[str]:
+        """The distinct topics in the recording."""
+        return sorted({topic for index in self.__indexes for topic in index.topics})
+
+    @property
+    def epoch_numbers(self) -> List[int]:
+        """The distinct epoch numbers in the recording."""
+        return sorted({epoch_number for index in self.__indexes for epoch_number in index.epoch_numbers})
+
+    def records(self, first_epoch: Optional[int] = None, last_epoch: Optional[int] = None,
+                topics: Optional[List[str]] = None) -> Iterator[Record]:
+        """Returns the records in the recording order that are in the given epoch range and match
+           the given topic patterns."""
+        for index in self.__indexes:
+            for record_index in index.select(first_epoch, last_epoch, topics):
+                yield index.get_record(record_index)
+
+    async def replay(self, callback: ReplayCallback, speed: float = 0.0, first_epoch: Optional[int] = None,
+                     last_epoch: Optional[int] = None, topics: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Gives the selected records to the callback and returns the replay statistics.
+           If speed is larger than zero, the original intervals between the messages are divided by speed.
+           Otherwise, the messages are replayed as fast as the callback can handle them."""
+        messages = 0
+        message_bytes = 0
+        first_timestamp = None
+        start_time = time.perf_counter()
+        for timestamp, routing_key, message in self.records(first_epoch, last_epoch, topics):
+            if speed > 0.0:
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                delay = (timestamp - first_timestamp) / speed - (time.perf_counter() - start_time)
+                if delay > 0.0:
+                    await asyncio.sleep(delay)
+
+            await callback(routing_key, message)
+            messages += 1
+            message_bytes += len(message)
+
+        replay_time = time.perf_counter() - start_time
+        return {
+            "messages": messages,
+            "megabytes": message_bytes / 1024 ** 2,
+            "seconds": replay_time,
+            "messages_per_second": messages / replay_time if replay_time > 0.0 else 0.0
+        }
+
+    def close(self):
+        """Closes all the recording files."""
+        for index in self.__indexes:
+            index.close()
+        self.__indexes = []
+
+
+def get_bus_callback(bus: LoopbackBus, batch_size: int = 1000) -> ReplayCallback:
+    """Returns a replay callback that publishes the messages to the given loopback bus. After every batch_size
+       messages, the callback waits until the listeners have handled the published messages."""
+    published_messages = 0
+
+    async def publish(routing_key: str, message_bytes: bytes):
+        nonlocal published_messages
+        bus.publish(routing_key, message_bytes)
+        published_messages += 1
+        if published_messages % batch_size == 0:
+            await bus.join()
+
+    return publish
+
+
+async def run_replay(file_name: str, target: str, speed: float = 0.0, first_epoch: Optional[int] = None,
+                     last_epoch: Optional[int] = None, topics: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Replays the recording with the given file name to the given target and returns the replay statistics."""
+    bus = LoopbackBus()
+    client = LoopbackClient(bus)
+    manager = None
+    if target == TARGET_MANAGER:
+        manager = create_manager(load_environmental_variables(*get_manager_environmental_variables()), client)
+        client.add_listener(manager.listened_topics, manager.general_message_handler)
+        if topics is None:
+            topics = manager.listened_topics
+    elif target == TARGET_LISTENER:
+        env_variables = load_environmental_variables(("SIMULATION_ID", str, ""))
+        ListenerComponent(client, cast(str, env_variables["SIMULATION_ID"]), topics)
+
+    with RecordingReplay(file_name) as recording:
+        LOGGER.info("Indexed {:d} messages in {:d} topics and {:d} epochs".format(
+            len(recording), len(recording.topics), len(recording.epoch_numbers)))
+        if manager is not None:
+            await manager.start()
+        statistics = await recording.replay(get_bus_callback(bus), speed, first_epoch, last_epoch, topics)
+        await bus.join()
+
+    if manager is not None:
+        statistics["manager_epoch"] = manager.epoch_number
+        if not manager.is_stopped:
+            await manager.stop()
+    await client.close()
+    await bus.close()
+    return statistics
+
+
+def main(arguments: Optional[List[str]] = None):
+    """Replays a recording and prints the replay statistics in JSON format."""
+    parser = argparse.ArgumentParser(description="Replays the messages recorded by the listener")
+    parser.add_argument("file_name", help="the recording file name given to the listener or a single recording file")
+    parser.add_argument("--target", default=TARGET_NONE, choices=[TARGET_NONE, TARGET_MANAGER, TARGET_LISTENER],
+                        help="the component that receives the replayed messages")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="the speed factor for the original timing, 0 replays as fast as possible")
+    parser.add_argument("--first-epoch", type=int, default=None, help="the first replayed epoch")
+    parser.add_argument("--last-epoch", type=int, default=None, help="the last replayed epoch")
+    parser.add_argument("--topics", nargs="+", default=None, help="the replayed topic patterns")
+    options = parser.parse_args(arguments)
+
+    statistics = asyncio.run(run_replay(
+        options.file_name, options.target, options.speed, options.first_epoch, options.last_epoch, options.topics))
+    print(json.dumps(statistics, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains the aggregated message statistics for the listener.
+
+   The statistics are collected from the raw message bytes without decoding the messages. For each message,
+   the message type, the source process id and the epoch number are searched from the beginning of the message
+   where the simulation platform messages have their header attributes. The memory usage does not depend on
+   the length of the simulation: the latency percentiles are calculated from a fixed number of the latest
+   samples, only the latest epochs are kept and the number of separately tracked topics and source processes
+   is limited.
+"""
+
+import re
+from array import array
+from typing import Any, Dict, List, Optional
+
+# the maximum number of bytes from the start of the message that is searched for the header attributes
+HEADER_SEARCH_LENGTH = 1024
+
+TYPE_PATTERN = re.compile(rb'"Type"\s*:\s*"([^"]*)"')
+SOURCE_PROCESS_ID_PATTERN = re.compile(rb'"SourceProcessId"\s*:\s*"([^"]*)"')
+EPOCH_NUMBER_PATTERN = re.compile(rb'"EpochNumber"\s*:\s*(-?\d+)')
+READY_VALUE_PATTERN = re.compile(rb'"Value"\s*:\s*"ready"')
+STOPPED_STATE_PATTERN = re.compile(rb'"SimulationState"\s*:\s*"stopped"')
+
+EPOCH_MESSAGE_TYPE = b"Epoch"
+STATUS_MESSAGE_TYPE = b"Status"
+STATE_MESSAGE_TYPE = b"SimState"
+
+# the key that is used for the topics and the source processes after the limit for the tracked keys is reached
+OTHER_KEY = "_other"
+UNKNOWN_KEY = "_unknown"
+
+PERCENTILES = (50, 90, 99)
+
+
+class RollingPercentiles:
+    """Keeps the latest sample values in a fixed size ring buffer and calculates percentiles from them."""
+
+    def __init__(self, size: int):
+        self.__size = size
+        self.__samples = array("d")
+        self.__next_position = 0
+
+    def __len__(self) -> int:
+        return len(self.__samples)
+
+    def add(self, value: float):
+        """Adds a new sample value. If the buffer is full, the oldest value is replaced."""
+        if len(self.__samples) < self.__size:
+            self.__samples.append(value)
+        else:
+            self.__samples[self.__next_position] = value
+            self.__next_position = (self.__next_position + 1) % self.__size
+
+    def get_percentiles(self, percentiles: List[int]) -> Dict[str, Optional[float]]:
+        """Returns the given percentiles of the current samples using the nearest rank method."""
+        sorted_samples = sorted(self.__samples)
+        return {
+            "p{:d}".format(percentile): (
+                sorted_samples[max((len(sorted_samples) * percentile + 99) // 100 - 1, 0)]
+                if sorted_samples else None)
+            for percentile in percentiles
+        }
+
+
+class StreamStatistics:
+    """Message counts, sizes and inter-arrival times for a stream of messages, e.g. for a topic."""
+
+    def __init__(self, sample_size: int):
+        self.messages = 0
+        self.bytes = 0
+        self.window_messages = 0
+        self.window_bytes = 0
+        self.inter_arrival = RollingPercentiles(sample_size)
+        self.__last_arrival: Optional[float] = None
+
+    def add(self, message_size: int, arrival_time: float):
+        """Registers a new message."""
+        self.messages += 1
+        self.bytes += message_size
+        self.window_messages += 1
+        self.window_bytes += message_size
+        if self.__last_arrival is not None:
+            self.inter_arrival.add(arrival_time - self.__last_arrival)
+        self.__last_arrival = arrival_time
+
+    def get_summary(self, window_length: float) -> Dict[str, Any]:
+        """Returns the summary of the statistics and starts a new window."""
+        summary = {
+            "Messages": self.messages,
+            "Bytes": self.bytes,
+            "WindowMessages": self.window_messages,
+            "WindowBytes": self.window_bytes,
+            "MessagesPerSecond": self.window_messages / window_length if window_length > 0.0 else None,
+            "InterArrival": self.inter_arrival.get_percentiles(list(PERCENTILES))
+        }
+        self.window_messages = 0
+        self.window_bytes = 0
+        return summary
+
+
+class EpochStatistics:
+    """Message counts and the component ready latencies for one epoch."""
+
+    def __init__(self, start_time: Optional[float] = None):
+        self.start_time = start_time
+        self.messages = 0
+        self.bytes = 0
+        self.ready_components = 0
+        self.max_ready_latency: Optional[float] = None
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Returns the summary of the epoch statistics."""
+        return {
+            "Messages": self.messages,
+            "Bytes": self.bytes,
+            "ReadyComponents": self.ready_components,
+            "MaxReadyLatency": self.max_ready_latency
+        }
+
+
+class ListenerStatistics:
+    """Aggregated statistics per topic, per source process and per epoch.
+
+       The ready latency is the time from receiving the epoch message to receiving the ready status message
+       for the same epoch from a component. The percentiles are calculated from the latest sample_size samples
+       and the per-epoch statistics are kept for the latest max_epochs epochs. At most max_keys topics and
+       source processes are tracked separately, the rest are combined under the key "_other"."""
+
+    def __init__(self, sample_size: int = 1000, max_epochs: int = 10, max_keys: int = 1000):
+        self.__sample_size = sample_size
+        self.__max_epochs = max_epochs
+        self.__max_keys = max_keys
+
+        self.__total = StreamStatistics(sample_size)
+        self.__topics: Dict[str, StreamStatistics] = {}
+        self.__sources: Dict[str, StreamStatistics] = {}
+        self.__ready_latencies: Dict[str, RollingPercentiles] = {}
+        self.__all_ready_latencies = RollingPercentiles(sample_size)
+        self.__epochs: Dict[int, EpochStatistics] = {}
+        self.__window_start_time: Optional[float] = None
+        self.__simulation_stopped = False
+
+    @property
+    def messages(self) -> int:
+        """The total number of registered messages."""
+        return self.__total.messages
+
+    @property
+    def simulation_stopped(self) -> bool:
+        """True, if a simulation state message "stopped" has been registered."""
+        return self.__simulation_stopped
+
+    def add_message(self, routing_key: str, message_bytes: bytes, arrival_time: float):
+        """Registers a new message received at the given time in seconds."""
+        message_size = len(message_bytes)
+        if self.__window_start_time is None:
+            self.__window_start_time = arrival_time
+        self.__total.add(message_size, arrival_time)
+        self.__get_stream(self.__topics, routing_key).add(message_size, arrival_time)
+
+        source_match = SOURCE_PROCESS_ID_PATTERN.search(message_bytes, 0, HEADER_SEARCH_LENGTH)
+        source_process_id = UNKNOWN_KEY if source_match is None else source_match.group(1).decode("UTF-8")
+        self.__get_stream(self.__sources, source_process_id).add(message_size, arrival_time)
+
+        type_match = TYPE_PATTERN.search(message_bytes, 0, HEADER_SEARCH_LENGTH)
+        message_type = b"" if type_match is None else type_match.group(1)
+        if message_type == STATE_MESSAGE_TYPE and STOPPED_STATE_PATTERN.search(message_bytes) is not None:
+            self.__simulation_stopped = True
+
+        epoch_match = EPOCH_NUMBER_PATTERN.search(message_bytes, 0, HEADER_SEARCH_LENGTH)
+        if epoch_match is None:
+            return
+        epoch_statistics = self.__get_epoch(int(epoch_match.group(1)))
+        epoch_statistics.messages += 1
+        epoch_statistics.bytes += message_size
+
+        if message_type == EPOCH_MESSAGE_TYPE:
+            if epoch_statistics.start_time is None:
+                epoch_statistics.start_time = arrival_time
+        elif (message_type == STATUS_MESSAGE_TYPE and epoch_statistics.start_time is not None and
+              READY_VALUE_PATTERN.search(message_bytes) is not None):
+            ready_latency = arrival_time - epoch_statistics.start_time
+            epoch_statistics.ready_components += 1
+            if epoch_statistics.max_ready_latency is None or ready_latency > epoch_statistics.max_ready_latency:
+                epoch_statistics.max_ready_latency = ready_latency
+            self.__all_ready_latencies.add(ready_latency)
+            self.__get_ready_latencies(source_process_id).add(ready_latency)
+
+    def get_summary(self, current_time: float) -> Dict[str, Any]:
+        """Returns a summary of the statistics and starts a new window for the message rates."""
+        window_length = 0.0 if self.__window_start_time is None else current_time - self.__window_start_time
+        self.__window_start_time = current_time
+
+        sources = {}
+        for source_process_id, source_statistics in self.__sources.items():
+            sources[source_process_id] = source_statistics.get_summary(window_length)
+            ready_latencies = self.__ready_latencies.get(source_process_id, None)
+            if ready_latencies is not None:
+                sources[source_process_id]["ReadyLatency"] = ready_latencies.get_percentiles(list(PERCENTILES))
+
+        return {
+            "WindowSeconds": window_length,
+            "Total": self.__total.get_summary(window_length),
+            "ReadyLatency": self.__all_ready_latencies.get_percentiles(list(PERCENTILES)),
+            "Topics": {
+                topic: topic_statistics.get_summary(window_length)
+                for topic, topic_statistics in self.__topics.items()
+            },
+            "Sources": sources,
+            "Epochs": {
+                str(epoch_number): epoch_statistics.get_summary()
+                for epoch_number, epoch_statistics in self.__epochs.items()
+            }
+        }
+
+    def __get_stream(self, streams: Dict[str, StreamStatistics], key: str) -> StreamStatistics:
+        """Returns the stream statistics for the given key. Creates new statistics if there is still room."""
+        stream_statistics = streams.get(key, None)
+        if stream_statistics is None:
+            if len(streams) >= self.__max_keys:
+                key = OTHER_KEY
+                stream_statistics = streams.get(key, None)
+            if stream_statistics is None:
+                stream_statistics = StreamStatistics(self.__sample_size)
+                streams[key] = stream_statistics
+        return stream_statistics
+
+    def __get_ready_latencies(self, source_process_id: str) -> RollingPercentiles:
+        """Returns the ready latency samples for the given source process."""
+        if source_process_id not in self.__sources:
+            source_process_id = OTHER_KEY
+        ready_latencies = self.__ready_latencies.get(source_process_id, None)
+        if ready_latencies is None:
+            ready_latencies = RollingPercentiles(self.__sample_size)
+            self.__ready_latencies[source_process_id] = ready_latencies
+        return ready_latencies
+
+    def __get_epoch(self, epoch_number: int) -> EpochStatistics:
+        """Returns the statistics for the given epoch. Only the latest epochs are kept, so the statistics
+           for a message from an older epoch are not stored."""
+        epoch_statistics = self.__epochs.get(epoch_number, None)
+        if epoch_statistics is None:
+            epoch_statistics = EpochStatistics()
+            self.__epochs[epoch_number] = epoch_statistics
+            if len(self.__epochs) > self.__max_epochs:
+                del self.__epochs[min(self.__epochs)]
+        return epoch_statistics
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the filters module."""
+
+import json
+import unittest
+
+from tools.messages import MessageGenerator
+
+from listener.filters import SimulationIdFilter, parse_topics
+from listener.listener import ListenerComponent
+
+SIMULATION_ID = "2020-01-01T00:00:00.000Z"
+
+
+class TestFilters(unittest.TestCase):
+    """Unit tests for the listener message filters."""
+
+    def test_parse_topics(self):
+        """Tests parsing the topic filters."""
+        self.assertEqual(parse_topics(""), ["#"])
+        self.assertEqual(parse_topics(" , "), ["#"])
+        self.assertEqual(parse_topics("Epoch"), ["Epoch"])
+        self.assertEqual(parse_topics("Epoch, Status.#,Result.*"), ["Epoch", "Status.#", "Result.*"])
+
+    def test_simulation_filter(self):
+        """Tests that only the messages for the given simulation are accepted."""
+        simulation_filter = SimulationIdFilter(SIMULATION_ID)
+        message_json = {"Type": "Epoch", "SimulationId": SIMULATION_ID, "EpochNumber": 1}
+
+        accepted_messages = [
+            json.dumps(message_json).encode("UTF-8"),
+            json.dumps(message_json, separators=(",", ":")).encode("UTF-8"),
+            json.dumps({"SimulationId": SIMULATION_ID}).encode("UTF-8")
+        ]
+        rejected_messages = [
+            json.dumps(dict(message_json, SimulationId="2020-01-01T00:00:00.001Z")).encode("UTF-8"),
+            json.dumps(dict(message_json, SimulationId=SIMULATION_ID + "0")).encode("UTF-8"),
+            json.dumps(dict(message_json, SimulationId="other", Description=SIMULATION_ID)).encode("UTF-8"),
+            b"not json"
+        ]
+        for message_bytes in accepted_messages:
+            with self.subTest(message_bytes=message_bytes):
+                self.assertTrue(simulation_filter.matches(message_bytes))
+        for message_bytes in rejected_messages:
+            with self.subTest(message_bytes=message_bytes):
+                self.assertFalse(simulation_filter.matches(message_bytes))
+
+        self.assertEqual(simulation_filter.accepted, len(accepted_messages))
+        self.assertEqual(simulation_filter.rejected, len(rejected_messages))
+
+    def test_escaped_simulation_id(self):
+        """Tests that simulation ids with characters that are escaped in JSON are handled."""
+        simulation_id = 'quote"and\\backslash'
+        simulation_filter = SimulationIdFilter(simulation_id)
+        self.assertTrue(simulation_filter.matches(json.dumps({"SimulationId": simulation_id}).encode("UTF-8")))
+        self.assertFalse(simulation_filter.matches(json.dumps({"SimulationId": "quote"}).encode("UTF-8")))
+
+
+    def test_listener_component_filter(self):
+        """Tests that the default listener logs only the messages for its own simulation."""
+        simulation_filter = SimulationIdFilter(SIMULATION_ID)
+        listener = ListenerComponent(None, SIMULATION_ID, simulation_filter=simulation_filter)
+        own_message = MessageGenerator(SIMULATION_ID, "manager").get_epoch_message(
+            EpochNumber=1, TriggeringMessageIds=["manager-0"],
+            StartTime="2020-01-01T00:00:00.000Z", EndTime="2020-01-01T01:00:00.000Z")
+        other_message = MessageGenerator("2020-01-02T00:00:00.000Z", "manager").get_epoch_message(
+            EpochNumber=1, TriggeringMessageIds=["manager-0"],
+            StartTime="2020-01-02T00:00:00.000Z", EndTime="2020-01-02T01:00:00.000Z")
+
+        with self.assertLogs("listener.listener", level="INFO") as logs:
+            listener.raw_message_handler(other_message.bytes(), "Epoch")
+            listener.raw_message_handler(own_message.bytes(), "Epoch")
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn(own_message.message_id, logs.output[0])
+        self.assertEqual(simulation_filter.accepted, 1)
+        self.assertEqual(simulation_filter.rejected, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the recorder module."""
+
+import asyncio
+import os
+import tempfile
+from typing import List
+
+import aiounittest
+
+from listener.recorder import MessageRecorder, Record, get_recording_files, read_records
+
+
+def get_records(count: int) -> List[Record]:
+    """Returns the given number of test records."""
+    return [
+        (1600000000.0 + index, "Result.component_{:d}".format(index % 3),
+         '{{"Type": "Result", "Index": {:d}, "Text": "ääkköset"}}'.format(index).encode("UTF-8"))
+        for index in range(count)
+    ]
+
+
+def read_all_records(file_name: str) -> List[Record]:
+    """Returns all the records from the recording files created with the given file name."""
+    return [
+        record
+        for recording_file in get_recording_files(file_name)
+        for record in read_records(recording_file)
+    ]
+
+
+class TestMessageRecorder(aiounittest.AsyncTestCase):
+    """Unit tests for the MessageRecorder class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, "recording.rec")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def test_record_and_read(self):
+        """Tests that the recorded messages are read back unmodified."""
+        records = get_records(100)
+        recorder = MessageRecorder(self.file_name, flush_size=1000, flush_interval=0)
+        recorder.start()
+        for timestamp, routing_key, message_bytes in records:
+            recorder.record(routing_key, message_bytes, timestamp)
+
+        # the buffer is flushed when the flush size is reached
+        self.assertGreater(len(read_all_records(self.file_name)), 0)
+        self.assertLess(len(read_all_records(self.file_name)), len(records))
+
+        await recorder.close()
+        self.assertEqual(read_all_records(self.file_name), records)
+        self.assertEqual(recorder.messages, len(records))
+        self.assertEqual(recorder.message_bytes, sum(len(message_bytes) for _, _, message_bytes in records))
+
+    async def test_rotation(self):
+        """Tests that a new recording file is started when the size limit is reached."""
+        records = get_records(200)
+        recorder = MessageRecorder(self.file_name, max_file_size=2000, flush_size=500, flush_interval=0)
+        recorder.start()
+        for timestamp, routing_key, message_bytes in records:
+            recorder.record(routing_key, message_bytes, timestamp)
+        await recorder.close()
+
+        recording_files = get_recording_files(self.file_name)
+        self.assertGreater(len(recording_files), 5)
+        self.assertEqual(os.path.basename(recording_files[0]), "recording.00000.rec")
+        for recording_file in recording_files:
+            self.assertLess(os.path.getsize(recording_file), 2000 + 500 + 100)
+        self.assertEqual(read_all_records(self.file_name), records)
+        self.assertEqual(get_recording_files(recording_files[1]), [recording_files[1]])
+
+    async def test_flush_interval(self):
+        """Tests that the buffer is flushed periodically."""
+        recorder = MessageRecorder(self.file_name, flush_interval=0.01)
+        recorder.start()
+        recorder.record("Epoch", b'{"Type": "Epoch"}', 1600000000.0)
+        self.assertEqual(read_all_records(self.file_name), [])
+
+        await asyncio.sleep(0.05)
+        self.assertEqual(read_all_records(self.file_name), [(1600000000.0, "Epoch", b'{"Type": "Epoch"}')])
+        await recorder.close()
+
+    async def test_incomplete_record(self):
+        """Tests that an incomplete record at the end of the file is ignored."""
+        records = get_records(10)
+        recorder = MessageRecorder(self.file_name, flush_interval=0)
+        recorder.start()
+        for timestamp, routing_key, message_bytes in records:
+            recorder.record(routing_key, message_bytes, timestamp)
+        await recorder.close()
+
+        recording_file = get_recording_files(self.file_name)[0]
+        with open(recording_file, mode="r+b") as truncated_file:
+            truncated_file.truncate(os.path.getsize(recording_file) - 5)
+        self.assertEqual(list(read_records(recording_file)), records[:-1])
+
+        with open(recording_file, mode="wb") as invalid_file:
+            invalid_file.write(b"not a recording")
+        with self.assertRaises(ValueError):
+            list(read_records(recording_file))
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the replay module."""
+
+import json
+import os
+import tempfile
+import time
+from typing import List
+
+import aiounittest
+
+from tools.messages import MessageGenerator
+
+from listener.recorder import MessageRecorder, Record
+from listener.replay import RecordingReplay, get_bus_callback
+from loopback.bus import LoopbackBus, LoopbackClient
+from manager.manager import SimulationManager
+
+SIMULATION_ID = "2020-01-01T00:00:00.000Z"
+
+
+def get_status_records(component_names: List[str], epochs: int) -> List[Record]:
+    """Returns the recorded simulation state message and ready status messages for the given epochs."""
+    records: List[Record] = [
+        (1600000000.0, "SimState", json.dumps({"Type": "SimState", "SimulationId": SIMULATION_ID}).encode("UTF-8"))
+    ]
+    message_generators = [MessageGenerator(SIMULATION_ID, component_name) for component_name in component_names]
+    for epoch_number in range(epochs + 1):
+        for message_generator in message_generators:
+            status_message = message_generator.get_status_ready_message(
+                EpochNumber=epoch_number, TriggeringMessageIds=["manager-{:d}".format(epoch_number + 1)])
+            records.append((1600000000.0 + 0.01 * len(records), "Status.Ready", status_message.bytes()))
+    return records
+
+
+class TestRecordingReplay(aiounittest.AsyncTestCase):
+    """Unit tests for the RecordingReplay class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, "recording.rec")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def write_recording(self, records: List[Record], max_file_size: int = 1024 ** 2):
+        """Writes the given records to the recording files."""
+        recorder = MessageRecorder(self.file_name, max_file_size=max_file_size, flush_size=1, flush_interval=0)
+        recorder.start()
+        for timestamp, routing_key, message_bytes in records:
+            recorder.record(routing_key, message_bytes, timestamp)
+        await recorder.close()
+
+    async def test_index(self):
+        """Tests selecting the records from the index by epoch and topic."""
+        records = get_status_records(["first", "second", "third"], 10)
+        await self.write_recording(records, max_file_size=2000)
+
+        with RecordingReplay(self.file_name) as recording:
+            self.assertEqual(len(recording), len(records))
+            self.assertEqual(recording.topics, ["SimState", "Status.Ready"])
+            self.assertEqual(recording.epoch_numbers, list(range(11)))
+
+            self.assertEqual(list(recording.records()), records)
+            self.assertEqual(list(recording.records(topics=["SimState"])), records[:1])
+            self.assertEqual(list(recording.records(topics=["Status.#"])), records[1:])
+            self.assertEqual(list(recording.records(first_epoch=3, last_epoch=4)), records[10:16])
+            self.assertEqual(list(recording.records(last_epoch=0, topics=["#"])), records[1:4])
+
+        with self.assertRaises(ValueError):
+            RecordingReplay(os.path.join(self.directory.name, "missing.rec"))
+
+    async def test_replay_timing(self):
+        """Tests the replay as fast as possible and with scaled original timing."""
+        records = get_status_records(["first"], 20)
+        await self.write_recording(records)
+        received_records = []
+
+        async def callback(routing_key: str, message_bytes: bytes):
+            received_records.append((routing_key, message_bytes))
+
+        with RecordingReplay(self.file_name) as recording:
+            statistics = await recording.replay(callback)
+            self.assertEqual(received_records, [(routing_key, message) for _, routing_key, message in records])
+            self.assertEqual(statistics["messages"], len(records))
+
+            # the original timing spans 0.21 seconds
+            start_time = time.perf_counter()
+            await recording.replay(callback, speed=2.0)
+            self.assertGreaterEqual(time.perf_counter() - start_time, 0.1)
+            self.assertEqual(len(received_records), 2 * len(records))
+
+    async def test_replay_to_manager(self):
+        """Tests that the recorded status messages drive the simulation manager through the simulation."""
+        await self.write_recording(get_status_records(["first", "second"], 3))
+
+        bus = LoopbackBus()
+        manager_client = LoopbackClient(bus)
+        manager = SimulationManager(
+            SIMULATION_ID, "manager", "name", "description", "first,second", "2020-01-01T00:00:00.000Z", 3600, 3,
+            60.0, 1, "Epoch", "SimState", "Status.Ready", "Status.Error", rabbitmq_client=manager_client)
+        manager_client.add_listener(manager.listened_topics, manager.general_message_handler)
+
+        await manager.start()
+        with RecordingReplay(self.file_name) as recording:
+            statistics = await recording.replay(get_bus_callback(bus, batch_size=1), topics=manager.listened_topics)
+        await bus.join()
+
+        self.assertEqual(statistics["messages"], 8)
+        self.assertEqual(manager.epoch_number, 4)
+        self.assertTrue(manager.is_stopped)
+        await bus.close()
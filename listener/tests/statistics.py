@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the statistics module and the statistics mode of the listener."""
+
+import json
+import os
+import tempfile
+import unittest
+
+from listener.filters import SimulationIdFilter
+from listener.listener import StatisticsListenerComponent
+from listener.statistics import ListenerStatistics, OTHER_KEY, RollingPercentiles
+
+SIMULATION_ID = "2020-01-01T00:00:00.000Z"
+
+
+def get_message(message_type: str, source_process_id: str, epoch_number: int, **attributes) -> bytes:
+    """Returns a message in bytes format with the given header attributes."""
+    return json.dumps(dict({
+        "Type": message_type,
+        "SimulationId": SIMULATION_ID,
+        "SourceProcessId": source_process_id,
+        "EpochNumber": epoch_number
+    }, **attributes)).encode("UTF-8")
+
+
+class TestRollingPercentiles(unittest.TestCase):
+    """Unit tests for the RollingPercentiles class."""
+
+    def test_percentiles(self):
+        """Tests that the percentiles are calculated from the latest samples."""
+        percentiles = RollingPercentiles(100)
+        self.assertEqual(percentiles.get_percentiles([50]), {"p50": None})
+
+        for value in range(1, 101):
+            percentiles.add(float(value))
+        self.assertEqual(percentiles.get_percentiles([50, 90, 99, 100]),
+                         {"p50": 50.0, "p90": 90.0, "p99": 99.0, "p100": 100.0})
+
+        for value in range(1001, 1051):
+            percentiles.add(float(value))
+        self.assertEqual(len(percentiles), 100)
+        self.assertEqual(percentiles.get_percentiles([50, 51]), {"p50": 100.0, "p51": 1001.0})
+
+
+class TestListenerStatistics(unittest.TestCase):
+    """Unit tests for the ListenerStatistics class."""
+
+    def test_statistics(self):
+        """Tests the message counts and the ready latencies."""
+        statistics = ListenerStatistics()
+        epoch_message = get_message("Epoch", "manager", 1)
+        status_messages = [
+            get_message("Status", component_name, 1, Value="ready")
+            for component_name in ["first", "second"]
+        ]
+        result_message = get_message("Result", "first", 1, Power=1.5)
+
+        statistics.add_message("Epoch", epoch_message, 10.0)
+        statistics.add_message("Result.first", result_message, 10.5)
+        statistics.add_message("Status.Ready", status_messages[0], 11.0)
+        statistics.add_message("Status.Ready", status_messages[1], 13.0)
+        summary = statistics.get_summary(14.0)
+
+        self.assertEqual(summary["WindowSeconds"], 4.0)
+        self.assertEqual(summary["Total"]["Messages"], 4)
+        self.assertEqual(summary["Total"]["MessagesPerSecond"], 1.0)
+        self.assertEqual(summary["Total"]["InterArrival"]["p50"], 0.5)
+        self.assertEqual(summary["Total"]["Bytes"], len(epoch_message) + len(result_message) + sum(
+            len(status_message) for status_message in status_messages))
+        self.assertEqual(summary["Topics"]["Status.Ready"]["Messages"], 2)
+        self.assertEqual(summary["Topics"]["Status.Ready"]["InterArrival"]["p50"], 2.0)
+        self.assertEqual(summary["Sources"]["first"]["Messages"], 2)
+        self.assertEqual(summary["Sources"]["first"]["ReadyLatency"]["p50"], 1.0)
+        self.assertEqual(summary["Sources"]["second"]["ReadyLatency"]["p50"], 3.0)
+        self.assertNotIn("ReadyLatency", summary["Sources"]["manager"])
+        self.assertEqual(summary["ReadyLatency"]["p99"], 3.0)
+        self.assertEqual(summary["Epochs"], {
+            "1": {"Messages": 4, "Bytes": summary["Total"]["Bytes"], "ReadyComponents": 2, "MaxReadyLatency": 3.0}
+        })
+
+        # the window counts are reset after the summary
+        summary = statistics.get_summary(15.0)
+        self.assertEqual(summary["Total"]["WindowMessages"], 0)
+        self.assertEqual(summary["Total"]["Messages"], 4)
+        self.assertFalse(statistics.simulation_stopped)
+
+        statistics.add_message("SimState", json.dumps({"Type": "SimState", "SimulationState": "stopped"}).encode(
+            "UTF-8"), 16.0)
+        self.assertTrue(statistics.simulation_stopped)
+
+    def test_constant_memory(self):
+        """Tests that the number of tracked epochs and keys is limited."""
+        statistics = ListenerStatistics(sample_size=10, max_epochs=3, max_keys=5)
+        for epoch_number in range(1, 101):
+            statistics.add_message("Epoch", get_message("Epoch", "manager", epoch_number), float(epoch_number))
+            for component_index in range(10):
+                component_name = "component_{:d}".format(component_index)
+                statistics.add_message(
+                    "Status.Ready.{:s}".format(component_name),
+                    get_message("Status", component_name, epoch_number, Value="ready"),
+                    epoch_number + 0.01 * component_index)
+
+        summary = statistics.get_summary(101.0)
+        self.assertEqual(list(summary["Epochs"]), ["98", "99", "100"])
+        self.assertEqual(len(summary["Topics"]), 6)
+        self.assertEqual(len(summary["Sources"]), 6)
+        self.assertEqual(summary["Topics"][OTHER_KEY]["Messages"], 100 * 6)
+        self.assertEqual(summary["Sources"][OTHER_KEY]["Messages"], 100 * 6)
+        self.assertEqual(summary["Epochs"]["100"]["ReadyComponents"], 10)
+
+
+class TestStatisticsListenerComponent(unittest.TestCase):
+    """Unit tests for the statistics mode of the listener component."""
+
+    def test_final_summary(self):
+        """Tests that the final summary is written when the simulation has stopped."""
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "statistics.jsonl")
+            listener = StatisticsListenerComponent(
+                ListenerStatistics(), SIMULATION_ID, file_name=file_name,
+                simulation_filter=SimulationIdFilter(SIMULATION_ID))
+
+            listener.raw_message_handler(get_message("Epoch", "manager", 1), "Epoch")
+            listener.raw_message_handler(
+                json.dumps({"Type": "Epoch", "SimulationId": "other", "EpochNumber": 1}).encode("UTF-8"), "Epoch")
+            self.assertFalse(os.path.exists(file_name))
+
+            listener.raw_message_handler(get_message("SimState", "manager", 1, SimulationState="stopped"), "SimState")
+            with open(file_name, mode="r", encoding="UTF-8") as statistics_file:
+                summaries = [json.loads(line) for line in statistics_file]
+
+        self.assertEqual(len(summaries), 1)
+        self.assertTrue(summaries[0]["Final"])
+        self.assertEqual(summaries[0]["SimulationId"], SIMULATION_ID)
+        self.assertEqual(summaries[0]["Total"]["Messages"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains an in-memory message bus that can be used instead of RabbitMQ
+   when all the simulation components are run in the same process."""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from tools.messages import AbstractMessage, EpochMessage, ResultMessage, SimulationStateMessage, StatusMessage
+from tools.tools import FullLogger
+
+LOGGER = FullLogger(__name__)
+
+# The message classes that are used for the received messages based on the message type.
+# The other messages are given as AbstractMessage objects.
+MESSAGE_CLASSES = {
+    message_class.CLASS_MESSAGE_TYPE: message_class
+    for message_class in (EpochMessage, ResultMessage, SimulationStateMessage, StatusMessage)
+}
+
+MessageCallback = Callable[[Union[AbstractMessage, Any], str], Awaitable[None]]
+
+
+def decode_message(message_bytes: bytes) -> Union[AbstractMessage, Any]:
+    """Returns the message object corresponding to the given message bytes.
+       If the message is not a valid simulation platform message, returns the decoded JSON or the bytes."""
+    try:
+        message_json = json.loads(message_bytes)
+    except (UnicodeDecodeError, ValueError):
+        return message_bytes
+    if not isinstance(message_json, dict):
+        return message_json
+
+    message_class = MESSAGE_CLASSES.get(message_json.get("Type", None), AbstractMessage)
+    message_object = message_class.from_json(message_json)
+    if message_object is None:
+        return message_json
+    return message_object
+
+
+def topic_matches(binding_key: str, routing_key: str) -> bool:
+    """Returns True, if the routing key matches the binding key using the RabbitMQ topic exchange rules:
+       the words are separated by dots, "*" matches exactly one word and "#" matches zero or more words."""
+    return _words_match(tuple(binding_key.split(".")), tuple(routing_key.split(".")))
+
+
+def _words_match(binding_words: Tuple[str, ...], routing_words: Tuple[str, ...]) -> bool:
+    """Returns True, if the routing key words match the binding key words."""
+    if not binding_words:
+        return not routing_words
+
+    first_word = binding_words[0]
+    if first_word == "#":
+        return any(
+            _words_match(binding_words[1:], routing_words[skipped_words:])
+            for skipped_words in range(len(routing_words) + 1)
+        )
+    if not routing_words or (first_word != "*" and first_word != routing_words[0]):
+        return False
+    return _words_match(binding_words[1:], routing_words[1:])
+
+
+class Subscription:
+    """A listener for a set of topics. Each subscription has its own message queue and the messages
+       are given to the callback function one at a time in the order they were published."""
+
+    def __init__(self, topic_names: List[str], callback: MessageCallback):
+        self.__topic_names = topic_names
+        self.__callback = callback
+        self.__queue = asyncio.Queue()
+        self.__consumer_task: Optional[asyncio.Task] = None
+
+    @property
+    def topic_names(self) -> List[str]:
+        """The binding keys for the subscription."""
+        return self.__topic_names
+
+    def matches(self, routing_key: str) -> bool:
+        """Returns True, if the given routing key matches any of the binding keys of the subscription."""
+        return any(topic_matches(topic_name, routing_key) for topic_name in self.__topic_names)
+
+    def put(self, message_object: Union[AbstractMessage, Any], routing_key: str):
+        """Adds a message to the queue of the subscription."""
+        self.__queue.put_nowait((message_object, routing_key))
+        if self.__consumer_task is None or self.__consumer_task.done():
+            self.__consumer_task = asyncio.create_task(self.__consume())
+
+    async def join(self):
+        """Waits until all the queued messages have been handled."""
+        await self.__queue.join()
+
+    async def cancel(self):
+        """Stops the message handling. The messages that have not been handled are discarded."""
+        if self.__consumer_task is not None and not self.__consumer_task.done():
+            if self.__consumer_task is asyncio.current_task():
+                # called from the callback function, the consumer stops after the current message
+                self.__consumer_task = None
+                return
+            self.__consumer_task.cancel()
+            try:
+                await self.__consumer_task
+            except asyncio.CancelledError:
+                pass
+
+    async def __consume(self):
+        """Gives the queued messages to the callback function until the queue is empty."""
+        current_task = asyncio.current_task()
+        while not self.__queue.empty() and self.__consumer_task is current_task:
+            message_object, routing_key = self.__queue.get_nowait()
+            try:
+                await self.__callback(message_object, routing_key)
+            except Exception as callback_error:  # pylint: disable=broad-except
+                LOGGER.error("Error when handling a message from topic {:s}: {}".format(routing_key, callback_error))
+            finally:
+                self.__queue.task_done()
+
+
+class LoopbackBus:
+    """In-memory message bus that routes the messages using the RabbitMQ topic exchange rules.
+
+       Each published message is decoded only once and the same message object is given to all the listeners.
+       The listeners must therefore not modify the received message objects."""
+
+    def __init__(self):
+        self.__subscriptions: List[Subscription] = []
+        # the matching subscriptions for each routing key, cleared when the subscriptions change
+        self.__routes: Dict[str, List[Subscription]] = {}
+        self.published_messages = 0
+
+    def subscribe(self, topic_names: Union[str, List[str]], callback: MessageCallback) -> Subscription:
+        """Adds a new listener for the given topics and returns the subscription."""
+        if isinstance(topic_names, str):
+            topic_names = [topic_names]
+        subscription = Subscription(list(topic_names), callback)
+        self.__subscriptions.append(subscription)
+        self.__routes.clear()
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription):
+        """Removes the given subscription from the bus."""
+        if subscription in self.__subscriptions:
+            self.__subscriptions.remove(subscription)
+            self.__routes.clear()
+        await subscription.cancel()
+
+    def decode_message(self, message_bytes: bytes) -> Union[AbstractMessage, Any]:
+        """Returns the message object corresponding to the given message bytes (see decode_message)."""
+        return decode_message(message_bytes)
+
+    def publish(self, topic_name: str, message_bytes: bytes):
+        """Publishes the given message to the bus."""
+        subscriptions = self.__get_subscriptions(topic_name)
+        if subscriptions:
+            self.publish_object(topic_name, self.decode_message(message_bytes), subscriptions)
+        else:
+            self.published_messages += 1
+
+    def publish_object(self, topic_name: str, message_object: Union[AbstractMessage, Any],
+                       subscriptions: Optional[List[Subscription]] = None):
+        """Publishes an already decoded message object to the bus without serializing it."""
+        if subscriptions is None:
+            subscriptions = self.__get_subscriptions(topic_name)
+        for subscription in subscriptions:
+            subscription.put(message_object, topic_name)
+        self.published_messages += 1
+
+    async def join(self):
+        """Waits until all the published messages have been handled by the listeners."""
+        for subscription in list(self.__subscriptions):
+            await subscription.join()
+
+    async def close(self):
+        """Removes all the subscriptions from the bus."""
+        for subscription in list(self.__subscriptions):
+            await self.unsubscribe(subscription)
+
+    def __get_subscriptions(self, routing_key: str) -> List[Subscription]:
+        """Returns the subscriptions that match the given routing key."""
+        subscriptions = self.__routes.get(routing_key, None)
+        if subscriptions is None:
+            subscriptions = [
+                subscription
+                for subscription in self.__subscriptions
+                if subscription.matches(routing_key)
+            ]
+            self.__routes[routing_key] = subscriptions
+        return subscriptions
+
+
+class LoopbackClient:
+    """Client for the loopback message bus with the same interface as RabbitmqClient.
+       Any RabbitMQ connection parameters are ignored."""
+
+    def __init__(self, bus: LoopbackBus, **kwargs):
+        self.__bus = bus
+        self.__subscriptions: List[Subscription] = []
+        if kwargs:
+            LOGGER.debug("Ignored the connection parameters {:s} for the loopback client".format(
+                ", ".join(kwargs)))
+
+    @property
+    def bus(self) -> LoopbackBus:
+        """The message bus used by the client."""
+        return self.__bus
+
+    def add_listener(self, topic_names: Union[str, List[str]], callback_function: MessageCallback):
+        """Starts listening to the given topics. The received messages are given to the callback function."""
+        self.__subscriptions.append(self.__bus.subscribe(topic_names, callback_function))
+
+    async def send_message(self, topic_name: str, message_bytes: bytes):
+        """Publishes the given message to the given topic."""
+        self.__bus.publish(topic_name, message_bytes)
+
+    async def close(self):
+        """Stops all the listeners of the client."""
+        for subscription in self.__subscriptions:
+            await self.__bus.unsubscribe(subscription)
+        self.__subscriptions = []
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Runs a whole test simulation with the simulation manager, dummy components and an optional listener
+   in a single process using the loopback message bus instead of RabbitMQ.
+
+   The simulation manager settings are read from the same environmental variables as in the normal simulation
+   manager. The simulation id, the components and the number of epochs are given as command line arguments.
+
+   Usage: python3 -m loopback.simulation --components 5 --epochs 10 --max-sleep 0.1 --listener
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import os
+import time
+from typing import Any, Callable, ContextManager, Iterator, List, Optional
+
+import tools.components
+from tools.tools import FullLogger, load_environmental_variables
+
+from dummy.dummy import DummyComponent, MAX_SLEEP_TIME, MIN_SLEEP_TIME
+from listener.listener import ListenerComponent
+from loopback.bus import LoopbackBus, LoopbackClient
+from manager.manager import create_manager, get_manager_environmental_variables, get_start_timeout
+
+LOGGER = FullLogger(__name__)
+
+# The names of the simulation manager environmental variables that are overridden by the command line arguments.
+SIMULATION_ID = "SIMULATION_ID"
+SIMULATION_COMPONENTS = "SIMULATION_COMPONENTS"
+SIMULATION_MAX_EPOCHS = "SIMULATION_MAX_EPOCHS"
+
+
+@contextlib.contextmanager
+def component_rabbitmq_clients(client_factory: Callable[..., Any]) -> Iterator[None]:
+    """Context manager in which the simulation components created with AbstractSimulationComponent
+       use the clients created by the given factory function instead of RabbitMQ clients.
+       The factory function is called with the RabbitMQ connection parameters as keyword arguments."""
+    original_client_class = tools.components.RabbitmqClient
+    tools.components.RabbitmqClient = client_factory
+    try:
+        yield
+    finally:
+        tools.components.RabbitmqClient = original_client_class
+
+
+def loopback_rabbitmq_clients(bus: LoopbackBus) -> ContextManager[None]:
+    """Context manager in which the simulation components created with AbstractSimulationComponent
+       use loopback clients for the given bus instead of RabbitMQ clients."""
+    return component_rabbitmq_clients(lambda **kwargs: LoopbackClient(bus, **kwargs))
+
+
+async def run_loopback_simulation(component_count: int, max_epochs: int, simulation_id: Optional[str] = None,
+                                  use_listener: bool = False) -> float:
+    """Runs a simulation with the given number of dummy components using the loopback message bus.
+       Returns the time in seconds it took to run the simulation."""
+    if simulation_id is None:
+        simulation_id = datetime.datetime.now(datetime.timezone.utc).isoformat(
+            timespec="milliseconds").replace("+00:00", "Z")
+    component_names = ["dummy_{:d}".format(index) for index in range(1, component_count + 1)]
+
+    env_variables = load_environmental_variables(*get_manager_environmental_variables())
+    env_variables[SIMULATION_ID] = simulation_id
+    env_variables[SIMULATION_COMPONENTS] = ",".join(component_names)
+    env_variables[SIMULATION_MAX_EPOCHS] = max_epochs
+
+    bus = LoopbackBus()
+    manager_client = LoopbackClient(bus)
+    manager = create_manager(env_variables, manager_client)
+    manager_client.add_listener(manager.listened_topics, manager.general_message_handler)
+
+    if use_listener:
+        ListenerComponent(LoopbackClient(bus), simulation_id)
+
+    dummy_components: List[DummyComponent] = []
+    with loopback_rabbitmq_clients(bus):
+        for component_name in component_names:
+            dummy_component = DummyComponent(simulation_id=simulation_id, component_name=component_name)
+            await dummy_component.start()
+            dummy_components.append(dummy_component)
+    for dummy_component in dummy_components:
+        await dummy_component.send_listening_message()
+
+    start_time = time.perf_counter()
+    await manager.wait_for_components(get_start_timeout(env_variables))
+    await manager.start()
+    while not manager.is_stopped:
+        await asyncio.sleep(0.01)
+
+    # let the components handle the final simulation state message
+    await bus.join()
+    simulation_time = time.perf_counter() - start_time
+    await bus.close()
+    LOGGER.info("Simulation {:s} with {:d} components and {:d} epochs finished in {:.3f} seconds.".format(
+        simulation_id, component_count, manager.epoch_number - 1, simulation_time))
+    return simulation_time
+
+
+def main(arguments: Optional[List[str]] = None):
+    """Runs a loopback simulation using the given command line arguments."""
+    parser = argparse.ArgumentParser(description="Run a test simulation in a single process")
+    parser.add_argument("--components", type=int, default=5, help="the number of dummy components")
+    parser.add_argument("--epochs", type=int, default=5, help="the number of epochs")
+    parser.add_argument("--simulation-id", default=None, help="the simulation id")
+    parser.add_argument("--min-sleep", type=float, default=0.0,
+                        help="the minimum time the dummy components take for an epoch")
+    parser.add_argument("--max-sleep", type=float, default=0.0,
+                        help="the maximum time the dummy components take for an epoch")
+    parser.add_argument("--listener", action="store_true", help="log all the messages with a listener component")
+    options = parser.parse_args(arguments)
+
+    # the dummy components read their settings from the environmental variables
+    os.environ[MIN_SLEEP_TIME] = str(options.min_sleep)
+    os.environ[MAX_SLEEP_TIME] = str(options.max_sleep)
+
+    asyncio.run(run_loopback_simulation(options.components, options.epochs, options.simulation_id, options.listener))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the loopback message bus."""
+
+import asyncio
+from typing import Any, List, Tuple
+
+import aiounittest
+
+from tools.messages import EpochMessage, MessageGenerator, SimulationStateMessage, StatusMessage
+
+from loopback.bus import LoopbackBus, LoopbackClient, topic_matches
+from manager.manager import SimulationManager
+
+
+class MessageCollector:
+    """Collects the received messages."""
+    def __init__(self):
+        self.messages: List[Tuple[Any, str]] = []
+
+    async def callback(self, message_object: Any, message_routing_key: str):
+        """Stores the received message."""
+        self.messages.append((message_object, message_routing_key))
+
+
+class TestLoopbackBus(aiounittest.AsyncTestCase):
+    """Unit tests for the LoopbackBus and LoopbackClient classes."""
+
+    def test_topic_matching(self):
+        """Tests the topic matching rules."""
+        for binding_key, routing_key, expected_result in [
+                ("Epoch", "Epoch", True),
+                ("Epoch", "Epoch.dummy", False),
+                ("Epoch.*", "Epoch.dummy", True),
+                ("Epoch.*", "Epoch", False),
+                ("Status.*", "Status.Ready", True),
+                ("#", "Status.Ready", True),
+                ("#", "Epoch", True),
+                ("Result.#", "Result", True),
+                ("Result.#", "Result.Grid.Voltage", True),
+                ("*.Ready", "Status.Ready", True),
+                ("*.Ready", "Status.Error", False),
+                ("#.Voltage", "Result.Grid.Voltage", True),
+                ("Result.#.Voltage", "Result.Voltage", True),
+                ("Result.#.Voltage", "Result.Grid.Current", False)]:
+            with self.subTest(binding_key=binding_key, routing_key=routing_key):
+                self.assertEqual(topic_matches(binding_key, routing_key), expected_result)
+
+    async def test_delivery(self):
+        """Tests that the messages are delivered in order to the matching listeners as the same object."""
+        bus = LoopbackBus()
+        status_collector = MessageCollector()
+        all_collector = MessageCollector()
+        client = LoopbackClient(bus)
+        client.add_listener(["Status.Ready", "Status.Error"], status_collector.callback)
+        client.add_listener("#", all_collector.callback)
+
+        message_generator = MessageGenerator("sim", "component")
+        status_messages = [
+            message_generator.get_status_ready_message(EpochNumber=epoch_number, TriggeringMessageIds=["id"])
+            for epoch_number in range(5)
+        ]
+        for status_message in status_messages:
+            await client.send_message("Status.Ready", status_message.bytes())
+        await client.send_message("Result", b"not json")
+        await bus.join()
+
+        self.assertEqual(
+            [(message_object.epoch_number, routing_key) for message_object, routing_key in status_collector.messages],
+            [(epoch_number, "Status.Ready") for epoch_number in range(5)])
+        for message_object, _ in status_collector.messages:
+            self.assertIsInstance(message_object, StatusMessage)
+        self.assertEqual(len(all_collector.messages), 6)
+        self.assertIs(all_collector.messages[0][0], status_collector.messages[0][0])
+        self.assertEqual(all_collector.messages[-1], (b"not json", "Result"))
+        self.assertEqual(bus.published_messages, 6)
+
+        # after closing the client, no more messages are received
+        await client.close()
+        await client.send_message("Status.Ready", status_messages[0].bytes())
+        await bus.join()
+        self.assertEqual(len(status_collector.messages), 5)
+
+    async def test_simulation(self):
+        """Tests running a simulation manager with simple responding components through the loopback bus."""
+        bus = LoopbackBus()
+        manager_client = LoopbackClient(bus)
+        manager = SimulationManager(
+            "sim", "manager", "name", "description", "first,second", "2020-01-01T00:00:00.000Z", 3600, 3,
+            60.0, 1, "Epoch", "SimState", "Status.Ready", "Status.Error", rabbitmq_client=manager_client)
+        manager_client.add_listener(manager.listened_topics, manager.general_message_handler)
+
+        message_generators = [MessageGenerator("sim", component_name) for component_name in ["first", "second"]]
+        component_client = LoopbackClient(bus)
+        received_messages = MessageCollector()
+
+        async def component_callback(message_object: Any, message_routing_key: str):
+            await received_messages.callback(message_object, message_routing_key)
+            if isinstance(message_object, SimulationStateMessage):
+                if message_object.simulation_state != SimulationManager.SIMULATION_STATE_VALUE_RUNNING:
+                    return
+                epoch_number = 0
+            else:
+                epoch_number = message_object.epoch_number
+            for message_generator in message_generators:
+                status_message = message_generator.get_status_ready_message(
+                    EpochNumber=epoch_number, TriggeringMessageIds=[message_object.message_id])
+                await component_client.send_message("Status.Ready", status_message.bytes())
+
+        component_client.add_listener(["SimState", "Epoch"], component_callback)
+        await manager.start()
+        for _ in range(100):
+            if manager.is_stopped:
+                break
+            await asyncio.sleep(0.01)
+        await bus.join()
+
+        self.assertTrue(manager.is_stopped)
+        self.assertEqual(
+            [
+                message_object.epoch_number
+                for message_object, _ in received_messages.messages
+                if isinstance(message_object, EpochMessage)
+            ],
+            [1, 2, 3])
+        self.assertEqual(received_messages.messages[-1][1], "SimState")
+        await bus.close()
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""End-to-end benchmark for the simulation manager.
+
+   Runs the real SimulationManager against a number of synthetic components that respond to each epoch
+   immediately. The messages are passed through the in-process loopback message bus. Each component count
+   is run in a separate process so that the peak memory usage can be measured for each run.
+
+   Usage: python3 -m manager.benchmarks.epochs --components 10 1000 50000 --epochs 20 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from tools.messages import AbstractMessage, EpochMessage, MessageGenerator, SimulationStateMessage
+
+from loopback.bus import LoopbackBus, LoopbackClient
+from manager.manager import SimulationManager
+
+BENCHMARK_SIMULATION_ID = "2021-01-01T00:00:00.000Z"
+BENCHMARK_MANAGER_NAME = "manager"
+DEFAULT_COMPONENT_COUNTS = [10, 1000, 50000]
+DEFAULT_EPOCHS = 20
+
+EPOCH_TOPIC = "Epoch"
+STATE_TOPIC = "SimState"
+STATUS_TOPIC = "Status.Ready"
+ERROR_TOPIC = "Status.Error"
+
+class TimedLoopbackBus(LoopbackBus):
+    """Loopback message bus that measures the time spent on decoding the messages so that
+       it can be excluded from the manager processing time."""
+
+    def __init__(self):
+        super().__init__()
+        self.decode_time = 0.0
+
+    def decode_message(self, message_bytes: bytes) -> Union[AbstractMessage, Any]:
+        """Decodes the message and adds the used processor time to the decode time."""
+        decode_start_time = time.process_time()
+        message_object = super().decode_message(message_bytes)
+        self.decode_time += time.process_time() - decode_start_time
+        return message_object
+
+
+class SyntheticComponents:
+    """A group of synthetic simulation components that respond with a ready status message to each epoch.
+       The status messages are published without serialization and the time spent on creating them is measured
+       separately so that it can be excluded from the manager processing time."""
+
+    def __init__(self, bus: LoopbackBus, component_names: List[str]):
+        self.__bus = bus
+        self.__message_generators = [
+            MessageGenerator(BENCHMARK_SIMULATION_ID, component_name)
+            for component_name in component_names
+        ]
+        self.generation_time = 0.0
+        self.status_messages = 0
+        self.stopped = asyncio.Event()
+
+        LoopbackClient(bus).add_listener([EPOCH_TOPIC, STATE_TOPIC], self.message_handler)
+
+    async def message_handler(self, message_object: Union[AbstractMessage, Any], message_routing_key: str):
+        """Responds to the epoch messages and to the simulation state message "running"."""
+        if isinstance(message_object, SimulationStateMessage):
+            if message_object.simulation_state == SimulationManager.SIMULATION_STATE_VALUE_STOPPED:
+                self.stopped.set()
+                return
+            epoch_number = 0
+        elif isinstance(message_object, EpochMessage):
+            epoch_number = message_object.epoch_number
+        else:
+            return
+
+        for message_generator in self.__message_generators:
+            generation_start_time = time.process_time()
+            status_message = message_generator.get_status_ready_message(
+                EpochNumber=epoch_number,
+                TriggeringMessageIds=[message_object.message_id])
+            self.generation_time += time.process_time() - generation_start_time
+            self.status_messages += 1
+            self.__bus.publish_object(STATUS_TOPIC, status_message)
+
+
+def get_peak_memory() -> float:
+    """Returns the peak resident set size of the current process in megabytes."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is given in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return max_rss / 1024 ** 2
+    return max_rss / 1024
+
+
+async def run_simulation(component_count: int, epochs: int, component_registry: str,
+                         use_status_queue: bool) -> Dict[str, Any]:
+    """Runs one simulation with the given number of synthetic components and returns the measured values."""
+    component_names = ["component_{:d}".format(index) for index in range(component_count)]
+    bus = TimedLoopbackBus()
+    client = LoopbackClient(bus)
+    manager = SimulationManager(
+        simulation_id=BENCHMARK_SIMULATION_ID,
+        manager_name=BENCHMARK_MANAGER_NAME,
+        simulation_name="Benchmark",
+        simulation_description="Simulation manager benchmark",
+        simulation_components=",".join(component_names),
+        initial_start_time="2021-01-01T00:00:00.000Z",
+        epoch_length=3600,
+        max_epochs=epochs,
+        epoch_timer_interval=3600.0,
+        max_epoch_resends=0,
+        epoch_topic=EPOCH_TOPIC,
+        state_topic=STATE_TOPIC,
+        status_topic=STATUS_TOPIC,
+        error_topic=ERROR_TOPIC,
+        component_registry=component_registry,
+        use_status_queue=use_status_queue,
+        rabbitmq_client=client)
+    client.add_listener(manager.listened_topics, manager.general_message_handler)
+    components = SyntheticComponents(bus, component_names)
+
+    start_time = time.perf_counter()
+    start_cpu_time = time.process_time()
+    await manager.start()
+    await components.stopped.wait()
+    wall_time = time.perf_counter() - start_time
+    cpu_time = time.process_time() - start_cpu_time
+
+    # everything else than the synthetic components and the message decoding is counted as manager time
+    manager_cpu_time = cpu_time - components.generation_time - bus.decode_time
+    completed_epochs = manager.epoch_number - 1
+    return {
+        "components": component_count,
+        "epochs": completed_epochs,
+        "component_registry": component_registry,
+        "status_queue": use_status_queue,
+        "status_messages": components.status_messages,
+        "wall_seconds": wall_time,
+        "epochs_per_second": completed_epochs / wall_time,
+        "total_cpu_seconds": cpu_time,
+        "manager_cpu_seconds": manager_cpu_time,
+        "manager_cpu_per_epoch_ms": 1000 * manager_cpu_time / max(completed_epochs, 1),
+        "manager_cpu_per_status_message_us": 1e6 * manager_cpu_time / max(components.status_messages, 1),
+        "peak_memory_mb": get_peak_memory()
+    }
+
+
+def run_in_process(component_count: int, epochs: int, component_registry: str, use_status_queue: bool,
+                   result_queue: multiprocessing.Queue):
+    """Runs a single benchmark simulation and puts the result to the given queue."""
+    logging.disable(logging.INFO)
+    result_queue.put(asyncio.run(run_simulation(component_count, epochs, component_registry, use_status_queue)))
+
+
+def run_benchmarks(component_counts: List[int], epochs: int, component_registry: str,
+                   use_status_queue: bool) -> List[Dict[str, Any]]:
+    """Runs the benchmark simulation for each component count in a fresh process and returns the results."""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for component_count in component_counts:
+        result_queue = context.Queue()
+        process = context.Process(
+            target=run_in_process,
+            args=(component_count, epochs, component_registry, use_status_queue, result_queue))
+        process.start()
+        results.append(result_queue.get())
+        process.join()
+    return results
+
+
+def main(arguments: Optional[List[str]] = None):
+    """Runs the benchmarks and writes the results in JSON format."""
+    parser = argparse.ArgumentParser(description="Simulation manager end-to-end benchmark")
+    parser.add_argument("--components", type=int, nargs="+", default=DEFAULT_COMPONENT_COUNTS,
+                        help="the numbers of synthetic components")
+    parser.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS, help="the number of epochs in each run")
+    parser.add_argument("--registry", default=SimulationManager.COMPONENT_REGISTRY_STANDARD,
+                        choices=sorted(SimulationManager.COMPONENT_REGISTRIES), help="the component registry")
+    parser.add_argument("--status-queue", action="store_true", help="use the status queue mode")
+    parser.add_argument("--output", default="", help="the output file, standard output is used by default")
+    options = parser.parse_args(arguments)
+
+    results = {
+        "benchmark": "simulation_manager_epochs",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": run_benchmarks(options.components, options.epochs, options.registry, options.status_queue)
+    }
+
+    if options.output:
+        with open(options.output, mode="w", encoding="UTF-8") as output_file:
+            json.dump(results, output_file, indent=4)
+    else:
+        print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
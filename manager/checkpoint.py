@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains classes for writing and reading the simulation manager checkpoints.
+
+   The checkpoint file is an append-only JSON lines file. The first line is a header record that contains
+   the simulation settings that do not change during the simulation, including the component list.
+   A constant size epoch record is appended each time a new epoch is started and a resend record each time
+   the epoch message is resent. The component states are not written since at the start of an epoch
+   all the components are known to have responded to the latest full epoch. A stopped record is appended
+   when the manager is stopped. It tells whether the simulation was completed, in which case it cannot be resumed.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.tools import FullLogger
+
+LOGGER = FullLogger(__name__)
+
+HEADER_RECORD = "Header"
+EPOCH_RECORD = "Epoch"
+RESEND_RECORD = "Resend"
+STOPPED_RECORD = "Stopped"
+RECORD_TYPE = "Record"
+
+
+class CheckpointWriter:
+    """Writes the checkpoint records to a file."""
+
+    def __init__(self, file_name: str):
+        self.__file_name = file_name
+        self.__checkpoint_file = None
+
+    @property
+    def file_name(self) -> str:
+        """The name of the checkpoint file."""
+        return self.__file_name
+
+    def start(self, header: Dict[str, Any], records: Optional[List[Dict[str, Any]]] = None):
+        """Starts a new checkpoint file with the given header and records. The new file is written to
+           a temporary file first and then renamed so that the previous checkpoint remains valid until
+           the new file is ready."""
+        self.close()
+        temporary_file_name = self.__file_name + ".tmp"
+        try:
+            with open(temporary_file_name, mode="w", encoding="UTF-8") as checkpoint_file:
+                for record_type, record in [(HEADER_RECORD, header)] + [
+                        (record.get(RECORD_TYPE, EPOCH_RECORD), record) for record in records or []]:
+                    checkpoint_file.write(get_record_line(record_type, record))
+            os.replace(temporary_file_name, self.__file_name)
+            self.__checkpoint_file = open(self.__file_name, mode="a", encoding="UTF-8")
+        except OSError as file_error:
+            LOGGER.error("Could not write the checkpoint file {:s}: {}".format(self.__file_name, file_error))
+
+    def append(self, record_type: str, record: Dict[str, Any]):
+        """Appends a new record to the checkpoint file."""
+        if self.__checkpoint_file is None:
+            return
+        try:
+            self.__checkpoint_file.write(get_record_line(record_type, record))
+            self.__checkpoint_file.flush()
+        except OSError as file_error:
+            LOGGER.error("Could not write to the checkpoint file {:s}: {}".format(self.__file_name, file_error))
+
+    def close(self):
+        """Closes the checkpoint file."""
+        if self.__checkpoint_file is not None:
+            self.__checkpoint_file.close()
+            self.__checkpoint_file = None
+
+
+def get_record_line(record_type: str, record: Dict[str, Any]) -> str:
+    """Returns the given record as a line in the checkpoint file."""
+    return json.dumps(dict(record, **{RECORD_TYPE: record_type}), separators=(",", ":")) + "\n"
+
+
+def load_checkpoint(file_name: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Reads the given checkpoint file and returns the header record and the latest epoch record
+       updated with the following resend records. If the manager was stopped after the latest epoch record,
+       the epoch record also contains the attribute "Completed" from the stopped record.
+       Returns None, if no valid checkpoint was found.
+       An incomplete last line, e.g. from a crash during writing, is ignored."""
+    header: Optional[Dict[str, Any]] = None
+    epoch_record: Optional[Dict[str, Any]] = None
+    try:
+        with open(file_name, mode="r", encoding="UTF-8") as checkpoint_file:
+            for line in checkpoint_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    LOGGER.warning("Ignored an invalid line in the checkpoint file {:s}".format(file_name))
+                    continue
+                if not isinstance(record, dict):
+                    continue
+
+                record_type = record.pop(RECORD_TYPE, None)
+                if record_type == HEADER_RECORD:
+                    header, epoch_record = record, None
+                elif record_type == EPOCH_RECORD:
+                    epoch_record = record
+                elif record_type == RESEND_RECORD and epoch_record is not None and \
+                        record.get("EpochNumber", None) == epoch_record.get("EpochNumber", None):
+                    epoch_record.update(record)
+                elif record_type == STOPPED_RECORD and epoch_record is not None:
+                    epoch_record["Completed"] = record.get("Completed", False) is True
+    except OSError as file_error:
+        LOGGER.warning("Could not read the checkpoint file {:s}: {}".format(file_name, file_error))
+        return None
+
+    if header is None or epoch_record is None:
+        LOGGER.warning("No complete checkpoint found in the file {:s}".format(file_name))
+        return None
+    return header, epoch_record
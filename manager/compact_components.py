@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains a memory efficient class for keeping track of a large number of simulation components."""
+
+import array
+import itertools
+from typing import Dict, List, Optional
+
+import tools.tools as tools
+
+from manager.components import EpochCounter, SimulationComponents
+
+LOGGER = tools.FullLogger(__name__)
+
+
+class StatusMessageIdArray():
+    """Stores a list of status message ids in registration order using arrays.
+       The status message ids of the form "<component_name>-<counter>" are stored as the slot number of
+       the component and the integer counter. The other ids are stored as strings."""
+    __slots__ = ("__slots", "__counters", "__other_ids")
+
+    # The counter value used when the status message id does not follow the "<component_name>-<counter>" format.
+    OTHER_MESSAGE_ID = -1
+    # The maximum number of digits in a message id counter that always fits into the counter array.
+    MAX_COUNTER_DIGITS = 18
+
+    def __init__(self):
+        self.__slots = array.array("q")
+        self.__counters = array.array("q")
+        # the keys are the positions in the id list
+        self.__other_ids: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.__counters)
+
+    def append(self, slot: int, component_name: str, status_message_id: str):
+        """Adds the given status message id for the component in the given slot to the end of the list."""
+        id_prefix, separator, id_counter = status_message_id.rpartition("-")
+        if (separator and id_prefix == component_name and id_counter.isdigit() and
+                len(id_counter) <= StatusMessageIdArray.MAX_COUNTER_DIGITS and
+                str(int(id_counter)) == id_counter):
+            counter = int(id_counter)
+        else:
+            counter = StatusMessageIdArray.OTHER_MESSAGE_ID
+            self.__other_ids[len(self.__counters)] = status_message_id
+
+        self.__slots.append(slot)
+        self.__counters.append(counter)
+
+    def append_other_id(self, status_message_id: str):
+        """Adds the given status message id that is not associated with any component to the end of the list."""
+        self.__other_ids[len(self.__counters)] = status_message_id
+        self.__slots.append(0)
+        self.__counters.append(StatusMessageIdArray.OTHER_MESSAGE_ID)
+
+    def get_ids(self, slot_names: List[str]) -> List[str]:
+        """Returns the status message ids as a list of strings using the given component names for the slots."""
+        return [
+            self.__other_ids[position]
+            if counter == StatusMessageIdArray.OTHER_MESSAGE_ID
+            else "{:s}-{:d}".format(slot_names[slot], counter)
+            for position, (slot, counter) in enumerate(zip(self.__slots, self.__counters))
+        ]
+
+
+class CompactSimulationComponents():
+    """Keeps track of the simulation components in the same way as SimulationComponents but stores
+       the component states in typed arrays instead of one Python object per component.
+
+       Each component name is interned to an integer slot. The latest epoch numbers and error states for
+       the components and the status message ids for the latest epoch are stored in arrays indexed by
+       the slot numbers. The status message ids of the form "<component_name>-<counter>" are stored only
+       as the integer counters."""
+    __slots__ = (
+        "__slot_numbers", "__slot_names", "__epoch_numbers", "__error_states", "__error_count",
+        "__latest_status_message_ids", "__epoch_status_message_ids", "__epoch_counter"
+    )
+
+    NO_MESSAGES = SimulationComponents.NO_MESSAGES
+    MISSING_MESSAGE_ID = SimulationComponents.MISSING_MESSAGE_ID
+
+    # The epoch number used for the slots of the removed components.
+    # It is larger than any real epoch number so the removed slots never match the bulk queries.
+    REMOVED_SLOT = 2 ** 63 - 1
+
+    def __init__(self):
+        self.__slot_numbers: Dict[str, int] = {}
+        self.__slot_names: List[str] = []
+        self.__epoch_numbers = array.array("q")
+        self.__error_states = array.array("b")
+        self.__error_count = 0
+
+        self.__latest_status_message_ids = StatusMessageIdArray()
+        # the status message ids for each epoch starting from the latest full epoch
+        self.__epoch_status_message_ids: Dict[int, StatusMessageIdArray] = {}
+
+        self.__epoch_counter = EpochCounter(CompactSimulationComponents.NO_MESSAGES)
+        LOGGER.debug("New CompactSimulationComponents object created.")
+
+    def add_component(self, component_name: str):
+        """Adds a new component to the simulation component list.
+           If the given component_name is already in the list, the function prints an error message."""
+        if component_name in self.__slot_numbers:
+            LOGGER.warning("{:s} is already registered to the simulation component list".format(component_name))
+            return
+
+        self.__slot_numbers[component_name] = len(self.__slot_names)
+        self.__slot_names.append(component_name)
+        self.__epoch_numbers.append(CompactSimulationComponents.NO_MESSAGES)
+        self.__error_states.append(False)
+        self.__epoch_counter.add(CompactSimulationComponents.NO_MESSAGES)
+        LOGGER.debug("Component: {:s} registered to CompactSimulationComponents.".format(component_name))
+
+    def remove_component(self, component_name: str):
+        """Removes the given component from the simulation component list.
+           If the given component_name is not found in the list, the function prints an error message.
+           The slot of the removed component is not reused."""
+        slot = self.__slot_numbers.pop(component_name, None)
+        if slot is None:
+            LOGGER.warning("{:s} was not found in the simulation component list".format(component_name))
+            return
+
+        self.__epoch_counter.remove(self.__epoch_numbers[slot])
+        self.__remove_old_status_message_ids()
+        self.__epoch_numbers[slot] = CompactSimulationComponents.REMOVED_SLOT
+        if self.__error_states[slot]:
+            self.__error_states[slot] = False
+            self.__error_count -= 1
+        LOGGER.debug("Component: {:s} removed from CompactSimulationComponents.".format(component_name))
+
+    def register_status_message(self, component_name: str, epoch_number: int,
+                                status_message_id: str, error_state: bool = False):
+        """Registers a new ready message for the given component and epoch number."""
+        slot = self.__slot_numbers.get(component_name, None)
+        if slot is None:
+            LOGGER.warning("{:s} was not found in the simulation component list".format(component_name))
+            return
+
+        previous_epoch_number = self.__epoch_numbers[slot]
+        if epoch_number < 0:
+            LOGGER.warning("{:d} is not acceptable epoch number".format(epoch_number))
+        elif self.__error_states[slot] and not error_state:
+            LOGGER.warning("Cannot register ready status for component {:s} because it is in an error state".format(
+                component_name
+            ))
+        elif epoch_number <= previous_epoch_number:
+            LOGGER.debug("Epoch {:d} for {:s} is not larger epoch number than the previous {:d}".format(
+                epoch_number, component_name, previous_epoch_number))
+        else:
+            if (epoch_number != previous_epoch_number + 1 and
+                    previous_epoch_number != CompactSimulationComponents.NO_MESSAGES):
+                LOGGER.warning("{:d} is not the next epoch, previous was {:d}".format(
+                    epoch_number, previous_epoch_number))
+            if not status_message_id:
+                LOGGER.warning("Status message id should not be empty.")
+
+            if self.__epoch_counter.max_epoch < epoch_number:
+                # the first status message for the epoch
+                self.__latest_status_message_ids = StatusMessageIdArray()
+            self.__latest_status_message_ids.append(slot, component_name, status_message_id)
+            if epoch_number not in self.__epoch_status_message_ids:
+                self.__epoch_status_message_ids[epoch_number] = StatusMessageIdArray()
+            self.__epoch_status_message_ids[epoch_number].append(slot, component_name, status_message_id)
+
+            previous_full_epoch = self.__epoch_counter.min_epoch
+            self.__epoch_counter.move(previous_epoch_number, epoch_number)
+            if self.__epoch_counter.min_epoch != previous_full_epoch:
+                self.__remove_old_status_message_ids()
+            self.__epoch_numbers[slot] = epoch_number
+            if bool(self.__error_states[slot]) != error_state:
+                self.__error_states[slot] = error_state
+                self.__error_count += 1 if error_state else -1
+
+    def reset_components(self, epoch_number: int, status_message_ids: List[str]):
+        """Sets the latest epoch number for all the components to the given epoch and clears the error states.
+           The given status message ids are used as the status message ids for the epoch.
+           Used when the state of the components is restored from a checkpoint."""
+        self.__epoch_counter = EpochCounter(CompactSimulationComponents.NO_MESSAGES)
+        for slot in self.__slot_numbers.values():
+            self.__epoch_numbers[slot] = epoch_number
+            self.__error_states[slot] = False
+            self.__epoch_counter.add(epoch_number)
+        self.__error_count = 0
+
+        self.__latest_status_message_ids = StatusMessageIdArray()
+        for status_message_id in status_message_ids:
+            self.__latest_status_message_ids.append_other_id(status_message_id)
+        self.__epoch_status_message_ids = {epoch_number: self.__latest_status_message_ids}
+
+    @property
+    def component_count(self) -> int:
+        """The number of registered simulation components."""
+        return len(self.__slot_numbers)
+
+    def get_component_list(self, latest_epoch_less_than=None) -> List[str]:
+        """Returns a list of the registered simulation components."""
+        if latest_epoch_less_than is None:
+            return list(self.__slot_numbers)
+        return [
+            self.__slot_names[slot]
+            for slot in self.get_component_slots(latest_epoch_less_than)
+        ]
+
+    def get_component_slots(self, latest_epoch_less_than: int) -> List[int]:
+        """Returns the slot numbers of the registered components whose latest epoch number
+           is less than the given epoch number. The filtering is done directly on the epoch number array
+           without going through any per component objects."""
+        return list(itertools.compress(
+            range(len(self.__epoch_numbers)),
+            map(latest_epoch_less_than.__gt__, self.__epoch_numbers)))
+
+    def count_components(self, latest_epoch_less_than: int) -> int:
+        """Returns the number of registered components whose latest epoch number is less than the given epoch number."""
+        return sum(map(latest_epoch_less_than.__gt__, self.__epoch_numbers))
+
+    def get_latest_epoch_for_component(self, component_name: str) -> Optional[int]:
+        """Returns the latest epoch number for which the component has responded with a status message."""
+        slot = self.__slot_numbers.get(component_name, None)
+        if slot is None:
+            return None
+        return self.__epoch_numbers[slot]
+
+    def get_latest_full_epoch(self) -> int:
+        """Returns the latest epoch number for which all registered components have responded with a status message."""
+        return self.__epoch_counter.min_epoch
+
+    def get_latest_status_message_ids(self) -> List[str]:
+        """Returns the status message ids for the latest epoch as a list.
+           The ids are given in the order they have been registered."""
+        return self.__latest_status_message_ids.get_ids(self.__slot_names)
+
+    def get_status_message_ids(self, epoch_number: int) -> List[str]:
+        """Returns the status message ids registered for the given epoch in registration order.
+           The ids are available for the epochs starting from the latest full epoch."""
+        epoch_status_message_ids = self.__epoch_status_message_ids.get(epoch_number, None)
+        if epoch_status_message_ids is None:
+            return []
+        return epoch_status_message_ids.get_ids(self.__slot_names)
+
+    def is_in_normal_state(self) -> bool:
+        """Returns True, if none of the components are in an error state."""
+        return self.__error_count == 0
+
+    def is_component_in_normal_state(self, component_name: str) -> Optional[bool]:
+        """Returns True, if the given component is registered and it is not in an error state.
+           Otherwise, returns False, if the given component is registered and None if it is not."""
+        slot = self.__slot_numbers.get(component_name, None)
+        if slot is None:
+            return None
+        return not self.__error_states[slot]
+
+    def __str__(self) -> str:
+        """Returns a list of the component names with the latest epoch numbers and error states
+           given in parenthesis after each name."""
+        return ", ".join([
+            "{:s} ({:d}, {:s})".format(
+                component_name, self.__epoch_numbers[slot], str(bool(self.__error_states[slot])))
+            for component_name, slot in self.__slot_numbers.items()
+        ])
+
+    def __remove_old_status_message_ids(self):
+        """Removes the stored status message ids for the epochs before the latest full epoch."""
+        latest_full_epoch = self.__epoch_counter.min_epoch
+        for epoch_number in [
+                epoch_number for epoch_number in self.__epoch_status_message_ids if epoch_number < latest_full_epoch]:
+            del self.__epoch_status_message_ids[epoch_number]
@@ -21,6 +21,64 @@ class ComponentState:
     error_state: bool = False
 
 
+class EpochCounter():
+    """Keeps count of how many components have each epoch number as their latest registered epoch number.
+       Both the smallest and the largest of these epoch numbers are available in constant time."""
+    __slots__ = ("__empty_value", "__epoch_counts", "__min_epoch", "__max_epoch")
+
+    def __init__(self, empty_value: int):
+        self.__empty_value = empty_value
+        # Only epoch numbers with at least one component are kept as keys.
+        self.__epoch_counts = {}
+        self.__min_epoch = empty_value
+        self.__max_epoch = empty_value
+
+    @property
+    def min_epoch(self) -> int:
+        """The smallest counted epoch number or the empty value if there are no counted epochs."""
+        return self.__min_epoch
+
+    @property
+    def max_epoch(self) -> int:
+        """The largest counted epoch number or the empty value if there are no counted epochs."""
+        return self.__max_epoch
+
+    def add(self, epoch_number: int):
+        """Adds a component with the given latest epoch number to the counts."""
+        if self.__epoch_counts:
+            self.__min_epoch = min(self.__min_epoch, epoch_number)
+            self.__max_epoch = max(self.__max_epoch, epoch_number)
+        else:
+            self.__min_epoch = epoch_number
+            self.__max_epoch = epoch_number
+        self.__epoch_counts[epoch_number] = self.__epoch_counts.get(epoch_number, 0) + 1
+
+    def remove(self, epoch_number: int):
+        """Removes a component with the given latest epoch number from the counts.
+           When the last component is removed from the smallest or the largest epoch number, the new value is
+           searched from the counted epoch numbers, so the work depends only on the number of distinct epochs."""
+        epoch_count = self.__epoch_counts[epoch_number] - 1
+        if epoch_count > 0:
+            self.__epoch_counts[epoch_number] = epoch_count
+            return
+
+        del self.__epoch_counts[epoch_number]
+        if not self.__epoch_counts:
+            self.__min_epoch = self.__empty_value
+            self.__max_epoch = self.__empty_value
+            return
+
+        if epoch_number == self.__max_epoch:
+            self.__max_epoch = max(self.__epoch_counts)
+        if epoch_number == self.__min_epoch:
+            self.__min_epoch = min(self.__epoch_counts)
+
+    def move(self, old_epoch_number: int, new_epoch_number: int):
+        """Moves a component from the old latest epoch number to the new one."""
+        self.add(new_epoch_number)
+        self.remove(old_epoch_number)
+
+
 class SimulationComponents():
     """Keeps a list of components for the simulation and the latest epoch number
        for which a ready message was received from the component.
@@ -31,16 +89,22 @@ class SimulationComponents():
     def __init__(self):
         self.__components = {}  # The values are ComponentState objects
         self.__latest_status_message_ids = []
+        # the status message ids for each epoch starting from the latest full epoch
+        self.__epoch_status_message_ids = {}
         LOGGER.debug("New SimulationComponents object created.")
 
-        # invariant: self.__latest_full_epoch <= for all self.__components[component_value].epoch_number
-        self.__latest_full_epoch = SimulationComponents.NO_MESSAGES
+        # The minimum of the counted epochs is the latest full epoch and
+        # the maximum is the latest epoch for which any component has sent a status message.
+        self.__epoch_counter = EpochCounter(SimulationComponents.NO_MESSAGES)
+        # The names of the components that are currently in an error state.
+        self.__error_components = set()
 
     def add_component(self, component_name: str):
         """Adds a new component to the simulation component list.
            If the given component_name is already in the list, the function prints an error message."""
         if component_name not in self.__components:
             self.__components[component_name] = ComponentState(SimulationComponents.NO_MESSAGES, False)
+            self.__epoch_counter.add(SimulationComponents.NO_MESSAGES)
             LOGGER.info("Component: {:s} registered to SimulationComponents.".format(component_name))
         else:
             LOGGER.warning("{:s} is already registered to the simulation component list".format(component_name))
@@ -48,13 +112,15 @@ class SimulationComponents():
     def remove_component(self, component_name: str):
         """Removes the given component from the simulation component list.
            If the given component_name is not found in the list, the function prints an error message."""
-        if self.__components.pop(component_name, None) is None:
+        component_state = self.__components.pop(component_name, None)
+        if component_state is None:
             LOGGER.warning("{:s} was not found in the simulation component list".format(component_name))
         else:
+            self.__epoch_counter.remove(component_state.epoch_number)
+            self.__remove_old_status_message_ids()
+            self.__error_components.discard(component_name)
             LOGGER.info("Component: {:s} removed from SimulationComponents.".format(component_name))
 
-        self._update_latest_full_epoch()
-
     def register_status_message(self, component_name: str, epoch_number: int,
                                 status_message_id: str, error_state: bool = False):
         """Registers a new ready message for the given component and epoch number."""
@@ -80,20 +146,46 @@ class SimulationComponents():
             if not status_message_id:
                 LOGGER.warning("Status message id should not be empty.")
 
-            if max(self._get_all_epoch_values()) < epoch_number:
+            if self.__epoch_counter.max_epoch < epoch_number:
                 # the first status message for the epoch
                 self.__latest_status_message_ids = [status_message_id]
             else:
                 self.__latest_status_message_ids.append(status_message_id)
+            self.__epoch_status_message_ids.setdefault(epoch_number, []).append(status_message_id)
 
+            previous_full_epoch = self.__epoch_counter.min_epoch
+            self.__epoch_counter.move(component_state.epoch_number, epoch_number)
+            if self.__epoch_counter.min_epoch != previous_full_epoch:
+                self.__remove_old_status_message_ids()
             component_state.epoch_number = epoch_number
             component_state.error_state = error_state
-            self._update_latest_full_epoch()
+            if error_state:
+                self.__error_components.add(component_name)
+            else:
+                self.__error_components.discard(component_name)
             LOGGER.debug("{state_type:s} message for epoch {epoch:d} from component {component:s} registered.".format(
                 state_type="Error" if error_state else "Ready",
                 epoch=epoch_number,
                 component=component_name))
 
+    def reset_components(self, epoch_number: int, status_message_ids: List[str]):
+        """Sets the latest epoch number for all the components to the given epoch and clears the error states.
+           The given status message ids are used as the status message ids for the epoch.
+           Used when the state of the components is restored from a checkpoint."""
+        self.__epoch_counter = EpochCounter(SimulationComponents.NO_MESSAGES)
+        for component_state in self.__components.values():
+            component_state.epoch_number = epoch_number
+            component_state.error_state = False
+            self.__epoch_counter.add(epoch_number)
+        self.__error_components.clear()
+        self.__latest_status_message_ids = list(status_message_ids)
+        self.__epoch_status_message_ids = {epoch_number: list(status_message_ids)}
+
+    @property
+    def component_count(self) -> int:
+        """The number of registered simulation components."""
+        return len(self.__components)
+
     def get_component_list(self, latest_epoch_less_than=None) -> List[str]:
         """Returns a list of the registered simulation components."""
         if latest_epoch_less_than is None:
@@ -113,16 +205,21 @@ class SimulationComponents():
 
     def get_latest_full_epoch(self) -> int:
         """Returns the latest epoch number for which all registered components have responded with a status message."""
-        return self.__latest_full_epoch
+        return self.__epoch_counter.min_epoch
 
     def get_latest_status_message_ids(self) -> List[str]:
         """Returns the status message ids for the latest epoch as a list.
            The ids are given in the order they have been registered."""
         return self.__latest_status_message_ids
 
+    def get_status_message_ids(self, epoch_number: int) -> List[str]:
+        """Returns the status message ids registered for the given epoch in registration order.
+           The ids are available for the epochs starting from the latest full epoch."""
+        return self.__epoch_status_message_ids.get(epoch_number, [])
+
     def is_in_normal_state(self) -> bool:
         """Returns True, if none of the components are in an error state."""
-        return True not in self._get_all_error_states()
+        return not self.__error_components
 
     def is_component_in_normal_state(self, component_name: str) -> Optional[bool]:
         """Returns True, if the given component is registered and it is not in an error state.
@@ -140,15 +237,9 @@ class SimulationComponents():
             for component_name, component_status in self.__components.items()
         ])
 
-    def _get_all_epoch_values(self) -> List[int]:
-        """Returns all the epoch numbers (the epochs with the most recent received status message per component)
-           for the components as a list."""
-        return [component_state.epoch_number for component_state in self.__components.values()]
-
-    def _get_all_error_states(self) -> List[bool]:
-        """Returns all the error state for the components as a list."""
-        return [component_state.error_state for component_state in self.__components.values()]
-
-    def _update_latest_full_epoch(self):
-        """Updates the value for the latest full epoch."""
-        self.__latest_full_epoch = min(self._get_all_epoch_values())
+    def __remove_old_status_message_ids(self):
+        """Removes the stored status message ids for the epochs before the latest full epoch."""
+        latest_full_epoch = self.__epoch_counter.min_epoch
+        for epoch_number in [
+                epoch_number for epoch_number in self.__epoch_status_message_ids if epoch_number < latest_full_epoch]:
+            del self.__epoch_status_message_ids[epoch_number]
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains a class for creating the epoch messages in bytes format from a pre-serialized template."""
+
+import json
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.tools import FullLogger
+
+LOGGER = FullLogger(__name__)
+
+
+class EpochMessageTemplate:
+    """Pre-serialized epoch message in which only the values of the variable attributes are changed.
+
+       The template is created from a serialized epoch message by finding the JSON formatting that reproduces
+       the message exactly and by splitting the serialized message at the values of the variable attributes.
+       The invariant parts are encoded only once and for each new message only the variable values are serialized."""
+    VARIABLE_ATTRIBUTES = ("MessageId", "Timestamp", "EpochNumber", "TriggeringMessageIds", "StartTime", "EndTime")
+
+    # the JSON formatting options that are tried when reproducing the serialized message
+    SEPARATOR_OPTIONS = ((", ", ": "), (",", ":"))
+    ENSURE_ASCII_OPTIONS = (True, False)
+
+    def __init__(self, segments: List[bytes], attribute_order: List[str],
+                 separators: Tuple[str, str], ensure_ascii: bool):
+        self.__segments = segments
+        self.__attribute_order = attribute_order
+        self.__separators = separators
+        self.__ensure_ascii = ensure_ascii
+
+    @classmethod
+    def from_message(cls, message_bytes: bytes) -> Optional["EpochMessageTemplate"]:
+        """Creates a new template from the given serialized epoch message.
+           Returns None, if the message could not be reproduced exactly with the standard JSON formatting."""
+        try:
+            message_json = json.loads(message_bytes)
+        except (UnicodeDecodeError, ValueError):
+            LOGGER.warning("Could not decode the epoch message for the epoch message template.")
+            return None
+        if not isinstance(message_json, dict) or any(
+                attribute_name not in message_json for attribute_name in cls.VARIABLE_ATTRIBUTES):
+            LOGGER.warning("The epoch message does not contain all the variable attributes.")
+            return None
+
+        for separators in cls.SEPARATOR_OPTIONS:
+            for ensure_ascii in cls.ENSURE_ASCII_OPTIONS:
+                if json.dumps(message_json, separators=separators, ensure_ascii=ensure_ascii).encode(
+                        "UTF-8") == message_bytes:
+                    return cls.__create_template(message_json, separators, ensure_ascii)
+
+        LOGGER.warning("Could not reproduce the epoch message serialization for the epoch message template.")
+        return None
+
+    @classmethod
+    def __create_template(cls, message_json: Dict[str, Any], separators: Tuple[str, str],
+                          ensure_ascii: bool) -> "EpochMessageTemplate":
+        """Creates the template by replacing the variable values with unique placeholders
+           and splitting the serialized message at the placeholders."""
+        placeholder_id = uuid.uuid4().hex
+        placeholders = {
+            attribute_name: "__template_{:s}_{:s}__".format(attribute_name, placeholder_id)
+            for attribute_name in cls.VARIABLE_ATTRIBUTES
+        }
+        template_json = {
+            attribute_name: placeholders.get(attribute_name, attribute_value)
+            for attribute_name, attribute_value in message_json.items()
+        }
+        template_string = json.dumps(template_json, separators=separators, ensure_ascii=ensure_ascii)
+
+        attribute_order = [
+            attribute_name
+            for attribute_name in message_json
+            if attribute_name in placeholders
+        ]
+        segments = []
+        for attribute_name in attribute_order:
+            segment, template_string = template_string.split(json.dumps(placeholders[attribute_name]), 1)
+            segments.append(segment.encode("UTF-8"))
+        segments.append(template_string.encode("UTF-8"))
+
+        return cls(segments, attribute_order, separators, ensure_ascii)
+
+    def get_message_bytes(self, message_id: str, timestamp: str, epoch_number: int,
+                          triggering_message_ids: Any, start_time: str, end_time: str) -> bytes:
+        """Returns the serialized epoch message with the given values for the variable attributes.
+           The start and end times must be given as strings in the same format as in the epoch messages."""
+        attribute_values = {
+            "MessageId": message_id,
+            "Timestamp": timestamp,
+            "EpochNumber": epoch_number,
+            "TriggeringMessageIds": triggering_message_ids,
+            "StartTime": start_time,
+            "EndTime": end_time
+        }
+
+        message_parts = [self.__segments[0]]
+        for attribute_name, segment in zip(self.__attribute_order, self.__segments[1:]):
+            message_parts.append(json.dumps(
+                attribute_values[attribute_name], separators=self.__separators,
+                ensure_ascii=self.__ensure_ascii).encode("UTF-8"))
+            message_parts.append(segment)
+        return b"".join(message_parts)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains a host process that runs several simulation managers using a shared message bus client."""
+
+import asyncio
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Union, cast
+
+from tools.clients import RabbitmqClient
+from tools.messages import BaseMessage
+from tools.tools import FullLogger, load_environmental_variables
+
+from manager.manager import (
+    TIMEOUT_INTERVAL, SimulationManager, create_manager, get_manager_environmental_variables, get_resume,
+    get_start_timeout, start_simulation)
+from manager.metrics import MetricsCollection, MetricsExporter
+
+LOGGER = FullLogger(__name__)
+
+# The names of the environmental variables used by the host.
+__SIMULATION_HOST_CONFIGURATION = "SIMULATION_HOST_CONFIGURATION"
+
+# The names of the simulation specific settings that are handled by the host.
+SIMULATION_ID = "SIMULATION_ID"
+SIMULATION_STATUS_QUEUE = "SIMULATION_STATUS_QUEUE"
+SIMULATION_METRICS_FILE = "SIMULATION_METRICS_FILE"
+SIMULATION_METRICS_PORT = "SIMULATION_METRICS_PORT"
+SIMULATION_METRICS_HOST = "SIMULATION_METRICS_HOST"
+SIMULATION_METRICS_INTERVAL = "SIMULATION_METRICS_INTERVAL"
+SIMULATION_CHECKPOINT_FILE = "SIMULATION_CHECKPOINT_FILE"
+
+
+def convert_setting_value(setting_value: Any, value_type: type) -> Any:
+    """Converts a setting value read from the host configuration file to the given type."""
+    if value_type is bool and isinstance(setting_value, str):
+        return setting_value.lower() in ("true", "yes", "1")
+    return value_type(setting_value)
+
+
+def get_simulation_file_name(file_name: str, simulation_id: str) -> str:
+    """Returns a simulation specific file name by adding the simulation id before the file extension.
+       The characters in the simulation id that are not safe in file names are replaced with underscores."""
+    file_root, file_extension = os.path.splitext(file_name)
+    return "{:s}_{:s}{:s}".format(file_root, re.sub(r"[^A-Za-z0-9._-]", "_", simulation_id), file_extension)
+
+
+class SimulationManagerHost:
+    """Runs several simulation managers in the same event loop.
+
+       All the managers share the same message bus client, and the host listens to the status and error topics
+       only once. The received messages are routed to the correct manager based on the simulation id.
+       The metrics of all the simulations are exposed through one exporter using the metrics settings from
+       the environmental variables. The simulations are separated by the simulation_id label.
+       A checkpoint file name given in the environmental variables is made simulation specific
+       by adding the simulation id to it. When resuming, each simulation continues from its own checkpoint
+       and the already completed simulations are not started."""
+
+    def __init__(self, simulation_settings: List[Dict[str, Any]], rabbitmq_client: Optional[RabbitmqClient] = None):
+        """The simulation_settings contains a dictionary for each simulation. The keys in the dictionaries are
+           the names of the simulation manager environmental variables and the environmental variables are used as
+           the default values. By default, the hosted managers use the status queue mode so that handling
+           the messages for one simulation does not delay the messages for the other simulations."""
+        self.__rabbitmq_client = RabbitmqClient() if rabbitmq_client is None else rabbitmq_client
+        self.__managers: Dict[str, SimulationManager] = {}
+        self.__start_timeouts: Dict[str, float] = {}
+        self.__resumes: Dict[str, bool] = {}
+
+        variable_definitions = get_manager_environmental_variables()
+        default_values = load_environmental_variables(*variable_definitions)
+        default_values[SIMULATION_STATUS_QUEUE] = True
+
+        # the hosted managers would all try to use the same metrics file and port, so the host exports the metrics
+        self.__metrics = MetricsCollection()
+        self.__metrics_exporter = MetricsExporter(
+            self.__metrics,
+            file_name=cast(str, default_values[SIMULATION_METRICS_FILE]),
+            port=cast(int, default_values[SIMULATION_METRICS_PORT]),
+            host=cast(str, default_values[SIMULATION_METRICS_HOST]),
+            interval=cast(float, default_values[SIMULATION_METRICS_INTERVAL]))
+        listened_topics = set()
+        checkpoint_files = set()
+
+        for simulation_setting in simulation_settings:
+            env_variables = dict(default_values)
+            for variable_definition in variable_definitions:
+                variable_name, variable_type = variable_definition[0], variable_definition[1]
+                if variable_name in simulation_setting:
+                    env_variables[variable_name] = convert_setting_value(
+                        simulation_setting[variable_name], variable_type)
+
+            simulation_id = env_variables[SIMULATION_ID]
+            if not isinstance(simulation_id, str) or not simulation_id:
+                LOGGER.error("Simulation without a simulation id in the host settings was ignored.")
+                continue
+            if simulation_id in self.__managers:
+                LOGGER.error("Simulation id '{:s}' is used more than once in the host settings.".format(simulation_id))
+                continue
+
+            checkpoint_file = cast(str, env_variables[SIMULATION_CHECKPOINT_FILE])
+            if checkpoint_file and SIMULATION_CHECKPOINT_FILE not in simulation_setting:
+                checkpoint_file = get_simulation_file_name(checkpoint_file, simulation_id)
+                env_variables[SIMULATION_CHECKPOINT_FILE] = checkpoint_file
+            if checkpoint_file in checkpoint_files:
+                LOGGER.error("Simulation '{:s}' was ignored since its checkpoint file {:s} is already used.".format(
+                    simulation_id, checkpoint_file))
+                continue
+            if checkpoint_file:
+                checkpoint_files.add(checkpoint_file)
+
+            if SIMULATION_METRICS_FILE in simulation_setting or SIMULATION_METRICS_PORT in simulation_setting:
+                LOGGER.warning("The metrics settings for simulation '{:s}' were ignored. ".format(simulation_id) +
+                               "The host exports the metrics for all the simulations.")
+            env_variables[SIMULATION_METRICS_FILE] = ""
+            env_variables[SIMULATION_METRICS_PORT] = 0
+
+            manager = create_manager(env_variables, self.__rabbitmq_client)
+            self.__managers[simulation_id] = manager
+            self.__metrics.add(manager.metrics)
+            self.__start_timeouts[simulation_id] = get_start_timeout(env_variables)
+            self.__resumes[simulation_id] = get_resume(env_variables)
+            listened_topics.update(manager.listened_topics)
+
+        LOGGER.info("Simulation manager host created with {:d} simulations.".format(len(self.__managers)))
+        self.__rabbitmq_client.add_listener(sorted(listened_topics), self.general_message_handler)
+
+    @property
+    def managers(self) -> Dict[str, SimulationManager]:
+        """The hosted simulation managers with the simulation ids as keys."""
+        return self.__managers
+
+    @property
+    def is_stopped(self) -> bool:
+        """Returns True, if all the hosted simulations are stopped."""
+        return all(manager.is_stopped for manager in self.__managers.values())
+
+    async def general_message_handler(self, message_object: Union[BaseMessage, Any], message_routing_key: str):
+        """Forwards the received message to the simulation manager that is responsible for the simulation."""
+        manager = self.__managers.get(getattr(message_object, "simulation_id", None), None)
+        if manager is None:
+            LOGGER.debug("Received a message at topic {:s} for an unknown simulation".format(message_routing_key))
+            return
+
+        await manager.general_message_handler(message_object, message_routing_key)
+
+    async def start(self):
+        """Starts the metrics exporter and all the hosted simulations.
+           Each simulation is started as soon as its components are listening or, when resuming,
+           immediately from its checkpoint."""
+        await self.__metrics_exporter.start()
+        await asyncio.gather(*(
+            self.__start_simulation(simulation_id, manager)
+            for simulation_id, manager in self.__managers.items()
+        ))
+
+    async def close(self):
+        """Stops the metrics exporter and closes the shared message bus client."""
+        await self.__metrics_exporter.stop()
+        await self.__rabbitmq_client.close()
+
+    async def __start_simulation(self, simulation_id: str, manager: SimulationManager):
+        """Starts or resumes a single simulation."""
+        await start_simulation(manager, self.__start_timeouts[simulation_id], self.__resumes[simulation_id])
+
+
+def load_host_settings(settings_file_name: str) -> List[Dict[str, Any]]:
+    """Loads the simulation settings from the given JSON file. The file should contain a list of objects, and
+       the attribute names in the objects should be the names of the simulation manager environmental variables."""
+    with open(settings_file_name, mode="r", encoding="UTF-8") as settings_file:
+        simulation_settings = json.load(settings_file)
+
+    if not isinstance(simulation_settings, list):
+        LOGGER.error("The host settings file {:s} does not contain a list.".format(settings_file_name))
+        return []
+    return [
+        simulation_setting
+        for simulation_setting in simulation_settings
+        if isinstance(simulation_setting, dict)
+    ]
+
+
+async def start_manager_host():
+    """Starts the simulation manager host process."""
+    env_variables = load_environmental_variables(
+        (__SIMULATION_HOST_CONFIGURATION, str, "")
+    )
+    settings_file_name = cast(str, env_variables[__SIMULATION_HOST_CONFIGURATION])
+    if not settings_file_name:
+        LOGGER.error("No host settings file given.")
+        return
+
+    host = SimulationManagerHost(load_host_settings(settings_file_name))
+    await host.start()
+
+    # Wait in an endless loop until all the simulations have stopped.
+    while not host.is_stopped:
+        await asyncio.sleep(TIMEOUT_INTERVAL)
+
+    await host.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(start_manager_host())
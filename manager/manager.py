@@ -8,21 +8,31 @@
 
 import asyncio
 import datetime
-from typing import Optional, cast, Any, Union
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union, cast
 
 from tools.clients import RabbitmqClient
-from tools.datetime_tools import to_utc_datetime_object
+from tools.datetime_tools import get_utcnow_in_milliseconds, to_iso_format_datetime_string, to_utc_datetime_object
 from tools.exceptions.messages import MessageError
-from tools.messages import BaseMessage, StatusMessage, SimulationStateMessage, MessageGenerator
+from tools.messages import BaseMessage, EpochMessage, StatusMessage, SimulationStateMessage, get_next_message_id
 from tools.timer import Timer
 from tools.tools import FullLogger, load_environmental_variables
 
+from manager.checkpoint import CheckpointWriter, EPOCH_RECORD, RESEND_RECORD, STOPPED_RECORD, load_checkpoint
+from manager.compact_components import CompactSimulationComponents
 from manager.components import SimulationComponents
+from manager.epoch_template import EpochMessageTemplate
+from manager.metrics import ManagerMetrics, MetricsExporter
+from manager.publisher import PublishPipeline
+from manager.time_advance import get_epoch_end_time, parse_next_action_time
+from manager.timeouts import AdaptiveEpochTimeout
+from manager.triggering_ids import get_triggering_ids_digest, get_triggering_ids_message
 
 LOGGER = FullLogger(__name__)
 
-# The time interval in seconds that is waited after the start before the simulation state message "running" is sent.
-# Also used as the time interval that is waited before closing after ending the simulation.
+# The default maximum time interval in seconds that is waited after the start for the simulation components to report
+# that they are listening before the simulation state message "running" is sent.
+# Also used as the time interval between the checks whether the simulation has ended.
 TIMEOUT_INTERVAL = 10
 
 # The names of the environmental variables used by the component.
@@ -33,6 +43,7 @@ __SIMULATION_EPOCH_MESSAGE_TOPIC = "SIMULATION_EPOCH_MESSAGE_TOPIC"
 __SIMULATION_STATUS_MESSAGE_TOPIC = "SIMULATION_STATUS_MESSAGE_TOPIC"
 __SIMULATION_STATE_MESSAGE_TOPIC = "SIMULATION_STATE_MESSAGE_TOPIC"
 __SIMULATION_ERROR_MESSAGE_TOPIC = "SIMULATION_ERROR_MESSAGE_TOPIC"
+__SIMULATION_LISTENING_MESSAGE_TOPIC = "SIMULATION_LISTENING_MESSAGE_TOPIC"
 
 __SIMULATION_COMPONENTS = "SIMULATION_COMPONENTS"
 __SIMULATION_NAME = "SIMULATION_NAME"
@@ -43,6 +54,27 @@ __SIMULATION_EPOCH_LENGTH = "SIMULATION_EPOCH_LENGTH"
 __SIMULATION_MAX_EPOCHS = "SIMULATION_MAX_EPOCHS"
 __SIMULATION_EPOCH_TIMER_INTERVAL = "SIMULATION_EPOCH_TIMER_INTERVAL"
 __SIMULATION_MAX_EPOCH_RESENDS = "SIMULATION_MAX_EPOCH_RESENDS"
+__SIMULATION_COMPONENT_REGISTRY = "SIMULATION_COMPONENT_REGISTRY"
+__SIMULATION_START_TIMEOUT = "SIMULATION_START_TIMEOUT"
+__SIMULATION_STOP_TIMEOUT = "SIMULATION_STOP_TIMEOUT"
+__SIMULATION_STATUS_QUEUE = "SIMULATION_STATUS_QUEUE"
+__SIMULATION_EPOCH_TIMER_MODE = "SIMULATION_EPOCH_TIMER_MODE"
+__SIMULATION_EPOCH_TIMER_MIN = "SIMULATION_EPOCH_TIMER_MIN"
+__SIMULATION_EPOCH_TIMER_MAX = "SIMULATION_EPOCH_TIMER_MAX"
+__SIMULATION_EPOCH_TIMER_BACKOFF = "SIMULATION_EPOCH_TIMER_BACKOFF"
+__SIMULATION_EPOCH_RESEND_MODE = "SIMULATION_EPOCH_RESEND_MODE"
+__SIMULATION_EPOCH_LOOKAHEAD = "SIMULATION_EPOCH_LOOKAHEAD"
+__SIMULATION_INDEPENDENT_COMPONENTS = "SIMULATION_INDEPENDENT_COMPONENTS"
+__SIMULATION_METRICS_FILE = "SIMULATION_METRICS_FILE"
+__SIMULATION_METRICS_PORT = "SIMULATION_METRICS_PORT"
+__SIMULATION_METRICS_HOST = "SIMULATION_METRICS_HOST"
+__SIMULATION_METRICS_INTERVAL = "SIMULATION_METRICS_INTERVAL"
+__SIMULATION_EPOCH_MESSAGE_TEMPLATE = "SIMULATION_EPOCH_MESSAGE_TEMPLATE"
+__SIMULATION_COMPACT_TRIGGERING_IDS_THRESHOLD = "SIMULATION_COMPACT_TRIGGERING_IDS_THRESHOLD"
+__SIMULATION_TRIGGERING_IDS_TOPIC = "SIMULATION_TRIGGERING_IDS_TOPIC"
+__SIMULATION_CHECKPOINT_FILE = "SIMULATION_CHECKPOINT_FILE"
+__SIMULATION_RESUME = "SIMULATION_RESUME"
+__SIMULATION_SKIP_IDLE_EPOCHS = "SIMULATION_SKIP_IDLE_EPOCHS"
 
 
 class SimulationManager:
@@ -53,22 +85,94 @@ class SimulationManager:
     READY_STATUS = StatusMessage.STATUS_VALUES[0]   # "ready"
     ERROR_STATUS = StatusMessage.STATUS_VALUES[-1]  # "error"
 
+    # The available classes for keeping track of the simulation components.
+    # The compact registry is meant for simulations with a very large number of components.
+    COMPONENT_REGISTRY_STANDARD = "standard"
+    COMPONENT_REGISTRY_COMPACT = "compact"
+    COMPONENT_REGISTRIES = {
+        COMPONENT_REGISTRY_STANDARD: SimulationComponents,
+        COMPONENT_REGISTRY_COMPACT: CompactSimulationComponents
+    }
+
+    # The fixed epoch timer uses the epoch timer interval multiplied by the number of tries.
+    # The adaptive epoch timer determines the timeout from the observed epoch durations.
+    EPOCH_TIMER_FIXED = "fixed"
+    EPOCH_TIMER_ADAPTIVE = "adaptive"
+
+    # The broadcast resend mode resends the epoch message to the common epoch topic.
+    # The targeted resend mode resends the epoch message only to the lagging components using the topics
+    # "<epoch_topic>.<component_name>" if at least one component has already responded for the epoch.
+    # The components must listen to their own epoch topic for this to work, so the last resend for each epoch
+    # is always sent to the common epoch topic.
+    EPOCH_RESEND_BROADCAST = "broadcast"
+    EPOCH_RESEND_TARGETED = "targeted"
+
     def __init__(self, simulation_id: str, manager_name: str, simulation_name: str, simulation_description: str,
                  simulation_components: str, initial_start_time: str, epoch_length: int, max_epochs: int,
                  epoch_timer_interval: float, max_epoch_resends: int,
-                 epoch_topic: str, state_topic: str, status_topic: str, error_topic: str):
+                 epoch_topic: str, state_topic: str, status_topic: str, error_topic: str,
+                 component_registry: str = COMPONENT_REGISTRY_STANDARD, listening_topic: str = "Status.Listening",
+                 stop_timeout: float = TIMEOUT_INTERVAL / 2, use_status_queue: bool = False,
+                 rabbitmq_client: Optional[RabbitmqClient] = None,
+                 epoch_timer_mode: str = EPOCH_TIMER_FIXED, epoch_timer_min: float = 1.0,
+                 epoch_timer_max: float = 3600.0, epoch_timer_backoff: float = 2.0,
+                 epoch_resend_mode: str = EPOCH_RESEND_BROADCAST,
+                 epoch_lookahead: int = 0, independent_components: str = "",
+                 metrics_file: str = "", metrics_port: int = 0, metrics_host: str = "127.0.0.1",
+                 metrics_interval: float = 10.0, use_epoch_message_template: bool = True,
+                 compact_triggering_ids_threshold: int = 0, triggering_ids_topic: str = "TriggeringIds",
+                 checkpoint_file: str = "", skip_idle_epochs: bool = False):
+        """If rabbitmq_client is given, it is used for sending the messages and the caller is responsible
+           for forwarding the received messages to general_message_handler and for closing the client.
+           Otherwise, the manager creates its own client and listens to the status and error topics.
+
+           If epoch_lookahead is larger than zero, the manager starts new epochs up to epoch_lookahead epochs
+           ahead of the latest epoch for which all the components have responded. The lookahead is used only
+           if all the simulation components are listed in independent_components, i.e. they have declared
+           that they do not depend on the other components within an epoch.
+
+           The collected metrics are written to metrics_file every metrics_interval seconds if metrics_file
+           is given, and served over HTTP at metrics_host and metrics_port if metrics_port is given.
+
+           If use_epoch_message_template is True, the epoch messages after the first one are created from
+           a pre-serialized template instead of constructing and serializing a full message object each time.
+
+           If compact_triggering_ids_threshold is larger than zero and the number of triggering message ids for
+           an epoch is at least the threshold, the epoch message contains only a digest of the triggering message
+           ids and the full list is published separately to triggering_ids_topic (see manager.triggering_ids).
+
+           If checkpoint_file is given, the manager state is written to the file at the start of each epoch
+           and a stopped manager can continue the simulation from the file with resume_from_checkpoint.
+
+           If skip_idle_epochs is True and all the components have reported the next simulated time at which they
+           need to act in their ready status messages, the idle epochs before that time are merged into the next
+           epoch (see manager.time_advance). Idle epochs are not skipped in the lookahead mode."""
         # TODO: add some argument value checks here
-        self.__rabbitmq_client = RabbitmqClient()
+        self.__owns_rabbitmq_client = rabbitmq_client is None
+        self.__rabbitmq_client = RabbitmqClient() if rabbitmq_client is None else rabbitmq_client
+        # the outgoing messages are sent through the publish pipeline
+        self.__publisher = PublishPipeline(self.__rabbitmq_client)
+        # the maximum time in seconds that is waited for the outgoing messages to be confirmed when stopping
+        self.__stop_timeout = stop_timeout
         self.__simulation_id = simulation_id
         self.__manager_name = manager_name
         self.__simulation_name = simulation_name
         self.__simulation_description = simulation_description
         self.__is_stopped = True
 
-        self.__simulation_components = SimulationComponents()
-        for component_name in cast(str, simulation_components.split(",")):
-            if component_name:
-                self.__simulation_components.add_component(component_name)
+        component_registry_class = SimulationManager.COMPONENT_REGISTRIES.get(component_registry, None)
+        if component_registry_class is None:
+            LOGGER.warning("Unknown component registry '{:s}', using '{:s}' instead".format(
+                component_registry, SimulationManager.COMPONENT_REGISTRY_STANDARD))
+            component_registry_class = SimulationComponents
+        self.__simulation_components = component_registry_class()
+        self.__component_names = [
+            component_name
+            for component_name in simulation_components.split(",")
+            if component_name
+        ]
+        for component_name in self.__component_names:
+            self.__simulation_components.add_component(component_name)
 
         self.__simulation_state = SimulationManager.SIMULATION_STATE_VALUE_STOPPED
         self.__epoch_number = 0
@@ -80,35 +184,159 @@ class SimulationManager:
         self.__epoch_timer = None
         self.__max_epoch_resends = max_epoch_resends
         self.__epoch_resends = 0
+        # the performance counter value at the start of the current epoch
+        self.__epoch_start_time = time.perf_counter()
+        if epoch_timer_mode == SimulationManager.EPOCH_TIMER_ADAPTIVE:
+            self.__adaptive_timeout = AdaptiveEpochTimeout(
+                initial_timeout=epoch_timer_interval,
+                min_timeout=epoch_timer_min,
+                max_timeout=epoch_timer_max,
+                backoff=epoch_timer_backoff)
+        else:
+            if epoch_timer_mode != SimulationManager.EPOCH_TIMER_FIXED:
+                LOGGER.warning("Unknown epoch timer mode '{:s}', using '{:s}' instead".format(
+                    epoch_timer_mode, SimulationManager.EPOCH_TIMER_FIXED))
+            self.__adaptive_timeout = None
+
+        if epoch_resend_mode not in (SimulationManager.EPOCH_RESEND_BROADCAST, SimulationManager.EPOCH_RESEND_TARGETED):
+            LOGGER.warning("Unknown epoch resend mode '{:s}', using '{:s}' instead".format(
+                epoch_resend_mode, SimulationManager.EPOCH_RESEND_BROADCAST))
+        self.__targeted_resends = epoch_resend_mode == SimulationManager.EPOCH_RESEND_TARGETED
+
+        self.__epoch_lookahead = max(epoch_lookahead, 0)
+        if self.__epoch_lookahead > 0:
+            independent_component_names = set(independent_components.split(","))
+            dependent_components = [
+                component_name
+                for component_name in self.__simulation_components.get_component_list()
+                if component_name not in independent_component_names
+            ]
+            if dependent_components:
+                LOGGER.warning("Epoch lookahead disabled because components {:s} are not independent".format(
+                    ", ".join(dependent_components)))
+                self.__epoch_lookahead = 0
+            else:
+                LOGGER.info("Epoch lookahead of {:d} epochs in use".format(self.__epoch_lookahead))
 
         self.__current_start_time = to_utc_datetime_object(initial_start_time)
         self.__current_end_time = None
+        # the simulated time after which no new epochs are started
+        self.__simulation_end_time = self.__current_start_time + max_epochs * datetime.timedelta(seconds=epoch_length)
+
+        # the next action times reported by the components in their ready messages for the current epoch
+        self.__next_action_times: Dict[str, Optional[datetime.datetime]] = {}
+        self.__skip_idle_epochs = skip_idle_epochs
+        if self.__skip_idle_epochs and self.__epoch_lookahead > 0:
+            LOGGER.warning("Skipping idle epochs is not supported in the lookahead mode")
+            self.__skip_idle_epochs = False
 
         self.__epoch_topic = epoch_topic
         self.__state_topic = state_topic
         self.__status_topic = status_topic
         self.__error_topic = error_topic
+        self.__listening_topic = listening_topic
+
+        # in the status queue mode, the received status messages are handled in batches by a single consumer task
+        self.__status_queue = asyncio.Queue() if use_status_queue else None
+        self.__status_consumer_task = None
+
+        # the components that have reported that they are listening to the message bus before the simulation start
+        self.__listening_components = set()
+        self.__all_components_listening = asyncio.Event()
+        self.__readiness_time = None
+
+        self.__message_id_generator = get_next_message_id(self.__manager_name)
+        # the template is created from the first epoch message if the template is in use
+        self.__use_epoch_message_template = use_epoch_message_template
+        self.__epoch_message_template: Optional[EpochMessageTemplate] = None
+        # the latest epoch message in bytes format and its message id, used when resending the epoch message
+        self.__epoch_message: Optional[bytes] = None
+        self.__epoch_message_id: Optional[str] = None
+        self.__compact_triggering_ids_threshold = compact_triggering_ids_threshold
+        self.__triggering_ids_topic = triggering_ids_topic
+
+        self.__metrics = ManagerMetrics(self.__simulation_id)
+        self.__metrics_exporter = MetricsExporter(
+            self.__metrics, file_name=metrics_file, port=metrics_port, host=metrics_host, interval=metrics_interval)
 
-        self.__message_generator = MessageGenerator(self.__simulation_id, self.__manager_name)
+        self.__checkpoint_writer = CheckpointWriter(checkpoint_file) if checkpoint_file else None
+        # True, if the manager state has been restored from a checkpoint and the simulation is already running
+        self.__resumed = False
+        # True, if the simulation was stopped because all the epochs have been run
+        self.__is_completed = False
 
-        self.__rabbitmq_client.add_listener(
-            [
-                self.__status_topic,
-                self.__error_topic
-            ],
-            self.general_message_handler)
+        if self.__owns_rabbitmq_client:
+            self.__rabbitmq_client.add_listener(self.listened_topics, self.general_message_handler)
 
     @property
     def is_stopped(self) -> bool:
         """Returns True, if the simulation is stopped."""
         return self.__is_stopped
 
+    @property
+    def listened_topics(self) -> List[str]:
+        """The topics from which the manager needs to receive messages."""
+        return [
+            self.__status_topic,
+            self.__error_topic,
+            self.__listening_topic
+        ]
+
+    @property
+    def metrics(self) -> ManagerMetrics:
+        """The metrics collected by the simulation manager."""
+        return self.__metrics
+
+    @property
+    def readiness_time(self) -> Optional[float]:
+        """The time in seconds it took for all the simulation components to report that they are listening.
+           None, if not all components reported before the simulation was started."""
+        return self.__readiness_time
+
+    async def wait_for_components(self, timeout: float) -> bool:
+        """Waits until all the simulation components have reported that they are listening to the message bus
+           or until timeout seconds have passed. Returns True, if all the components reported in time."""
+        component_names = self.__simulation_components.get_component_list()
+        if self.__listening_components.issuperset(component_names):
+            self.__all_components_listening.set()
+        else:
+            LOGGER.info("Waiting at most {:.1f} seconds for {:d} components to report that they are listening.".format(
+                timeout, len(component_names)))
+
+        wait_start_time = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.__all_components_listening.wait(), timeout)
+        except asyncio.TimeoutError:
+            missing_components = [
+                component_name
+                for component_name in component_names
+                if component_name not in self.__listening_components
+            ]
+            LOGGER.warning("Components {:s} did not report that they are listening within {:.1f} seconds.".format(
+                ", ".join(missing_components), timeout))
+            return False
+
+        self.__readiness_time = time.perf_counter() - wait_start_time
+        LOGGER.info("All {:d} components were listening after {:.3f} seconds.".format(
+            len(component_names), self.__readiness_time))
+        return True
+
     async def start(self):
-        """Starts the simulation. Sends a simulation state message."""
+        """Starts the simulation. Sends a simulation state message.
+           If the manager state has been restored from a checkpoint, resends the epoch message
+           for the current epoch instead."""
         LOGGER.info("Starting the simulation.")
         self.__is_stopped = False
+        await self.__metrics_exporter.start()
 
-        if self.__simulation_components.get_component_list():
+        if self.__resumed:
+            LOGGER.info("Continuing the simulation from epoch {:d}".format(self.__epoch_number))
+            self.__simulation_state = SimulationManager.SIMULATION_STATE_VALUE_RUNNING
+            self.__epoch_start_time = time.perf_counter()
+            await self.__send_epoch_message(new_epoch=False)
+        elif self.__simulation_components.component_count > 0:
+            if self.__checkpoint_writer is not None:
+                self.__checkpoint_writer.start(self.__get_checkpoint_header())
             await self.set_simulation_state(SimulationManager.SIMULATION_STATE_VALUE_RUNNING)
         else:
             LOGGER.warning("No components in the simulation. Stopping the simulation.")
@@ -118,11 +346,93 @@ class SimulationManager:
         """Stops the simulation. Sends a simulation state message to the message bus."""
         LOGGER.info("Stopping the simulation.")
         await self.__stop_epoch_timer()
+        await self.__stop_status_consumer()
         self.__simulation_state = SimulationManager.SIMULATION_STATE_VALUE_STOPPED
         await self.send_state_message(start_timer=False, stop_with_error=False)
-        await self.__rabbitmq_client.close()
+        await self.__publisher.drain(self.__stop_timeout)
+        LOGGER.info("Published {}".format(self.__publisher.statistics))
+        await self.__publisher.close()
+        await self.__metrics_exporter.stop()
+        if self.__checkpoint_writer is not None:
+            self.__checkpoint_writer.append(STOPPED_RECORD, {
+                "EpochNumber": self.__epoch_number,
+                "Completed": self.__is_completed
+            })
+            self.__checkpoint_writer.close()
+        if self.__owns_rabbitmq_client:
+            await self.__rabbitmq_client.close()
         self.__is_stopped = True
 
+    @property
+    def is_completed(self) -> bool:
+        """Returns True, if all the epochs of the simulation have been run, either by this manager
+           or according to the checkpoint file."""
+        return self.__is_completed
+
+    @property
+    def is_resumed(self) -> bool:
+        """Returns True, if the manager state has been restored from a checkpoint."""
+        return self.__resumed
+
+    def resume_from_checkpoint(self) -> bool:
+        """Restores the manager state from the checkpoint file. Returns True, if the state was restored.
+           A simulation that has been completed is not restored.
+           The simulation continues from the latest started epoch when the manager is started. In the lookahead
+           mode, the simulation continues from the epoch following the latest full epoch.
+           The epoch message id from the checkpoint is used as the triggering message id for the resumed epoch."""
+        if self.__checkpoint_writer is None:
+            LOGGER.warning("Cannot resume the simulation since no checkpoint file has been given.")
+            return False
+
+        checkpoint = load_checkpoint(self.__checkpoint_writer.file_name)
+        if checkpoint is None:
+            return False
+        header, epoch_record = checkpoint
+        if header != self.__get_checkpoint_header():
+            LOGGER.warning("The checkpoint in {:s} does not match the current simulation settings.".format(
+                self.__checkpoint_writer.file_name))
+            return False
+        if epoch_record.get("Completed", False):
+            LOGGER.warning("The simulation in the checkpoint {:s} has already been completed.".format(
+                self.__checkpoint_writer.file_name))
+            self.__is_completed = True
+            return False
+
+        try:
+            epoch_number = int(epoch_record["EpochNumber"])
+            latest_full_epoch = int(epoch_record["LatestFullEpoch"])
+            epoch_message_id = str(epoch_record["EpochMessageId"])
+            start_time = to_utc_datetime_object(epoch_record["StartTime"])
+            end_time = to_utc_datetime_object(epoch_record["EndTime"])
+            epoch_resends = int(epoch_record["EpochResends"])
+            message_counter = int(epoch_message_id.rpartition("-")[-1])
+        except (KeyError, TypeError, ValueError) as record_error:
+            LOGGER.warning("Invalid epoch record in the checkpoint: {}".format(record_error))
+            return False
+
+        if epoch_number > latest_full_epoch + 1:
+            # epochs started with lookahead are restarted from the epoch following the latest full epoch
+            start_time -= (epoch_number - latest_full_epoch - 1) * datetime.timedelta(seconds=self.__epoch_length)
+            end_time = start_time + datetime.timedelta(seconds=self.__epoch_length)
+            epoch_number = latest_full_epoch + 1
+            epoch_resends = 0
+
+        self.__epoch_number = epoch_number
+        self.__metrics.current_epoch.set(self.__epoch_number)
+        self.__epoch_resends = epoch_resends
+        self.__current_start_time = start_time
+        self.__current_end_time = end_time
+        self.__simulation_components.reset_components(epoch_number - 1, [epoch_message_id])
+        self.__message_id_generator = get_next_message_id(self.__manager_name, message_counter + 1)
+
+        epoch_record = self.__get_epoch_record(epoch_message_id)
+        epoch_record["EpochResends"] = epoch_resends
+        self.__checkpoint_writer.start(header, [epoch_record])
+        self.__resumed = True
+        LOGGER.info("Restored the simulation state for epoch {:d} from {:s}".format(
+            self.__epoch_number, self.__checkpoint_writer.file_name))
+        return True
+
     @property
     def simulation_id(self) -> str:
         """The simulation ID for the simulation."""
@@ -143,6 +453,12 @@ class SimulationManager:
         """The maximum number of epochs for the simulation."""
         return self.__max_epochs
 
+    @property
+    def epoch_lookahead(self) -> int:
+        """The number of epochs that can be started before all the components have responded to the previous epochs.
+           Zero, if each epoch is started only after all the components have responded to the previous epoch."""
+        return self.__epoch_lookahead
+
     def get_simulation_state(self) -> str:
         """Return the simulation state attribute."""
         return self.__simulation_state
@@ -155,22 +471,35 @@ class SimulationManager:
                 SimulationManager.SIMULATION_STATE_VALUE_STOPPED):
             self.__simulation_state = new_simulation_state
             if new_simulation_state == SimulationManager.SIMULATION_STATE_VALUE_RUNNING:
+                self.__epoch_start_time = time.perf_counter()
                 await self.send_state_message()
             elif new_simulation_state == SimulationManager.SIMULATION_STATE_VALUE_STOPPED:
                 await self.stop()
 
     async def check_components(self):
-        """Checks the status of the simulation components and sends a new epoch message if needed."""
+        """Checks the status of the simulation components and sends a new epoch message if needed.
+           In the lookahead mode, sends new epoch messages until the lookahead window is full."""
         latest_full_epoch = self.__simulation_components.get_latest_full_epoch()
 
         if self.get_simulation_state() == SimulationManager.SIMULATION_STATE_VALUE_RUNNING:
             if latest_full_epoch == self.__epoch_number:
                 if self.__simulation_components.is_in_normal_state():
                     # the current epoch is finished => send a new epoch message
+                    epoch_duration = time.perf_counter() - self.__epoch_start_time
+                    self.__metrics.epoch_duration.observe(epoch_duration)
+                    if self.__adaptive_timeout is not None:
+                        self.__adaptive_timeout.record_epoch_duration(epoch_duration)
                     await self.__send_epoch_message()
                 else:
                     LOGGER.error("Stopping the simulation because one of the components is in an error state.")
                     await self.stop()
+                    return
+
+            last_allowed_epoch = min(latest_full_epoch + 1 + self.__epoch_lookahead, self.max_epochs)
+            while (self.__epoch_lookahead > 0 and 0 < self.__epoch_number < last_allowed_epoch and
+                   self.get_simulation_state() == SimulationManager.SIMULATION_STATE_VALUE_RUNNING and
+                   self.__simulation_components.is_in_normal_state()):
+                await self.__send_epoch_message()
 
     async def send_state_message(self, start_timer: bool = True, stop_with_error: bool = True):
         """Sends a simulation state message."""
@@ -186,21 +515,57 @@ class SimulationManager:
                 # Simulation state message could not be created but do not call stop() to avoid infinite loop.
                 LOGGER.error("Could not create the simulation state message")
         else:
-            await self.__rabbitmq_client.send_message(self.__state_topic, new_simulation_state_message)
+            self.__publisher.publish(self.__state_topic, new_simulation_state_message)
             if start_timer:
                 await self.__start_epoch_timer()
 
     async def general_message_handler(self, message_object: Union[BaseMessage, Any], message_routing_key: str):
         """Forwards the message handling to the appropriate function depending on the message type."""
         if isinstance(message_object, StatusMessage):
-            await self.status_message_handler(message_object, message_routing_key)
+            if message_routing_key == self.__listening_topic:
+                await self.listening_message_handler(message_object, message_routing_key)
+            elif self.__status_queue is not None:
+                self.__status_queue.put_nowait((message_object, message_routing_key, time.perf_counter()))
+                if self.__status_consumer_task is None or self.__status_consumer_task.done():
+                    self.__status_consumer_task = asyncio.create_task(self.__status_queue_consumer())
+            else:
+                receive_time = time.perf_counter()
+                await self.status_message_handler(message_object, message_routing_key)
+                self.__metrics.status_handling_time.observe(time.perf_counter() - receive_time)
         else:
             LOGGER.warning("Received '{:s}' message when expecting for '{:s}' message".format(
                 str(type(message_object)), str(StatusMessage)))
 
+    async def listening_message_handler(self, message_object: StatusMessage, message_routing_key: str):
+        """Handles a status message in which a component reports that it is listening to the message bus
+           and is ready for the simulation to start."""
+        if message_object.simulation_id != self.simulation_id:
+            LOGGER.info("Received a listening message for a different simulation: '{:s}' instead of '{:s}'".format(
+                message_object.simulation_id, self.simulation_id))
+            return
+
+        component_name = message_object.source_process_id
+        if self.__simulation_components.get_latest_epoch_for_component(component_name) is None:
+            LOGGER.debug("Received a listening message from unknown component {:s}".format(component_name))
+            return
+        if self.__all_components_listening.is_set() or component_name in self.__listening_components:
+            return
+
+        LOGGER.debug("Component {:s} reported at topic {:s} that it is listening".format(
+            component_name, message_routing_key))
+        self.__listening_components.add(component_name)
+        if len(self.__listening_components) == self.__simulation_components.component_count:
+            self.__all_components_listening.set()
+
     async def status_message_handler(self, message_object: StatusMessage, message_routing_key: str):
         """Handles received status message. After receiving a proper status message checks
            if all components have registered for the epoch and a new epoch could be started."""
+        if await self.__register_status_message(message_object, message_routing_key):
+            await self.check_components()
+
+    async def __register_status_message(self, message_object: StatusMessage, message_routing_key: str) -> bool:
+        """Registers the received status message to the simulation components.
+           Returns True, if the message was a proper status message from one of the other components."""
         if message_object.simulation_id != self.simulation_id:
             LOGGER.info("Received a status message for a different simulation: '{:s}' instead of '{:s}'".format(
                 message_object.simulation_id, self.simulation_id))
@@ -208,6 +573,7 @@ class SimulationManager:
             LOGGER.warning("Received a status message with wrong message type: '{:s}' instead of '{:s}'".format(
                 message_object.message_type, StatusMessage.CLASS_MESSAGE_TYPE))
         elif message_object.source_process_id != self.__manager_name:
+            self.__metrics.status_messages.increase()
             LOGGER.debug("Received a status message from {:s} at topic {:s}".format(
                 message_object.source_process_id, message_routing_key))
             if message_object.warnings:
@@ -216,8 +582,16 @@ class SimulationManager:
                     message_object.source_process_id, ", ".join(message_object.warnings)))
 
             if message_object.value == SimulationManager.READY_STATUS:
+                previous_epoch = self.__simulation_components.get_latest_epoch_for_component(
+                    message_object.source_process_id)
                 self.__simulation_components.register_status_message(
                     message_object.source_process_id, message_object.epoch_number, message_object.message_id, False)
+                if previous_epoch is not None and previous_epoch < self.__epoch_number:
+                    self.__register_ready_time(message_object.source_process_id)
+                if (self.__skip_idle_epochs and previous_epoch is not None and
+                        message_object.epoch_number == self.__epoch_number):
+                    self.__next_action_times[message_object.source_process_id] = parse_next_action_time(
+                        message_object.description)
             elif message_object.value == SimulationManager.ERROR_STATUS:
                 LOGGER.debug("Received an error message from {:s} with description '{:s}' at topic {:s}".format(
                     message_object.source_process_id, message_object.description, message_routing_key))
@@ -228,7 +602,39 @@ class SimulationManager:
                     LOGGER.error("Stopping the simulation because one of the components is in an error state.")
                     await self.stop()
 
-            await self.check_components()
+            return True
+
+        return False
+
+    def __register_ready_time(self, component_name: str):
+        """Records the time from the start of the current epoch to the ready message from the given component,
+           if the component has now reached the current epoch."""
+        if self.__simulation_components.get_latest_epoch_for_component(component_name) != self.__epoch_number:
+            return
+
+        ready_time = time.perf_counter() - self.__epoch_start_time
+        self.__metrics.component_ready_time.observe(ready_time)
+        if self.__adaptive_timeout is not None:
+            self.__adaptive_timeout.record_ready_time(ready_time)
+
+    async def __status_queue_consumer(self):
+        """Handles the status messages from the status queue. All the messages that are available in the queue
+           are registered as one batch after which the components are checked once for the whole batch."""
+        while self.get_simulation_state() == SimulationManager.SIMULATION_STATE_VALUE_RUNNING:
+            status_messages = [await self.__status_queue.get()]
+            while not self.__status_queue.empty():
+                status_messages.append(self.__status_queue.get_nowait())
+
+            check_needed = False
+            for message_object, message_routing_key, _ in status_messages:
+                if await self.__register_status_message(message_object, message_routing_key):
+                    check_needed = True
+            if check_needed:
+                await self.check_components()
+
+            handled_time = time.perf_counter()
+            for _, _, receive_time in status_messages:
+                self.__metrics.status_handling_time.observe(handled_time - receive_time)
 
     async def __send_epoch_message(self, new_epoch: bool = True):
         """Sends an epoch message to the message bus.
@@ -238,38 +644,95 @@ class SimulationManager:
         """
         if new_epoch or self.epoch_number == 0:
             self.__epoch_number += 1
+            self.__metrics.current_epoch.set(self.__epoch_number)
             self.__epoch_resends = 0
+            self.__epoch_start_time = time.perf_counter()
             if self.__current_end_time is not None:
                 self.__current_start_time = self.__current_end_time
-            self.__current_end_time = self.__current_start_time + datetime.timedelta(seconds=self.__epoch_length)
+            self.__current_end_time = self.__get_epoch_end_time()
+            self.__next_action_times.clear()
 
-        if self.epoch_number <= self.max_epochs and self.__epoch_resends <= self.__max_epoch_resends:
+        if (self.epoch_number <= self.max_epochs and self.__epoch_resends <= self.__max_epoch_resends and
+                self.__current_start_time < self.__simulation_end_time):
             if new_epoch:
                 LOGGER.info("Starting Epoch {:d}".format(self.__epoch_number))
             else:
                 LOGGER.info("Resending (try {:d}) epoch message for Epoch {:d}".format(
                     self.__epoch_resends, self.__epoch_number))
 
-            new_epoch_message = self.__get_epoch_message()
+            if new_epoch or self.__epoch_message is None:
+                self.__epoch_message = self.__get_epoch_message()
+                if self.__epoch_message is not None and self.__checkpoint_writer is not None:
+                    self.__checkpoint_writer.append(EPOCH_RECORD, self.__get_epoch_record(self.__epoch_message_id))
+            new_epoch_message = self.__epoch_message
             if new_epoch_message is None:
                 LOGGER.error("Simulation manager stopping the simulation due to internal error.")
                 await self.stop()
+            elif not new_epoch and self.__targeted_resends:
+                self.__resend_epoch_message_to_lagging_components(new_epoch_message)
+                await self.__start_epoch_timer()
             else:
-                await self.__rabbitmq_client.send_message(self.__epoch_topic, new_epoch_message)
+                self.__publisher.publish(self.__epoch_topic, new_epoch_message)
                 await self.__start_epoch_timer()
 
         else:
+            self.__is_completed = (self.epoch_number > self.max_epochs or
+                                   self.__current_start_time >= self.__simulation_end_time)
             await self.stop()
 
+    def __get_epoch_end_time(self) -> datetime.datetime:
+        """Returns the end time for the epoch starting at the current start time. If idle epochs are skipped and
+           all the components have reported their next action time, the epoch covers the idle time until the start
+           of the regular epoch containing the earliest next action time."""
+        epoch_length = datetime.timedelta(seconds=self.__epoch_length)
+        next_action_time = None
+        if (self.__skip_idle_epochs and len(self.__next_action_times) == len(self.__component_names) and
+                None not in self.__next_action_times.values()):
+            next_action_time = min(self.__next_action_times.values())
+
+        end_time = get_epoch_end_time(
+            self.__current_start_time, epoch_length, next_action_time, self.__simulation_end_time)
+        skipped_epochs = round((end_time - self.__current_start_time) / epoch_length) - 1
+        if skipped_epochs > 0:
+            LOGGER.info("Merging {:d} idle epochs into epoch {:d}".format(skipped_epochs, self.__epoch_number))
+            self.__metrics.skipped_epochs.increase(skipped_epochs)
+        return end_time
+
+    def __resend_epoch_message_to_lagging_components(self, epoch_message: bytes):
+        """Resends the epoch message separately to each component that has not yet responded for the current epoch.
+           If none of the components has responded or this is the last resend for the epoch, the epoch message is
+           resent to the common epoch topic, so that also the components that do not listen to their own epoch topic
+           receive it."""
+        lagging_components = self.__simulation_components.get_component_list(
+            latest_epoch_less_than=self.__epoch_number)
+        if len(lagging_components) == self.__simulation_components.component_count:
+            self.__publisher.publish(self.__epoch_topic, epoch_message)
+            return
+        if self.__epoch_resends >= self.__max_epoch_resends:
+            LOGGER.info("Last resend for epoch {:d}, resending the epoch message to the common epoch topic".format(
+                self.__epoch_number))
+            self.__publisher.publish(self.__epoch_topic, epoch_message)
+            return
+
+        LOGGER.info("Resending the epoch message to {:d} lagging components".format(len(lagging_components)))
+        LOGGER.debug("Lagging components: {:s}".format(", ".join(lagging_components)))
+        for component_name in lagging_components:
+            self.__publisher.publish(".".join([self.__epoch_topic, component_name]), epoch_message)
+
     def __get_simulation_state_message(self) -> Optional[bytes]:
         """Creates a new simulation state message and returns it in bytes format.
            If there is a problem creating the message, returns None."""
         try:
-            state_message = self.__message_generator.get_simulation_state_message(
-                SimulationState=self.get_simulation_state(),
-                Name=self.__simulation_name,
-                Description=self.__simulation_description
-            )
+            state_message = SimulationStateMessage(**{
+                "Type": SimulationStateMessage.CLASS_MESSAGE_TYPE,
+                "SimulationId": self.__simulation_id,
+                "SourceProcessId": self.__manager_name,
+                "MessageId": next(self.__message_id_generator),
+                "Timestamp": get_utcnow_in_milliseconds(),
+                "SimulationState": self.get_simulation_state(),
+                "Name": self.__simulation_name,
+                "Description": self.__simulation_description
+            })
         except (MessageError, ValueError, TypeError, StopIteration) as message_error:
             exception_message = getattr(message_error, "message", None)
             if exception_message is None:
@@ -282,26 +745,117 @@ class SimulationManager:
     def __get_epoch_message(self) -> Optional[bytes]:
         """Creates a new epoch message and returns it in bytes format.
            If there is a problem creating the message, returns None."""
+        if self.__epoch_lookahead > 0:
+            # in the lookahead mode, the epochs are triggered by the status messages for the latest full epoch
+            triggering_message_ids = self.__simulation_components.get_status_message_ids(
+                self.__simulation_components.get_latest_full_epoch())
+        else:
+            triggering_message_ids = self.__simulation_components.get_latest_status_message_ids()
+        if 0 < self.__compact_triggering_ids_threshold <= len(triggering_message_ids):
+            triggering_message_ids = [self.__publish_triggering_message_ids(triggering_message_ids)]
+        message_id = next(self.__message_id_generator)
+        self.__epoch_message_id = message_id
+        timestamp = get_utcnow_in_milliseconds()
+
+        if self.__epoch_message_template is not None:
+            return self.__epoch_message_template.get_message_bytes(
+                message_id=message_id,
+                timestamp=timestamp,
+                epoch_number=self.epoch_number,
+                triggering_message_ids=triggering_message_ids,
+                start_time=to_iso_format_datetime_string(self.__current_start_time),
+                end_time=to_iso_format_datetime_string(self.__current_end_time))
+
         try:
-            epoch_message = self.__message_generator.get_epoch_message(
-                EpochNumber=self.epoch_number,
-                TriggeringMessageIds=self.__simulation_components.get_latest_status_message_ids(),
-                StartTime=self.__current_start_time,
-                EndTime=self.__current_end_time  # type: ignore
-            )
+            epoch_message = EpochMessage(**{
+                "Type": EpochMessage.CLASS_MESSAGE_TYPE,
+                "SimulationId": self.__simulation_id,
+                "SourceProcessId": self.__manager_name,
+                "MessageId": message_id,
+                "Timestamp": timestamp,
+                "EpochNumber": self.epoch_number,
+                "TriggeringMessageIds": triggering_message_ids,
+                "StartTime": self.__current_start_time,
+                "EndTime": self.__current_end_time
+            })
         except (MessageError, ValueError, TypeError) as message_error:
             LOGGER.error("Problem with creating a epoch message: {}".format(message_error))
             return None
 
-        return epoch_message.bytes()
+        epoch_message_bytes = epoch_message.bytes()
+        if self.__use_epoch_message_template:
+            self.__create_epoch_message_template(epoch_message_bytes, message_id, timestamp, triggering_message_ids)
+        return epoch_message_bytes
+
+    def __publish_triggering_message_ids(self, triggering_message_ids: List[str]) -> str:
+        """Publishes the full list of triggering message ids for the current epoch and returns the digest id
+           that is used in the epoch message instead of the list."""
+        digest_id = get_triggering_ids_digest(triggering_message_ids)
+        self.__publisher.publish(
+            self.__triggering_ids_topic,
+            get_triggering_ids_message(
+                self.__simulation_id, self.__manager_name, self.epoch_number, digest_id, triggering_message_ids))
+        return digest_id
+
+    def __create_epoch_message_template(self, epoch_message_bytes: bytes, message_id: str, timestamp: str,
+                                        triggering_message_ids: List[str]):
+        """Creates the epoch message template from the given epoch message. The template is taken into use only if
+           it reproduces the given message exactly."""
+        self.__use_epoch_message_template = False
+        epoch_message_template = EpochMessageTemplate.from_message(epoch_message_bytes)
+        if epoch_message_template is None:
+            return
+
+        template_message_bytes = epoch_message_template.get_message_bytes(
+            message_id=message_id,
+            timestamp=timestamp,
+            epoch_number=self.epoch_number,
+            triggering_message_ids=triggering_message_ids,
+            start_time=to_iso_format_datetime_string(self.__current_start_time),
+            end_time=to_iso_format_datetime_string(self.__current_end_time))
+        if template_message_bytes == epoch_message_bytes:
+            LOGGER.debug("Using a pre-serialized template for the epoch messages")
+            self.__epoch_message_template = epoch_message_template
+        else:
+            LOGGER.warning("The epoch message template did not reproduce the epoch message, template not used")
+
+    def __get_checkpoint_header(self) -> Dict[str, Any]:
+        """Returns the checkpoint header record containing the simulation settings that must match on resume."""
+        return {
+            "SimulationId": self.__simulation_id,
+            "ManagerName": self.__manager_name,
+            "Components": self.__component_names,
+            "EpochLength": self.__epoch_length,
+            "MaxEpochs": self.__max_epochs
+        }
+
+    def __get_epoch_record(self, epoch_message_id: Optional[str]) -> Dict[str, Any]:
+        """Returns the checkpoint record for the current epoch."""
+        return {
+            "EpochNumber": self.__epoch_number,
+            "StartTime": to_iso_format_datetime_string(self.__current_start_time),
+            "EndTime": to_iso_format_datetime_string(self.__current_end_time),
+            "EpochMessageId": epoch_message_id,
+            "LatestFullEpoch": self.__simulation_components.get_latest_full_epoch(),
+            "EpochResends": self.__epoch_resends
+        }
 
     async def __start_epoch_timer(self):
         """Starts the epoch timer that is used to resend the epoch message for the running epoch
            after the timer has run out."""
         await self.__stop_epoch_timer()
+        if self.__adaptive_timeout is None:
+            epoch_timeout = self.__epoch_timer_interval * (self.__epoch_resends + 1)
+        else:
+            epoch_timeout = self.__adaptive_timeout.get_timeout(self.__epoch_resends)
+            LOGGER.info("Epoch timer for epoch {:d} set to {:.3f} seconds (epoch average {:s}, ready {:s})".format(
+                self.__epoch_number, epoch_timeout,
+                format_seconds(self.__adaptive_timeout.epoch_duration_ewma),
+                format_seconds(self.__adaptive_timeout.ready_time_percentile)))
+
         self.__epoch_timer = Timer(
             is_repeating=False,
-            timeout=self.__epoch_timer_interval * (self.__epoch_resends + 1),
+            timeout=epoch_timeout,
             callback=self.__epoch_timer_handler)
 
     async def __stop_epoch_timer(self):
@@ -309,6 +863,13 @@ class SimulationManager:
         if self.__epoch_timer is not None and self.__epoch_timer.is_running():
             await self.__epoch_timer.cancel()
 
+    async def __stop_status_consumer(self):
+        """Stops the status queue consumer task. If called from the consumer task itself,
+           the task stops after the current batch, since the simulation is no longer running."""
+        if (self.__status_consumer_task is not None and not self.__status_consumer_task.done() and
+                self.__status_consumer_task is not asyncio.current_task()):
+            self.__status_consumer_task.cancel()
+
     async def __epoch_timer_handler(self):
         """This is launched if the components in the simulation have not responded to the manager
            within EPOCH_TIMER_INTERVAL seconds.
@@ -322,14 +883,28 @@ class SimulationManager:
 
             self.__epoch_resends += 1
             if self.epoch_number > 0:
+                self.__metrics.epoch_resends.increase()
+                if self.__checkpoint_writer is not None:
+                    self.__checkpoint_writer.append(RESEND_RECORD, {
+                        "EpochNumber": self.__epoch_number,
+                        "EpochResends": self.__epoch_resends
+                    })
                 await self.__send_epoch_message(new_epoch=False)
             else:
                 await self.send_state_message()
 
 
-async def start_manager():
-    """Starts the Simulation manager process."""
-    env_variables = load_environmental_variables(
+def format_seconds(seconds: Optional[float]) -> str:
+    """Returns the given time in seconds as a string with millisecond precision or "-" for None."""
+    if seconds is None:
+        return "-"
+    return "{:.3f} s".format(seconds)
+
+
+def get_manager_environmental_variables() -> List[Tuple[Any, ...]]:
+    """Returns the definitions of the environmental variables used by the simulation manager
+       in the format used by load_environmental_variables."""
+    return [
         (__SIMULATION_ID, str),
         (__SIMULATION_MANAGER_NAME, str, "manager"),
         (__SIMULATION_COMPONENTS, str, ""),
@@ -339,15 +914,41 @@ async def start_manager():
         (__SIMULATION_STATUS_MESSAGE_TOPIC, str, "Status.Ready"),
         (__SIMULATION_STATE_MESSAGE_TOPIC, str, "SimState"),
         (__SIMULATION_ERROR_MESSAGE_TOPIC, str, "Status.Error"),
+        (__SIMULATION_LISTENING_MESSAGE_TOPIC, str, "Status.Listening"),
         (__SIMULATION_EPOCH_LENGTH, int, 3600),
         (__SIMULATION_INITIAL_START_TIME, str, "2020-01-01T00:00:00.000Z"),
         (__SIMULATION_MAX_EPOCHS, int, 5),
         (__SIMULATION_EPOCH_TIMER_INTERVAL, float, 120.0),
-        (__SIMULATION_MAX_EPOCH_RESENDS, int, 5)
-    )
+        (__SIMULATION_MAX_EPOCH_RESENDS, int, 5),
+        (__SIMULATION_COMPONENT_REGISTRY, str, SimulationManager.COMPONENT_REGISTRY_STANDARD),
+        (__SIMULATION_START_TIMEOUT, float, float(TIMEOUT_INTERVAL)),
+        (__SIMULATION_STOP_TIMEOUT, float, TIMEOUT_INTERVAL / 2),
+        (__SIMULATION_STATUS_QUEUE, bool, False),
+        (__SIMULATION_EPOCH_TIMER_MODE, str, SimulationManager.EPOCH_TIMER_FIXED),
+        (__SIMULATION_EPOCH_TIMER_MIN, float, 1.0),
+        (__SIMULATION_EPOCH_TIMER_MAX, float, 3600.0),
+        (__SIMULATION_EPOCH_TIMER_BACKOFF, float, 2.0),
+        (__SIMULATION_EPOCH_RESEND_MODE, str, SimulationManager.EPOCH_RESEND_BROADCAST),
+        (__SIMULATION_EPOCH_LOOKAHEAD, int, 0),
+        (__SIMULATION_INDEPENDENT_COMPONENTS, str, ""),
+        (__SIMULATION_METRICS_FILE, str, ""),
+        (__SIMULATION_METRICS_PORT, int, 0),
+        (__SIMULATION_METRICS_HOST, str, "127.0.0.1"),
+        (__SIMULATION_METRICS_INTERVAL, float, 10.0),
+        (__SIMULATION_EPOCH_MESSAGE_TEMPLATE, bool, True),
+        (__SIMULATION_COMPACT_TRIGGERING_IDS_THRESHOLD, int, 0),
+        (__SIMULATION_TRIGGERING_IDS_TOPIC, str, "TriggeringIds"),
+        (__SIMULATION_CHECKPOINT_FILE, str, ""),
+        (__SIMULATION_RESUME, bool, False),
+        (__SIMULATION_SKIP_IDLE_EPOCHS, bool, False)
+    ]
+
 
+def create_manager(env_variables: Dict[str, Any], rabbitmq_client: Optional[RabbitmqClient] = None) \
+        -> SimulationManager:
+    """Creates a new simulation manager using the given values for the environmental variables."""
     # cast()-function added here to allow static linter to recognize the correct types, cast itself does nothing
-    manager = SimulationManager(
+    return SimulationManager(
         simulation_id=cast(str, env_variables[__SIMULATION_ID]),
         manager_name=cast(str, env_variables[__SIMULATION_MANAGER_NAME]),
         simulation_name=cast(str, env_variables[__SIMULATION_NAME]),
@@ -361,19 +962,67 @@ async def start_manager():
         max_epoch_resends=cast(int, env_variables[__SIMULATION_MAX_EPOCH_RESENDS]),
         state_topic=cast(str, env_variables[__SIMULATION_STATE_MESSAGE_TOPIC]),
         status_topic=cast(str, env_variables[__SIMULATION_STATUS_MESSAGE_TOPIC]),
-        error_topic=cast(str, env_variables[__SIMULATION_ERROR_MESSAGE_TOPIC]))
+        error_topic=cast(str, env_variables[__SIMULATION_ERROR_MESSAGE_TOPIC]),
+        component_registry=cast(str, env_variables[__SIMULATION_COMPONENT_REGISTRY]),
+        listening_topic=cast(str, env_variables[__SIMULATION_LISTENING_MESSAGE_TOPIC]),
+        stop_timeout=cast(float, env_variables[__SIMULATION_STOP_TIMEOUT]),
+        use_status_queue=cast(bool, env_variables[__SIMULATION_STATUS_QUEUE]),
+        rabbitmq_client=rabbitmq_client,
+        epoch_timer_mode=cast(str, env_variables[__SIMULATION_EPOCH_TIMER_MODE]),
+        epoch_timer_min=cast(float, env_variables[__SIMULATION_EPOCH_TIMER_MIN]),
+        epoch_timer_max=cast(float, env_variables[__SIMULATION_EPOCH_TIMER_MAX]),
+        epoch_timer_backoff=cast(float, env_variables[__SIMULATION_EPOCH_TIMER_BACKOFF]),
+        epoch_resend_mode=cast(str, env_variables[__SIMULATION_EPOCH_RESEND_MODE]),
+        epoch_lookahead=cast(int, env_variables[__SIMULATION_EPOCH_LOOKAHEAD]),
+        independent_components=cast(str, env_variables[__SIMULATION_INDEPENDENT_COMPONENTS]),
+        metrics_file=cast(str, env_variables[__SIMULATION_METRICS_FILE]),
+        metrics_port=cast(int, env_variables[__SIMULATION_METRICS_PORT]),
+        metrics_host=cast(str, env_variables[__SIMULATION_METRICS_HOST]),
+        metrics_interval=cast(float, env_variables[__SIMULATION_METRICS_INTERVAL]),
+        use_epoch_message_template=cast(bool, env_variables[__SIMULATION_EPOCH_MESSAGE_TEMPLATE]),
+        compact_triggering_ids_threshold=cast(int, env_variables[__SIMULATION_COMPACT_TRIGGERING_IDS_THRESHOLD]),
+        triggering_ids_topic=cast(str, env_variables[__SIMULATION_TRIGGERING_IDS_TOPIC]),
+        checkpoint_file=cast(str, env_variables[__SIMULATION_CHECKPOINT_FILE]),
+        skip_idle_epochs=cast(bool, env_variables[__SIMULATION_SKIP_IDLE_EPOCHS]))
 
-    # Wait a bit to allow other components to initialize and then start the simulation.
-    await asyncio.sleep(TIMEOUT_INTERVAL)
+
+def get_start_timeout(env_variables: Dict[str, Any]) -> float:
+    """Returns the maximum time in seconds to wait for the components before starting the simulation."""
+    return cast(float, env_variables[__SIMULATION_START_TIMEOUT])
+
+
+def get_resume(env_variables: Dict[str, Any]) -> bool:
+    """Returns True, if the simulation should be resumed from the checkpoint file."""
+    return cast(bool, env_variables[__SIMULATION_RESUME])
+
+
+async def start_simulation(manager: SimulationManager, start_timeout: float, resume: bool) -> bool:
+    """Starts the simulation. Returns False, if the simulation was not started since it has already been completed.
+       When resuming, the other components are already running and the simulation continues from the checkpoint.
+       Otherwise, waits for the other components to initialize before starting the simulation."""
+    is_resumed = resume and manager.resume_from_checkpoint()
+    if manager.is_completed:
+        LOGGER.info("The simulation '{:s}' has already been completed, it is not started again.".format(
+            manager.simulation_id))
+        return False
+    if not is_resumed:
+        await manager.wait_for_components(start_timeout)
     await manager.start()
+    return True
+
+
+async def start_manager():
+    """Starts the Simulation manager process."""
+    env_variables = load_environmental_variables(*get_manager_environmental_variables())
+    manager = create_manager(env_variables)
+
+    if not await start_simulation(manager, get_start_timeout(env_variables), get_resume(env_variables)):
+        return
 
     # Wait in an endless loop until the SimulationManager is stopped or sys.exit() is called.
     while not manager.is_stopped:
         await asyncio.sleep(TIMEOUT_INTERVAL)
 
-    # Wait a few seconds extra to allow for certain the last simulation state message to be sent.
-    await asyncio.sleep(TIMEOUT_INTERVAL / 2)
-
 
 if __name__ == "__main__":
     asyncio.run(start_manager())
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains classes for collecting the simulation manager metrics and for exposing them
+   in the Prometheus text exposition format either through a file or through a simple HTTP endpoint.
+   The metrics of several simulation managers running in the same process can be exposed together
+   through one exporter, in which case the simulations are separated by the simulation_id label."""
+
+import asyncio
+import bisect
+import os
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from tools.tools import FullLogger
+
+LOGGER = FullLogger(__name__)
+
+# The default histogram bucket upper bounds in seconds for the epoch and component timings.
+DEFAULT_TIME_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0,
+    500.0, 1000.0
+)
+# The histogram bucket upper bounds in seconds for the message handling latencies.
+HANDLING_TIME_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+    0.5, 1.0
+)
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    """Returns the given labels in the Prometheus label format, e.g. '{simulation_id="abc"}'."""
+    if not labels:
+        return ""
+    return "{" + ",".join(
+        '{:s}="{:s}"'.format(
+            label_name, label_value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for label_name, label_value in labels.items()
+    ) + "}"
+
+
+def format_value(value: float) -> str:
+    """Returns the given value in the Prometheus number format."""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """A metric whose value can only increase."""
+
+    def __init__(self, name: str, description: str):
+        self.__name = name
+        self.__description = description
+        self.__value = 0.0
+
+    @property
+    def value(self) -> float:
+        """The current value of the counter."""
+        return self.__value
+
+    def increase(self, amount: float = 1.0):
+        """Increases the counter with the given amount."""
+        self.__value += amount
+
+    def render(self, labels: Dict[str, str]) -> List[str]:
+        """Returns the counter in the Prometheus text format as a list of lines."""
+        return self.render_header() + self.render_samples(labels)
+
+    def render_header(self) -> List[str]:
+        """Returns the description and the type lines of the counter."""
+        return [
+            "# HELP {:s} {:s}".format(self.__name, self.__description),
+            "# TYPE {:s} counter".format(self.__name)
+        ]
+
+    def render_samples(self, labels: Dict[str, str]) -> List[str]:
+        """Returns the value lines of the counter with the given labels."""
+        return ["{:s}{:s} {:s}".format(self.__name, format_labels(labels), format_value(self.__value))]
+
+
+class Gauge:
+    """A metric whose value can be set freely."""
+
+    def __init__(self, name: str, description: str):
+        self.__name = name
+        self.__description = description
+        self.__value = 0.0
+
+    @property
+    def value(self) -> float:
+        """The current value of the gauge."""
+        return self.__value
+
+    def set(self, value: float):
+        """Sets the value of the gauge."""
+        self.__value = value
+
+    def render(self, labels: Dict[str, str]) -> List[str]:
+        """Returns the gauge in the Prometheus text format as a list of lines."""
+        return self.render_header() + self.render_samples(labels)
+
+    def render_header(self) -> List[str]:
+        """Returns the description and the type lines of the gauge."""
+        return [
+            "# HELP {:s} {:s}".format(self.__name, self.__description),
+            "# TYPE {:s} gauge".format(self.__name)
+        ]
+
+    def render_samples(self, labels: Dict[str, str]) -> List[str]:
+        """Returns the value lines of the gauge with the given labels."""
+        return ["{:s}{:s} {:s}".format(self.__name, format_labels(labels), format_value(self.__value))]
+
+
+class Histogram:
+    """A metric that counts the observed values in buckets with fixed upper bounds.
+       Uses a constant amount of memory regardless of the number of observed values."""
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_TIME_BUCKETS):
+        self.__name = name
+        self.__description = description
+        self.__upper_bounds = sorted(buckets)
+        # the last count is for the values larger than the largest upper bound
+        self.__counts = [0] * (len(self.__upper_bounds) + 1)
+        self.__sum = 0.0
+        self.__count = 0
+
+    @property
+    def count(self) -> int:
+        """The number of observed values."""
+        return self.__count
+
+    @property
+    def sum(self) -> float:
+        """The sum of the observed values."""
+        return self.__sum
+
+    def observe(self, value: float):
+        """Adds a new observed value to the histogram."""
+        self.__counts[bisect.bisect_left(self.__upper_bounds, value)] += 1
+        self.__sum += value
+        self.__count += 1
+
+    def render(self, labels: Dict[str, str]) -> List[str]:
+        """Returns the histogram in the Prometheus text format as a list of lines."""
+        return self.render_header() + self.render_samples(labels)
+
+    def render_header(self) -> List[str]:
+        """Returns the description and the type lines of the histogram."""
+        return [
+            "# HELP {:s} {:s}".format(self.__name, self.__description),
+            "# TYPE {:s} histogram".format(self.__name)
+        ]
+
+    def render_samples(self, labels: Dict[str, str]) -> List[str]:
+        """Returns the bucket, sum and count lines of the histogram with the given labels."""
+        lines = []
+        cumulative_count = 0
+        for upper_bound, bucket_count in zip(self.__upper_bounds + [float("inf")], self.__counts):
+            cumulative_count += bucket_count
+            lines.append("{:s}_bucket{:s} {:d}".format(
+                self.__name, format_labels(dict(labels, le=format_value(upper_bound))), cumulative_count))
+        lines.append("{:s}_sum{:s} {:s}".format(self.__name, format_labels(labels), format_value(self.__sum)))
+        lines.append("{:s}_count{:s} {:d}".format(self.__name, format_labels(labels), self.__count))
+        return lines
+
+
+class ManagerMetrics:
+    """Holds the metrics collected by the simulation manager."""
+
+    def __init__(self, simulation_id: str):
+        self.__labels = {"simulation_id": simulation_id}
+
+        self.epoch_duration = Histogram(
+            "simulation_manager_epoch_duration_seconds",
+            "Time from the start of an epoch until all the components have responded.")
+        self.component_ready_time = Histogram(
+            "simulation_manager_component_ready_seconds",
+            "Time from the start of an epoch until a ready message from a component.")
+        self.status_handling_time = Histogram(
+            "simulation_manager_status_message_handling_seconds",
+            "Time from receiving a status message until it has been handled.",
+            HANDLING_TIME_BUCKETS)
+        self.epoch_resends = Counter(
+            "simulation_manager_epoch_resends_total",
+            "Number of resent epoch messages.")
+        self.status_messages = Counter(
+            "simulation_manager_status_messages_total",
+            "Number of handled status messages.")
+        self.current_epoch = Gauge(
+            "simulation_manager_current_epoch",
+            "The number of the latest started epoch.")
+        self.skipped_epochs = Counter(
+            "simulation_manager_skipped_epochs_total",
+            "Number of idle epochs merged into longer epochs.")
+
+    @property
+    def labels(self) -> Dict[str, str]:
+        """The labels that are attached to all the metrics."""
+        return self.__labels
+
+    @property
+    def metrics(self) -> Tuple[Union[Counter, Gauge, Histogram], ...]:
+        """All the metrics in the rendering order."""
+        return (self.epoch_duration, self.component_ready_time, self.status_handling_time,
+                self.epoch_resends, self.status_messages, self.current_epoch, self.skipped_epochs)
+
+    def render(self) -> str:
+        """Returns all the metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render(self.__labels))
+        return "\n".join(lines) + "\n"
+
+
+class MetricsCollection:
+    """Holds the metrics of several simulation managers so that they can be exposed through one exporter."""
+
+    def __init__(self):
+        self.__manager_metrics: List[ManagerMetrics] = []
+
+    def add(self, metrics: ManagerMetrics):
+        """Adds the metrics of a simulation manager to the collection."""
+        self.__manager_metrics.append(metrics)
+
+    def render(self) -> str:
+        """Returns the metrics of all the simulation managers in the Prometheus text exposition format.
+           Each metric is described only once and is followed by the values for all the simulations."""
+        lines = []
+        for metric_group in zip(*(manager_metrics.metrics for manager_metrics in self.__manager_metrics)):
+            lines.extend(metric_group[0].render_header())
+            for manager_metrics, metric in zip(self.__manager_metrics, metric_group):
+                lines.extend(metric.render_samples(manager_metrics.labels))
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Exposes the metrics in the Prometheus text format.
+
+       If a file name is given, the file is rewritten every interval seconds. The file is written to
+       a temporary file first and then renamed so that a reader never sees a partially written file.
+       If a port is given, the metrics are served at the given host and port over HTTP."""
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+    REQUEST_TIMEOUT = 5.0
+
+    def __init__(self, metrics: Union[ManagerMetrics, MetricsCollection], file_name: str = "", port: int = 0,
+                 host: str = "127.0.0.1", interval: float = 10.0):
+        self.__metrics = metrics
+        self.__file_name = file_name
+        self.__port = port
+        self.__host = host
+        self.__interval = max(interval, 0.1)
+
+        self.__file_task: Optional[asyncio.Task] = None
+        self.__server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """Starts the periodic file writing and the HTTP server if they have been configured."""
+        if self.__file_name and self.__file_task is None:
+            self.__file_task = asyncio.create_task(self.__file_writer())
+        if self.__port > 0 and self.__server is None:
+            try:
+                self.__server = await asyncio.start_server(self.__handle_request, self.__host, self.__port)
+                LOGGER.info("Serving metrics at http://{:s}:{:d}/metrics".format(self.__host, self.__port))
+            except OSError as server_error:
+                LOGGER.error("Could not start the metrics server: {}".format(server_error))
+
+    async def stop(self):
+        """Stops the file writing and the HTTP server. The metrics file is written one final time."""
+        if self.__file_task is not None:
+            self.__file_task.cancel()
+            try:
+                await self.__file_task
+            except asyncio.CancelledError:
+                pass
+            self.__file_task = None
+            self.write_file()
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+
+    def write_file(self):
+        """Writes the current metrics to the metrics file."""
+        temporary_file_name = self.__file_name + ".tmp"
+        try:
+            with open(temporary_file_name, mode="w", encoding="UTF-8") as metrics_file:
+                metrics_file.write(self.__metrics.render())
+            os.replace(temporary_file_name, self.__file_name)
+        except OSError as file_error:
+            LOGGER.warning("Could not write the metrics file {:s}: {}".format(self.__file_name, file_error))
+
+    async def __file_writer(self):
+        """Rewrites the metrics file periodically."""
+        while True:
+            self.write_file()
+            await asyncio.sleep(self.__interval)
+
+    async def __handle_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Responds to a HTTP request with the current metrics."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), MetricsExporter.REQUEST_TIMEOUT)
+            # the request headers are read but not used
+            while True:
+                header_line = await asyncio.wait_for(reader.readline(), MetricsExporter.REQUEST_TIMEOUT)
+                if header_line in (b"\r\n", b"\n", b""):
+                    break
+
+            request_parts = request_line.decode("ascii", errors="replace").split()
+            if len(request_parts) >= 2 and request_parts[0] == "GET" and request_parts[1] in ("/", "/metrics"):
+                status, body = "200 OK", self.__metrics.render().encode("UTF-8")
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+
+            writer.write(
+                "HTTP/1.1 {:s}\r\nContent-Type: {:s}\r\nContent-Length: {:d}\r\nConnection: close\r\n\r\n".format(
+                    status, MetricsExporter.CONTENT_TYPE, len(body)).encode("ascii") + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError) as request_error:
+            LOGGER.debug("Metrics request failed: {}".format(request_error))
+        finally:
+            writer.close()
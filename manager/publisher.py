@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains a class for publishing the outgoing messages of the simulation manager in batches."""
+
+import asyncio
+import dataclasses
+import time
+from typing import Any, Optional
+
+from tools.tools import FullLogger
+
+LOGGER = FullLogger(__name__)
+
+
+@dataclasses.dataclass
+class PublishStatistics:
+    """Class for holding the statistics about the published messages."""
+    published_messages: int = 0
+    failed_messages: int = 0
+    published_bytes: int = 0
+    confirmed_batches: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    publish_time: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        """The mean time in seconds from queuing a message to the confirmation of its batch."""
+        handled_messages = self.published_messages + self.failed_messages
+        if handled_messages == 0:
+            return 0.0
+        return self.total_latency / handled_messages
+
+    @property
+    def throughput(self) -> float:
+        """The number of published messages per second of time spent on publishing."""
+        if self.publish_time <= 0.0:
+            return 0.0
+        return self.published_messages / self.publish_time
+
+    def __str__(self) -> str:
+        return (
+            "{:d} messages ({:d} bytes) in {:d} batches, {:d} failed, mean latency {:.2f} ms, " +
+            "max latency {:.2f} ms, throughput {:.1f} messages/s"
+        ).format(
+            self.published_messages, self.published_bytes, self.confirmed_batches, self.failed_messages,
+            1000 * self.mean_latency, 1000 * self.max_latency, self.throughput)
+
+
+class PublishPipeline:
+    """Queues the outgoing messages and publishes them in order using the given RabbitMQ client.
+
+       The messages that are queued while a previous batch is being published form the next batch.
+       The send_message call of the client returns only after the message bus has confirmed the message.
+       All the messages in a batch are handed to the client in order without waiting for the earlier
+       confirmations, so the confirmations for the batch overlap and a batch is counted as confirmed when
+       all the messages in it have been confirmed.
+       The drain method can be used to wait until all the queued messages have been confirmed."""
+    DEFAULT_MAX_BATCH_SIZE = 100
+
+    def __init__(self, rabbitmq_client: Any, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        self.__rabbitmq_client = rabbitmq_client
+        self.__max_batch_size = max(max_batch_size, 1)
+
+        self.__queue = asyncio.Queue()
+        self.__worker_task: Optional[asyncio.Task] = None
+        self.__outstanding_messages = 0
+        self.__drained = asyncio.Event()
+        self.__drained.set()
+        self.__is_closed = False
+
+        self.__statistics = PublishStatistics()
+
+    @property
+    def outstanding_messages(self) -> int:
+        """The number of queued messages that have not yet been confirmed."""
+        return self.__outstanding_messages
+
+    @property
+    def statistics(self) -> PublishStatistics:
+        """The statistics about the published messages."""
+        return self.__statistics
+
+    def publish(self, topic_name: str, message_bytes: bytes):
+        """Adds the given message to the publish queue. The message is published in the background."""
+        if self.__is_closed:
+            LOGGER.warning("Publish pipeline is closed, the message to topic {:s} was not sent.".format(topic_name))
+            return
+
+        self.__queue.put_nowait((topic_name, message_bytes, time.perf_counter()))
+        self.__outstanding_messages += 1
+        self.__drained.clear()
+        if self.__worker_task is None or self.__worker_task.done():
+            self.__worker_task = asyncio.create_task(self.__publish_worker())
+
+    async def drain(self, timeout: float) -> bool:
+        """Waits until all the queued messages have been confirmed or until timeout seconds have passed.
+           Returns True, if all the messages were confirmed in time."""
+        try:
+            await asyncio.wait_for(self.__drained.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            LOGGER.warning("{:d} messages were not confirmed within {:.1f} seconds.".format(
+                self.__outstanding_messages, timeout))
+            return False
+
+    async def close(self):
+        """Stops the publishing. Any messages that have not been published are discarded."""
+        self.__is_closed = True
+        if self.__worker_task is not None and not self.__worker_task.done():
+            self.__worker_task.cancel()
+            try:
+                await self.__worker_task
+            except asyncio.CancelledError:
+                pass
+
+    async def __publish_worker(self):
+        """Publishes the queued messages in batches until the queue is empty."""
+        while not self.__queue.empty():
+            batch = [self.__queue.get_nowait()]
+            while len(batch) < self.__max_batch_size and not self.__queue.empty():
+                batch.append(self.__queue.get_nowait())
+
+            batch_start_time = time.perf_counter()
+            publish_results = await asyncio.gather(
+                *(self.__rabbitmq_client.send_message(topic_name, message_bytes)
+                  for topic_name, message_bytes, _ in batch),
+                return_exceptions=True)
+            for (topic_name, message_bytes, _), publish_result in zip(batch, publish_results):
+                if isinstance(publish_result, Exception):
+                    self.__statistics.failed_messages += 1
+                    LOGGER.error("Failed to publish a message to topic {:s}: {}".format(topic_name, publish_result))
+                else:
+                    self.__statistics.published_messages += 1
+                    self.__statistics.published_bytes += len(message_bytes)
+
+            confirm_time = time.perf_counter()
+            self.__statistics.confirmed_batches += 1
+            self.__statistics.publish_time += confirm_time - batch_start_time
+            for _, _, queue_time in batch:
+                latency = confirm_time - queue_time
+                self.__statistics.total_latency += latency
+                self.__statistics.max_latency = max(self.__statistics.max_latency, latency)
+
+            self.__outstanding_messages -= len(batch)
+            if self.__outstanding_messages == 0:
+                self.__drained.set()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the checkpoint module and for resuming the simulation manager from a checkpoint."""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from typing import Any, List
+
+import aiounittest
+
+from tools.messages import EpochMessage, MessageGenerator, SimulationStateMessage
+
+from loopback.bus import LoopbackBus, LoopbackClient
+from manager.checkpoint import CheckpointWriter, EPOCH_RECORD, RESEND_RECORD, STOPPED_RECORD, load_checkpoint
+from manager.manager import SimulationManager
+
+HEADER = {"SimulationId": "sim", "ManagerName": "manager", "Components": ["first", "second"]}
+
+
+def get_epoch_record(epoch_number: int) -> dict:
+    """Returns an epoch record for the given epoch."""
+    return {
+        "EpochNumber": epoch_number,
+        "EpochMessageId": "manager-{:d}".format(epoch_number + 1),
+        "LatestFullEpoch": epoch_number - 1,
+        "EpochResends": 0
+    }
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Unit tests for writing and reading the checkpoint files."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, "checkpoint.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_and_load(self):
+        """Tests that the latest epoch record with the following resends is loaded from the checkpoint."""
+        self.assertIsNone(load_checkpoint(self.file_name))
+
+        writer = CheckpointWriter(self.file_name)
+        writer.start(HEADER)
+        self.assertIsNone(load_checkpoint(self.file_name))
+
+        for epoch_number in range(1, 4):
+            writer.append(EPOCH_RECORD, get_epoch_record(epoch_number))
+        writer.append(RESEND_RECORD, {"EpochNumber": 3, "EpochResends": 1})
+        writer.append(RESEND_RECORD, {"EpochNumber": 2, "EpochResends": 5})
+        self.assertEqual(load_checkpoint(self.file_name), (HEADER, dict(get_epoch_record(3), EpochResends=1)))
+
+        writer.append(EPOCH_RECORD, get_epoch_record(4))
+        writer.close()
+        self.assertEqual(load_checkpoint(self.file_name), (HEADER, get_epoch_record(4)))
+
+        # a restarted checkpoint replaces the earlier records
+        writer.start(HEADER, [get_epoch_record(2)])
+        writer.close()
+        self.assertEqual(load_checkpoint(self.file_name), (HEADER, get_epoch_record(2)))
+        with open(self.file_name, mode="r", encoding="UTF-8") as checkpoint_file:
+            self.assertEqual(len(checkpoint_file.readlines()), 2)
+
+    def test_stopped_record(self):
+        """Tests that the stopped record tells whether the simulation was completed."""
+        writer = CheckpointWriter(self.file_name)
+        writer.start(HEADER, [get_epoch_record(1)])
+        writer.append(STOPPED_RECORD, {"EpochNumber": 1, "Completed": False})
+        self.assertEqual(load_checkpoint(self.file_name), (HEADER, dict(get_epoch_record(1), Completed=False)))
+
+        # a resumed simulation continues after the stopped record
+        writer.append(EPOCH_RECORD, get_epoch_record(2))
+        self.assertEqual(load_checkpoint(self.file_name), (HEADER, get_epoch_record(2)))
+
+        writer.append(STOPPED_RECORD, {"EpochNumber": 3, "Completed": True})
+        writer.close()
+        self.assertEqual(load_checkpoint(self.file_name), (HEADER, dict(get_epoch_record(2), Completed=True)))
+
+    def test_incomplete_line(self):
+        """Tests that an incomplete last line in the checkpoint file is ignored."""
+        writer = CheckpointWriter(self.file_name)
+        writer.start(HEADER, [get_epoch_record(1)])
+        writer.append(EPOCH_RECORD, get_epoch_record(2))
+        writer.close()
+        with open(self.file_name, mode="a", encoding="UTF-8") as checkpoint_file:
+            checkpoint_file.write('{"EpochNumber":3,"EpochMess')
+
+        self.assertEqual(load_checkpoint(self.file_name), (HEADER, get_epoch_record(2)))
+
+
+class TestManagerResume(aiounittest.AsyncTestCase):
+    """Tests for resuming the simulation manager from a checkpoint."""
+
+    @staticmethod
+    def create_manager(bus: LoopbackBus, file_name: str) -> SimulationManager:
+        """Creates a new simulation manager that uses the given checkpoint file."""
+        manager_client = LoopbackClient(bus)
+        manager = SimulationManager(
+            "sim", "manager", "name", "description", "first,second", "2020-01-01T00:00:00.000Z", 3600, 4,
+            60.0, 1, "Epoch", "SimState", "Status.Ready", "Status.Error", rabbitmq_client=manager_client,
+            checkpoint_file=file_name)
+        manager_client.add_listener(manager.listened_topics, manager.general_message_handler)
+        return manager
+
+    async def test_resume(self):
+        """Tests that a new manager continues the simulation from the checkpoint of a stopped manager."""
+        bus = LoopbackBus()
+        directory = tempfile.TemporaryDirectory()
+        file_name = os.path.join(directory.name, "checkpoint.jsonl")
+
+        message_generators = [MessageGenerator("sim", component_name) for component_name in ["first", "second"]]
+        component_client = LoopbackClient(bus)
+        epoch_messages: List[EpochMessage] = []
+        last_answered_epoch = 2
+
+        async def component_callback(message_object: Any, message_routing_key: str):
+            if isinstance(message_object, SimulationStateMessage):
+                if message_object.simulation_state != SimulationManager.SIMULATION_STATE_VALUE_RUNNING:
+                    return
+                epoch_number = 0
+            else:
+                epoch_messages.append(message_object)
+                epoch_number = message_object.epoch_number
+            if epoch_number > last_answered_epoch:
+                return
+            for message_generator in message_generators:
+                status_message = message_generator.get_status_ready_message(
+                    EpochNumber=epoch_number, TriggeringMessageIds=[message_object.message_id])
+                await component_client.send_message("Status.Ready", status_message.bytes())
+
+        component_client.add_listener(["SimState", "Epoch"], component_callback)
+
+        first_manager = self.create_manager(bus, file_name)
+        await first_manager.start()
+        for _ in range(100):
+            if first_manager.epoch_number == 3:
+                break
+            await asyncio.sleep(0.01)
+        await bus.join()
+        await first_manager.stop()
+        self.assertEqual([message_object.epoch_number for message_object in epoch_messages], [1, 2, 3])
+        interrupted_epoch_message = epoch_messages[-1]
+
+        second_manager = self.create_manager(bus, file_name)
+        self.assertTrue(second_manager.resume_from_checkpoint())
+        self.assertTrue(second_manager.is_resumed)
+        self.assertEqual(second_manager.epoch_number, 3)
+
+        last_answered_epoch = 4
+        epoch_messages.clear()
+        await second_manager.start()
+        for _ in range(100):
+            if second_manager.is_stopped:
+                break
+            await asyncio.sleep(0.01)
+        await bus.join()
+
+        self.assertTrue(second_manager.is_stopped)
+        self.assertEqual([message_object.epoch_number for message_object in epoch_messages], [3, 4])
+        resumed_epoch_message = epoch_messages[0]
+        self.assertEqual(resumed_epoch_message.start_time, interrupted_epoch_message.start_time)
+        self.assertEqual(resumed_epoch_message.triggering_message_ids, [interrupted_epoch_message.message_id])
+        self.assertGreater(
+            int(resumed_epoch_message.message_id.rpartition("-")[-1]),
+            int(interrupted_epoch_message.message_id.rpartition("-")[-1]))
+
+        # a completed simulation cannot be resumed
+        third_manager = self.create_manager(bus, file_name)
+        self.assertTrue(second_manager.is_completed)
+        self.assertFalse(third_manager.resume_from_checkpoint())
+        self.assertFalse(third_manager.is_resumed)
+        self.assertTrue(third_manager.is_completed)
+
+        await bus.close()
+        directory.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit test for the compact_components module."""
+
+import unittest
+
+from manager.compact_components import CompactSimulationComponents
+import manager.tests.components as components_tests
+
+
+class TestCompactSimulationComponents(components_tests.TestSimulationComponents):
+    """Unit tests for the CompactSimulationComponents class.
+       Runs also all the unit tests defined for the SimulationComponents class."""
+    components_class = CompactSimulationComponents
+
+    def test_status_message_ids(self):
+        """Tests that the status message ids are returned as they were registered."""
+        component_names = ["dummy-1", "dummy-2", "other"]
+        status_message_ids = ["dummy-1-5", "custom-id", "other-0012", "dummy-2-6"]
+
+        components = CompactSimulationComponents()
+        for component_name in component_names:
+            components.add_component(component_name)
+
+        components.register_status_message("dummy-1", 0, status_message_ids[0])
+        components.register_status_message("dummy-2", 0, status_message_ids[1])
+        components.register_status_message("other", 0, status_message_ids[2])
+        self.assertEqual(components.get_latest_status_message_ids(), status_message_ids[:3])
+
+        components.register_status_message("dummy-2", 1, status_message_ids[3])
+        self.assertEqual(components.get_latest_status_message_ids(), status_message_ids[3:])
+
+        # the removed components are still included in the ids for the latest epoch
+        components.remove_component("dummy-2")
+        self.assertEqual(components.get_latest_status_message_ids(), status_message_ids[3:])
+        self.assertEqual(components.get_latest_full_epoch(), 0)
+
+    def test_bulk_queries(self):
+        """Tests querying the lagging components from a large component registry."""
+        component_count = 10000
+        components = CompactSimulationComponents()
+        for component_index in range(component_count):
+            components.add_component("agent_{:d}".format(component_index))
+
+        for component_index in range(component_count):
+            component_name = "agent_{:d}".format(component_index)
+            components.register_status_message(component_name, 0, "{:s}-1".format(component_name))
+        for component_index in range(component_count):
+            component_name = "agent_{:d}".format(component_index)
+            if component_index % 10 != 0:
+                components.register_status_message(component_name, 1, "{:s}-2".format(component_name))
+
+        self.assertEqual(components.get_latest_full_epoch(), 0)
+        self.assertEqual(components.count_components(latest_epoch_less_than=1), component_count // 10)
+        self.assertEqual(
+            components.get_component_slots(latest_epoch_less_than=1),
+            list(range(0, component_count, 10)))
+        self.assertEqual(len(components.get_latest_status_message_ids()), component_count - component_count // 10)
+
+        components.remove_component("agent_0")
+        self.assertEqual(components.get_component_list(latest_epoch_less_than=1)[:2], ["agent_10", "agent_20"])
+        self.assertEqual(components.count_components(latest_epoch_less_than=2), component_count - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
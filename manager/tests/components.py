@@ -6,21 +6,60 @@
 
 """Unit test for the components module."""
 
+import time
 import unittest
 
-from manager.components import SimulationComponents
+from manager.components import EpochCounter, SimulationComponents
 
 NO_MESSAGES = -1
 
 
+class TestEpochCounter(unittest.TestCase):
+    """Unit tests for the EpochCounter class."""
+
+    def test_min_and_max_epochs(self):
+        """Tests that the smallest and the largest counted epoch numbers are kept up to date."""
+        counter = EpochCounter(NO_MESSAGES)
+        self.assertEqual((counter.min_epoch, counter.max_epoch), (NO_MESSAGES, NO_MESSAGES))
+
+        for epoch_number in [3, 1, 1, 7]:
+            counter.add(epoch_number)
+        self.assertEqual((counter.min_epoch, counter.max_epoch), (1, 7))
+
+        counter.move(1, 4)
+        self.assertEqual((counter.min_epoch, counter.max_epoch), (1, 7))
+        counter.move(1, 2)
+        self.assertEqual((counter.min_epoch, counter.max_epoch), (2, 7))
+        counter.remove(7)
+        self.assertEqual((counter.min_epoch, counter.max_epoch), (2, 4))
+
+        for epoch_number in [2, 3, 4]:
+            counter.remove(epoch_number)
+        self.assertEqual((counter.min_epoch, counter.max_epoch), (NO_MESSAGES, NO_MESSAGES))
+
+    def test_large_epoch_gap(self):
+        """Tests that the work for a new minimum does not depend on the gap between the counted epoch numbers."""
+        large_epoch = 10 ** 9
+        counter = EpochCounter(NO_MESSAGES)
+        for epoch_number in [0, 0, large_epoch]:
+            counter.add(epoch_number)
+
+        start_time = time.perf_counter()
+        counter.move(0, large_epoch)
+        counter.remove(0)
+        self.assertLess(time.perf_counter() - start_time, 0.1)
+        self.assertEqual((counter.min_epoch, counter.max_epoch), (large_epoch, large_epoch))
+
+
 class TestSimulationComponents(unittest.TestCase):
     """Unit tests for the SimulationComponents class."""
+    components_class = SimulationComponents
 
     def test_new_class(self):
         """Unit test for an empty component list."""
-        self.assertEqual(SimulationComponents.NO_MESSAGES, NO_MESSAGES)
+        self.assertEqual(self.components_class.NO_MESSAGES, NO_MESSAGES)
 
-        components = SimulationComponents()
+        components = self.components_class()
         self.assertEqual(components.get_component_list(), [])
         self.assertEqual(components.get_latest_full_epoch(), NO_MESSAGES)
         self.assertEqual(str(components), "")
@@ -33,11 +72,12 @@ class TestSimulationComponents(unittest.TestCase):
         remaining_component_names = ["generator", "planner"]
 
         # add new components
-        components = SimulationComponents()
+        components = self.components_class()
         for component_name in new_component_names:
             components.add_component(component_name)
 
         self.assertEqual(components.get_component_list(), new_component_names)
+        self.assertEqual(components.component_count, len(new_component_names))
         self.assertEqual(components.get_latest_full_epoch(), NO_MESSAGES)
         self.assertEqual(str(components), ", ".join([
             "{:s} ({:d}, False)".format(component_name, NO_MESSAGES)
@@ -53,6 +93,7 @@ class TestSimulationComponents(unittest.TestCase):
             components.remove_component(component_name)
 
         self.assertEqual(components.get_component_list(), remaining_component_names)
+        self.assertEqual(components.component_count, len(remaining_component_names))
         self.assertEqual(components.get_latest_full_epoch(), NO_MESSAGES)
         self.assertEqual(str(components), ", ".join([
             "{:s} ({:d}, False)".format(component_name, NO_MESSAGES)
@@ -86,7 +127,7 @@ class TestSimulationComponents(unittest.TestCase):
             8: (new_component_names, 8)
         }
 
-        components = SimulationComponents()
+        components = self.components_class()
         for component_name in new_component_names:
             components.add_component(component_name)
 
@@ -145,6 +186,106 @@ class TestSimulationComponents(unittest.TestCase):
         self.assertIsNone(components.get_latest_epoch_for_component("unknown"))
         self.assertIsNone(components.is_component_in_normal_state("unknown"))
 
+    def test_remove_lagging_components(self):
+        """Tests that removing the lagging or erroneous components updates the latest full epoch and the state."""
+        components = self.components_class()
+        for component_name in ["fast", "slow", "broken"]:
+            components.add_component(component_name)
+
+        for epoch_number in range(0, 4):
+            components.register_status_message("fast", epoch_number, "fast-{:d}".format(epoch_number))
+        components.register_status_message("slow", 0, "slow-0")
+        components.register_status_message("broken", 2, "broken-2", error_state=True)
+
+        self.assertEqual(components.get_latest_full_epoch(), 0)
+        self.assertEqual(components.get_component_list(latest_epoch_less_than=3), ["slow", "broken"])
+        self.assertFalse(components.is_in_normal_state())
+
+        components.remove_component("slow")
+        self.assertEqual(components.get_latest_full_epoch(), 2)
+        components.remove_component("broken")
+        self.assertEqual(components.get_latest_full_epoch(), 3)
+        self.assertTrue(components.is_in_normal_state())
+
+        # a newly added component has not sent any status messages
+        components.add_component("late")
+        self.assertEqual(components.get_latest_full_epoch(), NO_MESSAGES)
+        components.register_status_message("late", 3, "late-3")
+        self.assertEqual(components.get_latest_full_epoch(), 3)
+
+        for component_name in ["fast", "late"]:
+            components.remove_component(component_name)
+        self.assertEqual(components.get_component_list(), [])
+        self.assertEqual(components.get_latest_full_epoch(), NO_MESSAGES)
+        self.assertTrue(components.is_in_normal_state())
+
+    def test_large_epoch_number(self):
+        """Tests that a very large epoch number in a status message does not slow down the registration."""
+        large_epoch = 5 * 10 ** 7
+        components = self.components_class()
+        for component_name in ["first", "second", "third"]:
+            components.add_component(component_name)
+
+        start_time = time.perf_counter()
+        components.register_status_message("first", 0, "first-0")
+        components.register_status_message("second", large_epoch, "second-large")
+        components.register_status_message("third", 1, "third-1")
+        self.assertEqual(components.get_latest_full_epoch(), 0)
+        components.register_status_message("first", large_epoch, "first-large")
+        self.assertEqual(components.get_latest_full_epoch(), 1)
+        components.remove_component("third")
+        self.assertEqual(components.get_latest_full_epoch(), large_epoch)
+        self.assertLess(time.perf_counter() - start_time, 0.5)
+
+    def test_status_message_ids_by_epoch(self):
+        """Tests that the status message ids are kept for each epoch starting from the latest full epoch."""
+        components = self.components_class()
+        for component_name in ["fast", "slow"]:
+            components.add_component(component_name)
+
+        for epoch_number in range(0, 3):
+            components.register_status_message("fast", epoch_number, "fast-{:d}".format(epoch_number))
+        components.register_status_message("slow", 0, "slow-0")
+
+        self.assertEqual(components.get_latest_full_epoch(), 0)
+        self.assertEqual(components.get_status_message_ids(0), ["fast-0", "slow-0"])
+        self.assertEqual(components.get_status_message_ids(1), ["fast-1"])
+        self.assertEqual(components.get_status_message_ids(2), ["fast-2"])
+        self.assertEqual(components.get_status_message_ids(3), [])
+
+        components.register_status_message("slow", 1, "slow-id-1")
+        self.assertEqual(components.get_latest_full_epoch(), 1)
+        self.assertEqual(components.get_status_message_ids(0), [])
+        self.assertEqual(components.get_status_message_ids(1), ["fast-1", "slow-id-1"])
+        self.assertEqual(components.get_status_message_ids(2), ["fast-2"])
+
+        components.remove_component("slow")
+        self.assertEqual(components.get_latest_full_epoch(), 2)
+        self.assertEqual(components.get_status_message_ids(1), [])
+        self.assertEqual(components.get_status_message_ids(2), ["fast-2"])
+
+    def test_reset_components(self):
+        """Tests that resetting the components sets all the components to the given epoch."""
+        components = self.components_class()
+        for component_name in ["first", "second", "third"]:
+            components.add_component(component_name)
+        components.register_status_message("first", 0, "first-1")
+        components.register_status_message("second", 2, "second-3", error_state=True)
+
+        components.reset_components(5, ["manager-12"])
+        self.assertEqual(components.get_latest_full_epoch(), 5)
+        self.assertTrue(components.is_in_normal_state())
+        self.assertEqual(components.get_latest_status_message_ids(), ["manager-12"])
+        self.assertEqual(components.get_status_message_ids(5), ["manager-12"])
+        for component_name in ["first", "second", "third"]:
+            self.assertEqual(components.get_latest_epoch_for_component(component_name), 5)
+            self.assertTrue(components.is_component_in_normal_state(component_name))
+
+        for component_name in ["first", "second", "third"]:
+            components.register_status_message(component_name, 6, "{:s}-6".format(component_name))
+        self.assertEqual(components.get_latest_full_epoch(), 6)
+        self.assertEqual(components.get_latest_status_message_ids(), ["first-6", "second-6", "third-6"])
+
 
 if __name__ == '__main__':
     unittest.main()
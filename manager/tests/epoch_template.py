@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the epoch_template module."""
+
+import datetime
+import unittest
+from typing import List
+
+from tools.datetime_tools import to_iso_format_datetime_string, to_utc_datetime_object
+from tools.messages import EpochMessage
+
+from manager.epoch_template import EpochMessageTemplate
+
+START_TIME = to_utc_datetime_object("2020-01-01T00:00:00.000Z")
+EPOCH_LENGTH = datetime.timedelta(hours=1)
+
+
+def get_epoch_message_bytes(epoch_number: int, triggering_message_ids: List[str]) -> bytes:
+    """Returns an epoch message in bytes format created through the full message object."""
+    return EpochMessage(**{
+        "Type": EpochMessage.CLASS_MESSAGE_TYPE,
+        "SimulationId": "2020-01-01T00:00:00.000Z",
+        "SourceProcessId": "manager",
+        "MessageId": "manager-{:d}".format(epoch_number + 1),
+        "Timestamp": "2020-12-31T12:00:{:02d}.123Z".format(epoch_number % 60),
+        "EpochNumber": epoch_number,
+        "TriggeringMessageIds": triggering_message_ids,
+        "StartTime": START_TIME + (epoch_number - 1) * EPOCH_LENGTH,
+        "EndTime": START_TIME + epoch_number * EPOCH_LENGTH
+    }).bytes()
+
+
+class TestEpochMessageTemplate(unittest.TestCase):
+    """Unit tests for the EpochMessageTemplate class."""
+
+    def test_byte_equivalence(self):
+        """Tests that the messages created from the template are identical to the normally created messages."""
+        template = EpochMessageTemplate.from_message(get_epoch_message_bytes(1, ["dummy-1", "other-1"]))
+        self.assertIsNotNone(template)
+
+        for epoch_number, triggering_message_ids in [
+                (1, ["dummy-1", "other-1"]),
+                (2, []),
+                (3, ["component_{:d}-{:d}".format(index, 3) for index in range(1000)]),
+                (100, ['quote"and\\backslash-1', "ääkköset-5"]),
+                (12345, ["dummy-12345"])]:
+            with self.subTest(epoch_number=epoch_number):
+                expected_bytes = get_epoch_message_bytes(epoch_number, triggering_message_ids)
+                template_bytes = template.get_message_bytes(
+                    message_id="manager-{:d}".format(epoch_number + 1),
+                    timestamp="2020-12-31T12:00:{:02d}.123Z".format(epoch_number % 60),
+                    epoch_number=epoch_number,
+                    triggering_message_ids=triggering_message_ids,
+                    start_time=to_iso_format_datetime_string(START_TIME + (epoch_number - 1) * EPOCH_LENGTH),
+                    end_time=to_iso_format_datetime_string(START_TIME + epoch_number * EPOCH_LENGTH))
+                self.assertEqual(template_bytes, expected_bytes)
+
+    def test_unsupported_messages(self):
+        """Tests that no template is created from messages that cannot be reproduced."""
+        message_bytes = get_epoch_message_bytes(1, ["dummy-1"])
+        self.assertIsNone(EpochMessageTemplate.from_message(message_bytes.replace(b"{", b"{ ", 1)))
+        self.assertIsNone(EpochMessageTemplate.from_message(b"not json"))
+        self.assertIsNone(EpochMessageTemplate.from_message(b'{"Type": "Epoch"}'))
+
+
+if __name__ == '__main__':
+    unittest.main()
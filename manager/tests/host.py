@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the host module."""
+
+import asyncio
+import os
+import tempfile
+from typing import Any, List, Tuple
+
+import aiounittest
+
+from tools.tests.components import MessageGenerator
+
+from manager.checkpoint import load_checkpoint
+from manager.host import SimulationManagerHost, get_simulation_file_name
+
+
+class SharedClient:
+    """Message bus client stand-in that stores the listeners and the sent messages."""
+    def __init__(self):
+        self.listeners: List[Tuple[Any, Any]] = []
+        self.sent_messages: List[Tuple[str, bytes]] = []
+        self.is_closed = False
+
+    def add_listener(self, topic_names: Any, callback: Any):
+        """Stores the listener."""
+        self.listeners.append((topic_names, callback))
+
+    async def send_message(self, topic_name: str, message_bytes: bytes):
+        """Stores the sent message."""
+        self.sent_messages.append((topic_name, message_bytes))
+
+    async def close(self):
+        """Marks the client closed."""
+        self.is_closed = True
+
+
+class TestSimulationManagerHost(aiounittest.AsyncTestCase):
+    """Unit tests for the SimulationManagerHost class."""
+
+    async def test_message_routing(self):
+        """Tests that the status messages are routed to the correct simulation manager."""
+        client = SharedClient()
+        host = SimulationManagerHost(
+            [
+                {"SIMULATION_ID": "2020-01-01T00:00:00.000Z", "SIMULATION_COMPONENTS": "first,second"},
+                {"SIMULATION_ID": "2020-01-02T00:00:00.000Z", "SIMULATION_COMPONENTS": "first,second"},
+                {"SIMULATION_ID": "2020-01-02T00:00:00.000Z", "SIMULATION_COMPONENTS": "duplicate"},
+                {"SIMULATION_COMPONENTS": "missing_id"}
+            ],
+            rabbitmq_client=client)
+
+        # only one listener for all the simulations
+        self.assertEqual(len(client.listeners), 1)
+        self.assertEqual(list(host.managers), ["2020-01-01T00:00:00.000Z", "2020-01-02T00:00:00.000Z"])
+        first_manager, second_manager = host.managers.values()
+
+        for manager in host.managers.values():
+            await manager.start()
+        self.assertFalse(host.is_stopped)
+
+        # the components of the first simulation are ready for the epoch 0
+        for component_name in ["first", "second"]:
+            status_message = MessageGenerator(first_manager.simulation_id, component_name).get_status_message(
+                0, ["manager-1"])
+            await host.general_message_handler(status_message, "Status.Ready")
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(first_manager.epoch_number, 1)
+        self.assertEqual(second_manager.epoch_number, 0)
+
+        for manager in host.managers.values():
+            await manager.stop()
+        self.assertTrue(host.is_stopped)
+        self.assertFalse(client.is_closed)
+        await host.close()
+        self.assertTrue(client.is_closed)
+
+    async def test_host_metrics(self):
+        """Tests that the host exports the metrics of all the simulations to one file."""
+        client = SharedClient()
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            file_name = os.path.join(temporary_directory, "metrics.prom")
+            os.environ["SIMULATION_METRICS_FILE"] = file_name
+            try:
+                host = SimulationManagerHost(
+                    [
+                        {"SIMULATION_ID": "2020-01-01T00:00:00.000Z", "SIMULATION_COMPONENTS": "first",
+                         "SIMULATION_START_TIMEOUT": 0.01},
+                        {"SIMULATION_ID": "2020-01-02T00:00:00.000Z", "SIMULATION_COMPONENTS": "first",
+                         "SIMULATION_START_TIMEOUT": 0.01,
+                         "SIMULATION_METRICS_FILE": os.path.join(temporary_directory, "ignored.prom")}
+                    ],
+                    rabbitmq_client=client)
+            finally:
+                del os.environ["SIMULATION_METRICS_FILE"]
+
+            await host.start()
+            for manager in host.managers.values():
+                await manager.stop()
+            await host.close()
+
+            self.assertEqual(os.listdir(temporary_directory), ["metrics.prom"])
+            with open(file_name, mode="r", encoding="UTF-8") as metrics_file:
+                contents = metrics_file.read()
+            self.assertEqual(contents.count("# TYPE simulation_manager_current_epoch gauge"), 1)
+            for simulation_id in host.managers:
+                self.assertIn('simulation_manager_current_epoch{{simulation_id="{:s}"}} 0'.format(simulation_id),
+                              contents)
+
+    async def test_checkpoint_files(self):
+        """Tests that each hosted simulation gets its own checkpoint file."""
+        self.assertEqual(get_simulation_file_name("/tmp/checkpoint.jsonl", "2020-01-01T00:00:00.000Z"),
+                         "/tmp/checkpoint_2020-01-01T00_00_00.000Z.jsonl")
+
+        client = SharedClient()
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            file_name = os.path.join(temporary_directory, "checkpoint.jsonl")
+            shared_file_name = os.path.join(temporary_directory, "shared.jsonl")
+            os.environ["SIMULATION_CHECKPOINT_FILE"] = file_name
+            try:
+                host = SimulationManagerHost(
+                    [
+                        {"SIMULATION_ID": "first", "SIMULATION_COMPONENTS": "component"},
+                        {"SIMULATION_ID": "second", "SIMULATION_COMPONENTS": "component"},
+                        {"SIMULATION_ID": "third", "SIMULATION_COMPONENTS": "component",
+                         "SIMULATION_CHECKPOINT_FILE": shared_file_name},
+                        {"SIMULATION_ID": "fourth", "SIMULATION_COMPONENTS": "component",
+                         "SIMULATION_CHECKPOINT_FILE": shared_file_name}
+                    ],
+                    rabbitmq_client=client)
+            finally:
+                del os.environ["SIMULATION_CHECKPOINT_FILE"]
+
+            # the simulation with an already used checkpoint file is ignored
+            self.assertEqual(list(host.managers), ["first", "second", "third"])
+            for manager in host.managers.values():
+                await manager.start()
+            for manager in host.managers.values():
+                await manager.stop()
+            await host.close()
+
+            self.assertEqual(sorted(os.listdir(temporary_directory)),
+                             ["checkpoint_first.jsonl", "checkpoint_second.jsonl", "shared.jsonl"])
+
+    async def test_resume(self):
+        """Tests that the hosted simulations are resumed from their own checkpoints without waiting
+           for the components and that the completed simulations are not started again."""
+        simulation_settings = [
+            {"SIMULATION_ID": "first", "SIMULATION_COMPONENTS": "component", "SIMULATION_MAX_EPOCHS": 3},
+            {"SIMULATION_ID": "second", "SIMULATION_COMPONENTS": "component", "SIMULATION_MAX_EPOCHS": 1}
+        ]
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            os.environ["SIMULATION_CHECKPOINT_FILE"] = os.path.join(temporary_directory, "checkpoint.jsonl")
+            try:
+                first_host = SimulationManagerHost(
+                    [dict(simulation_setting, SIMULATION_START_TIMEOUT=0.01)
+                     for simulation_setting in simulation_settings],
+                    rabbitmq_client=SharedClient())
+                second_client = SharedClient()
+                second_host = SimulationManagerHost(
+                    [dict(simulation_setting, SIMULATION_START_TIMEOUT=60.0, SIMULATION_RESUME=True)
+                     for simulation_setting in simulation_settings],
+                    rabbitmq_client=second_client)
+            finally:
+                del os.environ["SIMULATION_CHECKPOINT_FILE"]
+
+            # the first simulation is interrupted during the epoch 2 and the second simulation is completed
+            await first_host.start()
+            for simulation_id, epoch_numbers in [("first", [0, 1]), ("second", [0, 1])]:
+                for epoch_number in epoch_numbers:
+                    status_message = MessageGenerator(simulation_id, "component").get_status_message(
+                        epoch_number, ["manager-{:d}".format(epoch_number + 1)])
+                    await first_host.general_message_handler(status_message, "Status.Ready")
+                    await asyncio.sleep(0.05)
+            for _ in range(100):
+                if first_host.managers["second"].is_stopped:
+                    break
+                await asyncio.sleep(0.01)
+            self.assertTrue(first_host.managers["second"].is_completed)
+            self.assertEqual(first_host.managers["first"].epoch_number, 2)
+            await first_host.managers["first"].stop()
+            await first_host.close()
+
+            # the resumed host would wait for a minute if it waited for the components
+            await asyncio.wait_for(second_host.start(), 5.0)
+            first_manager, second_manager = second_host.managers["first"], second_host.managers["second"]
+            self.assertTrue(first_manager.is_resumed)
+            self.assertFalse(first_manager.is_stopped)
+            self.assertEqual(first_manager.epoch_number, 2)
+            self.assertTrue(second_manager.is_completed)
+            self.assertTrue(second_manager.is_stopped)
+            # only the resumed simulation sent messages
+            self.assertTrue(second_client.sent_messages)
+            for _, message_bytes in second_client.sent_messages:
+                self.assertIn(b'"first"', message_bytes)
+
+            # the checkpoint of the resumed simulation is continued instead of being replaced
+            first_file_name = os.path.join(temporary_directory, "checkpoint_first.jsonl")
+            checkpoint = load_checkpoint(first_file_name)
+            self.assertIsNotNone(checkpoint)
+            self.assertEqual(checkpoint[1]["EpochNumber"], 2)
+
+            await first_manager.stop()
+            await second_host.close()
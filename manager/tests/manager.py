@@ -6,9 +6,28 @@
 
 """Unit tests for the simulation manager module."""
 
+import asyncio
+from typing import Any, Dict, List, Tuple
 import unittest
 
-# from manager.manager import SimulationManager
+import aiounittest
+
+from tools.messages import EpochMessage, MessageGenerator, SimulationStateMessage
+
+from loopback.bus import LoopbackBus, LoopbackClient
+from manager.manager import SimulationManager
+
+
+class TopicRecordingClient(LoopbackClient):
+    """Loopback client that stores the topics of the sent messages."""
+    def __init__(self, bus: LoopbackBus):
+        super().__init__(bus)
+        self.sent_topics: List[str] = []
+
+    async def send_message(self, topic_name: str, message_bytes: bytes):
+        """Stores the topic and publishes the message."""
+        self.sent_topics.append(topic_name)
+        await super().send_message(topic_name, message_bytes)
 
 
 class TestSimulationManager(unittest.TestCase):
@@ -35,5 +54,181 @@ class TestSimulationManager(unittest.TestCase):
         # TODO: implement test_stop for SimulationManager
 
 
+class TestTargetedResends(aiounittest.AsyncTestCase):
+    """Unit tests for the targeted epoch message resends."""
+
+    async def test_last_resend_to_common_topic(self):
+        """Tests that the last resend reaches also a component that does not listen to its own epoch topic."""
+        bus = LoopbackBus()
+        manager_client = TopicRecordingClient(bus)
+        manager = SimulationManager(
+            "sim", "manager", "name", "description", "answering,silent", "2020-01-01T00:00:00.000Z", 3600, 1,
+            0.05, 3, "Epoch", "SimState", "Status.Ready", "Status.Error", rabbitmq_client=manager_client,
+            epoch_resend_mode=SimulationManager.EPOCH_RESEND_TARGETED)
+        manager_client.add_listener(manager.listened_topics, manager.general_message_handler)
+
+        message_generators = {
+            component_name: MessageGenerator("sim", component_name)
+            for component_name in ["answering", "silent"]
+        }
+        component_client = LoopbackClient(bus)
+        received_epoch_messages = 0
+
+        async def send_ready_message(component_name: str, epoch_number: int, triggering_message_id: str):
+            status_message = message_generators[component_name].get_status_ready_message(
+                EpochNumber=epoch_number, TriggeringMessageIds=[triggering_message_id])
+            await component_client.send_message("Status.Ready", status_message.bytes())
+
+        async def component_callback(message_object: Any, message_routing_key: str):
+            nonlocal received_epoch_messages
+            if isinstance(message_object, SimulationStateMessage):
+                if message_object.simulation_state == SimulationManager.SIMULATION_STATE_VALUE_RUNNING:
+                    for component_name in message_generators:
+                        await send_ready_message(component_name, 0, message_object.message_id)
+            elif isinstance(message_object, EpochMessage):
+                received_epoch_messages += 1
+                if received_epoch_messages == 1:
+                    await send_ready_message("answering", 1, message_object.message_id)
+                elif received_epoch_messages > 1:
+                    # the silent component listens only to the common epoch topic
+                    await send_ready_message("silent", 1, message_object.message_id)
+
+        component_client.add_listener(["SimState", "Epoch"], component_callback)
+
+        await manager.start()
+        for _ in range(100):
+            if manager.is_stopped:
+                break
+            await asyncio.sleep(0.05)
+            await bus.join()
+
+        self.assertTrue(manager.is_stopped)
+        self.assertEqual(manager.epoch_number, 2)
+        self.assertEqual(
+            [topic_name for topic_name in manager_client.sent_topics if topic_name.startswith("Epoch")],
+            ["Epoch", "Epoch.silent", "Epoch.silent", "Epoch"])
+        await bus.close()
+
+
+
+class TestEpochLookahead(aiounittest.AsyncTestCase):
+    """Unit tests for the epoch lookahead mode."""
+
+    @staticmethod
+    def create_manager(bus: LoopbackBus, independent_components: str) -> SimulationManager:
+        """Creates a manager for the components "fast" and "slow" with the lookahead of two epochs."""
+        manager_client = LoopbackClient(bus)
+        manager = SimulationManager(
+            "sim", "manager", "name", "description", "fast,slow", "2020-01-01T00:00:00.000Z", 3600, 6,
+            60.0, 1, "Epoch", "SimState", "Status.Ready", "Status.Error", rabbitmq_client=manager_client,
+            epoch_lookahead=2, independent_components=independent_components)
+        manager_client.add_listener(manager.listened_topics, manager.general_message_handler)
+        return manager
+
+    async def test_lookahead_window(self):
+        """Tests that the epochs are started ahead only within the lookahead window and the maximum number of
+           epochs and that they are triggered by the status messages for the latest full epoch."""
+        bus = LoopbackBus()
+        manager = self.create_manager(bus, "fast,slow")
+        self.assertEqual(manager.epoch_lookahead, 2)
+
+        message_generators = {
+            component_name: MessageGenerator("sim", component_name)
+            for component_name in ["fast", "slow"]
+        }
+        component_client = LoopbackClient(bus)
+        epoch_messages: Dict[int, EpochMessage] = {}
+        # the status message ids with (component name, epoch number) as keys
+        status_message_ids: Dict[Tuple[str, int], str] = {}
+
+        async def send_ready_message(component_name: str, epoch_number: int, triggering_message_id: str):
+            status_message = message_generators[component_name].get_status_ready_message(
+                EpochNumber=epoch_number, TriggeringMessageIds=[triggering_message_id])
+            status_message_ids[(component_name, epoch_number)] = status_message.message_id
+            await component_client.send_message("Status.Ready", status_message.bytes())
+
+        async def component_callback(message_object: Any, message_routing_key: str):
+            if isinstance(message_object, SimulationStateMessage):
+                if message_object.simulation_state == SimulationManager.SIMULATION_STATE_VALUE_RUNNING:
+                    for component_name in message_generators:
+                        await send_ready_message(component_name, 0, message_object.message_id)
+            elif isinstance(message_object, EpochMessage):
+                epoch_messages[message_object.epoch_number] = message_object
+                # only the fast component responds immediately
+                await send_ready_message("fast", message_object.epoch_number, message_object.message_id)
+
+        async def wait_for_messages():
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                await bus.join()
+
+        async def release_slow_component(epoch_number: int):
+            await send_ready_message("slow", epoch_number, epoch_messages[epoch_number].message_id)
+            await wait_for_messages()
+
+        def get_triggering_ids(epoch_number: int) -> List[str]:
+            return [status_message_ids[("fast", epoch_number)], status_message_ids[("slow", epoch_number)]]
+
+        component_client.add_listener(["SimState", "Epoch"], component_callback)
+        await manager.start()
+        await wait_for_messages()
+
+        # the epochs 2 and 3 are started before the slow component has responded to the epoch 1
+        self.assertEqual(sorted(epoch_messages), [1, 2, 3])
+        for epoch_number in [1, 2, 3]:
+            self.assertEqual(epoch_messages[epoch_number].triggering_message_ids, get_triggering_ids(0))
+
+        await release_slow_component(1)
+        self.assertEqual(sorted(epoch_messages), [1, 2, 3, 4])
+        self.assertEqual(epoch_messages[4].triggering_message_ids, get_triggering_ids(1))
+
+        await release_slow_component(2)
+        self.assertEqual(sorted(epoch_messages), [1, 2, 3, 4, 5])
+        self.assertEqual(epoch_messages[5].triggering_message_ids, get_triggering_ids(2))
+
+        await release_slow_component(3)
+        self.assertEqual(sorted(epoch_messages), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(epoch_messages[6].triggering_message_ids, get_triggering_ids(3))
+
+        # the window would allow the epoch 7, but the simulation has only 6 epochs
+        await release_slow_component(4)
+        self.assertEqual(sorted(epoch_messages), [1, 2, 3, 4, 5, 6])
+        self.assertFalse(manager.is_stopped)
+
+        await release_slow_component(5)
+        await release_slow_component(6)
+        self.assertTrue(manager.is_stopped)
+        self.assertEqual(sorted(epoch_messages), [1, 2, 3, 4, 5, 6])
+        await bus.close()
+
+    async def test_dependent_component(self):
+        """Tests that the lookahead is disabled if some component has not declared itself independent."""
+        bus = LoopbackBus()
+        manager = self.create_manager(bus, "fast")
+        self.assertEqual(manager.epoch_lookahead, 0)
+
+        component_client = LoopbackClient(bus)
+        epoch_numbers: List[int] = []
+
+        async def component_callback(message_object: Any, message_routing_key: str):
+            if isinstance(message_object, SimulationStateMessage):
+                if message_object.simulation_state == SimulationManager.SIMULATION_STATE_VALUE_RUNNING:
+                    for component_name in ["fast", "slow"]:
+                        status_message = MessageGenerator("sim", component_name).get_status_ready_message(
+                            EpochNumber=0, TriggeringMessageIds=[message_object.message_id])
+                        await component_client.send_message("Status.Ready", status_message.bytes())
+            elif isinstance(message_object, EpochMessage):
+                epoch_numbers.append(message_object.epoch_number)
+
+        component_client.add_listener(["SimState", "Epoch"], component_callback)
+        await manager.start()
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            await bus.join()
+
+        self.assertEqual(epoch_numbers, [1])
+        await manager.stop()
+        await bus.close()
+
 if __name__ == '__main__':
     unittest.main()
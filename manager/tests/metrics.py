@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the metrics module."""
+
+import asyncio
+import os
+import socket
+import tempfile
+
+import aiounittest
+
+from manager.metrics import Counter, Histogram, ManagerMetrics, MetricsCollection, MetricsExporter
+
+
+def get_free_port() -> int:
+    """Returns a free TCP port on the local host."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as test_socket:
+        test_socket.bind(("127.0.0.1", 0))
+        return test_socket.getsockname()[1]
+
+
+class TestMetrics(aiounittest.AsyncTestCase):
+    """Unit tests for the metric classes and the metrics exporter."""
+
+    def test_histogram(self):
+        """Tests that the histogram buckets are rendered cumulatively."""
+        histogram = Histogram("test_seconds", "Test histogram.", buckets=[0.1, 1.0])
+        for value in [0.05, 0.1, 0.5, 5.0]:
+            histogram.observe(value)
+
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 5.65)
+        self.assertEqual(histogram.render({"simulation_id": "sim"}), [
+            "# HELP test_seconds Test histogram.",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{simulation_id="sim",le="0.1"} 2',
+            'test_seconds_bucket{simulation_id="sim",le="1"} 3',
+            'test_seconds_bucket{simulation_id="sim",le="+Inf"} 4',
+            'test_seconds_sum{simulation_id="sim"} ' + repr(histogram.sum),
+            'test_seconds_count{simulation_id="sim"} 4'
+        ])
+
+    def test_counter(self):
+        """Tests the counter rendering."""
+        counter = Counter("test_total", "Test counter.")
+        counter.increase()
+        counter.increase(2)
+        self.assertEqual(counter.render({}), [
+            "# HELP test_total Test counter.",
+            "# TYPE test_total counter",
+            "test_total 3"
+        ])
+
+    def test_metrics_collection(self):
+        """Tests that the metrics of several simulations are rendered with each metric described only once."""
+        first_metrics, second_metrics = ManagerMetrics("first"), ManagerMetrics("second")
+        first_metrics.current_epoch.set(3)
+        second_metrics.current_epoch.set(7)
+        collection = MetricsCollection()
+        collection.add(first_metrics)
+        collection.add(second_metrics)
+
+        lines = collection.render().splitlines()
+        self.assertEqual(lines.count("# TYPE simulation_manager_current_epoch gauge"), 1)
+        current_epoch_index = lines.index("# TYPE simulation_manager_current_epoch gauge")
+        self.assertEqual(lines[current_epoch_index + 1:current_epoch_index + 3], [
+            'simulation_manager_current_epoch{simulation_id="first"} 3',
+            'simulation_manager_current_epoch{simulation_id="second"} 7'
+        ])
+        self.assertEqual(len(lines), len(first_metrics.render().splitlines()) * 2 - 2 * len(first_metrics.metrics))
+
+    async def test_metrics_file(self):
+        """Tests that the exporter writes the metrics file and rewrites it when stopped."""
+        metrics = ManagerMetrics("sim")
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            file_name = os.path.join(temporary_directory, "metrics.prom")
+            exporter = MetricsExporter(metrics, file_name=file_name, interval=60.0)
+            await exporter.start()
+            await asyncio.sleep(0.01)
+            with open(file_name, mode="r", encoding="UTF-8") as metrics_file:
+                self.assertIn('simulation_manager_epoch_resends_total{simulation_id="sim"} 0', metrics_file.read())
+
+            metrics.epoch_resends.increase()
+            metrics.epoch_duration.observe(2.0)
+            await exporter.stop()
+            with open(file_name, mode="r", encoding="UTF-8") as metrics_file:
+                contents = metrics_file.read()
+            self.assertIn('simulation_manager_epoch_resends_total{simulation_id="sim"} 1', contents)
+            self.assertIn('simulation_manager_epoch_duration_seconds_count{simulation_id="sim"} 1', contents)
+            self.assertEqual(os.listdir(temporary_directory), ["metrics.prom"])
+
+    async def test_metrics_server(self):
+        """Tests that the metrics are served over HTTP."""
+        metrics = ManagerMetrics("sim")
+        metrics.current_epoch.set(5)
+        port = get_free_port()
+        exporter = MetricsExporter(metrics, port=port)
+        await exporter.start()
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        await exporter.stop()
+
+        self.assertTrue(response.startswith(b"HTTP/1.1 200 OK\r\n"))
+        self.assertIn(b'simulation_manager_current_epoch{simulation_id="sim"} 5\n', response)
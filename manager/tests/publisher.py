@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the publisher module."""
+
+import asyncio
+import time
+from typing import List, Tuple
+
+import aiounittest
+
+from manager.publisher import PublishPipeline
+
+
+class SlowClient:
+    """Message bus client that takes a given time to confirm each message."""
+    def __init__(self, confirm_delay: float, failing_topic: str = ""):
+        self.confirm_delay = confirm_delay
+        self.failing_topic = failing_topic
+        self.sent_messages: List[Tuple[str, bytes]] = []
+
+    async def send_message(self, topic_name: str, message_bytes: bytes):
+        """Stores the message after a delay. Raises an error for the failing topic."""
+        await asyncio.sleep(self.confirm_delay)
+        if topic_name == self.failing_topic:
+            raise ConnectionError("Failing topic")
+        self.sent_messages.append((topic_name, message_bytes))
+
+
+class TestPublishPipeline(aiounittest.AsyncTestCase):
+    """Unit tests for the PublishPipeline class."""
+
+    async def test_publish_and_drain(self):
+        """Tests that the messages are published in order and in batches and that drain waits for them."""
+        client = SlowClient(confirm_delay=0.001)
+        publisher = PublishPipeline(client, max_batch_size=4)
+        messages = [("Epoch", "message {:d}".format(index).encode()) for index in range(10)]
+
+        self.assertTrue(await publisher.drain(0.1))
+        for topic_name, message_bytes in messages:
+            publisher.publish(topic_name, message_bytes)
+        self.assertEqual(publisher.outstanding_messages, len(messages))
+
+        self.assertTrue(await publisher.drain(1.0))
+        self.assertEqual(publisher.outstanding_messages, 0)
+        self.assertEqual(client.sent_messages, messages)
+        self.assertEqual(publisher.statistics.published_messages, len(messages))
+        self.assertEqual(publisher.statistics.confirmed_batches, 3)
+        self.assertGreater(publisher.statistics.mean_latency, 0.0)
+        self.assertGreater(publisher.statistics.throughput, 0.0)
+        await publisher.close()
+
+    async def test_overlapping_confirms(self):
+        """Tests that the confirmations for the messages in a batch are waited for concurrently."""
+        confirm_delay = 0.2
+        client = SlowClient(confirm_delay=confirm_delay)
+        publisher = PublishPipeline(client, max_batch_size=10)
+        messages = [("Epoch.component_{:d}".format(index), b"epoch") for index in range(10)]
+
+        start_time = time.perf_counter()
+        for topic_name, message_bytes in messages:
+            publisher.publish(topic_name, message_bytes)
+        self.assertTrue(await publisher.drain(5.0))
+        batch_time = time.perf_counter() - start_time
+
+        self.assertEqual(publisher.statistics.confirmed_batches, 1)
+        self.assertEqual(publisher.statistics.published_messages, len(messages))
+        self.assertEqual(sorted(client.sent_messages), sorted(messages))
+        self.assertGreaterEqual(batch_time, confirm_delay)
+        self.assertLess(batch_time, 2 * confirm_delay)
+        await publisher.close()
+
+    async def test_drain_deadline(self):
+        """Tests that drain returns after the deadline when the messages are not confirmed in time."""
+        client = SlowClient(confirm_delay=0.5)
+        publisher = PublishPipeline(client)
+        publisher.publish("SimState", b"stopped")
+
+        self.assertFalse(await publisher.drain(0.05))
+        self.assertEqual(publisher.outstanding_messages, 1)
+        await publisher.close()
+
+        # messages given to a closed pipeline are discarded
+        publisher.publish("SimState", b"stopped")
+        self.assertEqual(publisher.outstanding_messages, 1)
+        self.assertEqual(client.sent_messages, [])
+
+    async def test_failed_messages(self):
+        """Tests that a failed message does not stop the publishing of the other messages."""
+        client = SlowClient(confirm_delay=0.0, failing_topic="Broken")
+        publisher = PublishPipeline(client)
+        for topic_name in ["Epoch", "Broken", "SimState"]:
+            publisher.publish(topic_name, topic_name.encode())
+
+        self.assertTrue(await publisher.drain(1.0))
+        self.assertEqual(client.sent_messages, [("Epoch", b"Epoch"), ("SimState", b"SimState")])
+        self.assertEqual(publisher.statistics.failed_messages, 1)
+        await publisher.close()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the time_advance module and for skipping the idle epochs in the simulation manager."""
+
+import asyncio
+import datetime
+import unittest
+from typing import Any, Dict, List, Tuple
+
+import aiounittest
+
+from tools.datetime_tools import to_iso_format_datetime_string, to_utc_datetime_object
+from tools.messages import MessageGenerator, SimulationStateMessage
+
+from loopback.bus import LoopbackBus, LoopbackClient
+from manager.manager import SimulationManager
+from manager.time_advance import get_epoch_end_time, parse_next_action_time
+
+START_TIME = to_utc_datetime_object("2020-01-01T00:00:00.000Z")
+EPOCH_LENGTH = datetime.timedelta(hours=1)
+
+
+class TestTimeAdvance(unittest.TestCase):
+    """Unit tests for the next action time helper functions."""
+
+    def test_parse_next_action_time(self):
+        """Tests parsing the next action time from the status message descriptions."""
+        for description, expected_time in [
+                ("NextActionTime=2020-01-01T05:00:00.000Z", START_TIME + 5 * EPOCH_LENGTH),
+                ("idle; NextActionTime=2020-01-02T00:30:00Z; other", START_TIME + datetime.timedelta(hours=24.5)),
+                ("", None),
+                (None, None),
+                ("ready", None),
+                ("NextActionTime=tomorrow", None)]:
+            with self.subTest(description=description):
+                self.assertEqual(parse_next_action_time(description), expected_time)
+
+    def test_epoch_end_time(self):
+        """Tests that the epoch end times are aligned to the regular epochs."""
+        for next_action_time, max_end_time, expected_end_time in [
+                (None, None, START_TIME + EPOCH_LENGTH),
+                (START_TIME - EPOCH_LENGTH, None, START_TIME + EPOCH_LENGTH),
+                (START_TIME + datetime.timedelta(minutes=59), None, START_TIME + EPOCH_LENGTH),
+                (START_TIME + EPOCH_LENGTH, None, START_TIME + EPOCH_LENGTH),
+                (START_TIME + datetime.timedelta(hours=1.5), None, START_TIME + EPOCH_LENGTH),
+                (START_TIME + 2 * EPOCH_LENGTH, None, START_TIME + 2 * EPOCH_LENGTH),
+                (START_TIME + datetime.timedelta(hours=10.5), None, START_TIME + 10 * EPOCH_LENGTH),
+                (START_TIME + datetime.timedelta(hours=10.5), START_TIME + 5 * EPOCH_LENGTH,
+                 START_TIME + 5 * EPOCH_LENGTH)]:
+            with self.subTest(next_action_time=next_action_time, max_end_time=max_end_time):
+                self.assertEqual(
+                    get_epoch_end_time(START_TIME, EPOCH_LENGTH, next_action_time, max_end_time), expected_end_time)
+
+
+class TestSkipIdleEpochs(aiounittest.AsyncTestCase):
+    """Tests for skipping the idle epochs in the simulation manager."""
+
+    async def run_simulation(self, action_hours: Dict[str, List[int]]) -> List[Tuple[int, str, str]]:
+        """Runs a simulation with 12 one hour epochs in which the components report the given hours as their next
+           action times. Returns the epoch number, start time and end time for each received epoch message."""
+        bus = LoopbackBus()
+        manager_client = LoopbackClient(bus)
+        manager = SimulationManager(
+            "sim", "manager", "name", "description", ",".join(action_hours), to_iso_format_datetime_string(START_TIME),
+            3600, 12, 60.0, 1, "Epoch", "SimState", "Status.Ready", "Status.Error", rabbitmq_client=manager_client,
+            skip_idle_epochs=True)
+        manager_client.add_listener(manager.listened_topics, manager.general_message_handler)
+
+        message_generators = {
+            component_name: MessageGenerator("sim", component_name)
+            for component_name in action_hours
+        }
+        component_client = LoopbackClient(bus)
+        epochs = []
+
+        async def component_callback(message_object: Any, message_routing_key: str):
+            if isinstance(message_object, SimulationStateMessage):
+                if message_object.simulation_state != SimulationManager.SIMULATION_STATE_VALUE_RUNNING:
+                    return
+                epoch_number = 0
+                end_time = START_TIME
+            else:
+                epoch_number = message_object.epoch_number
+                end_time = to_utc_datetime_object(message_object.end_time)
+                epochs.append((epoch_number, to_iso_format_datetime_string(message_object.start_time),
+                               to_iso_format_datetime_string(end_time)))
+
+            for component_name, message_generator in message_generators.items():
+                next_hours = [
+                    hour
+                    for hour in action_hours[component_name]
+                    if START_TIME + hour * EPOCH_LENGTH >= end_time
+                ]
+                description = "NextActionTime={:s}".format(
+                    to_iso_format_datetime_string(START_TIME + next_hours[0] * EPOCH_LENGTH)) if next_hours else ""
+                status_message = message_generator.get_status_ready_message(
+                    EpochNumber=epoch_number, TriggeringMessageIds=[message_object.message_id], Description=description)
+                await component_client.send_message("Status.Ready", status_message.bytes())
+
+        component_client.add_listener(["SimState", "Epoch"], component_callback)
+        await manager.start()
+        for _ in range(100):
+            if manager.is_stopped:
+                break
+            await asyncio.sleep(0.01)
+        await bus.join()
+        await bus.close()
+
+        self.assertTrue(manager.is_stopped)
+        return epochs
+
+    async def test_skip_idle_epochs(self):
+        """Tests that the idle epochs are merged until the earliest next action time and that the actions
+           happen in regular epochs."""
+        epochs = await self.run_simulation({"first": [3, 9, 20], "second": [5, 20]})
+        self.assertEqual(epochs, [
+            (1, "2020-01-01T00:00:00.000Z", "2020-01-01T03:00:00.000Z"),
+            (2, "2020-01-01T03:00:00.000Z", "2020-01-01T04:00:00.000Z"),
+            (3, "2020-01-01T04:00:00.000Z", "2020-01-01T05:00:00.000Z"),
+            (4, "2020-01-01T05:00:00.000Z", "2020-01-01T06:00:00.000Z"),
+            (5, "2020-01-01T06:00:00.000Z", "2020-01-01T09:00:00.000Z"),
+            (6, "2020-01-01T09:00:00.000Z", "2020-01-01T10:00:00.000Z"),
+            (7, "2020-01-01T10:00:00.000Z", "2020-01-01T12:00:00.000Z")
+        ])
+
+    async def test_missing_next_action_time(self):
+        """Tests that no epochs are skipped when one of the components does not report its next action time."""
+        epochs = await self.run_simulation({"first": [3, 9], "second": list(range(12))})
+        self.assertEqual([epoch_number for epoch_number, _, _ in epochs], list(range(1, 13)))
+
+
+if __name__ == '__main__':
+    unittest.main()
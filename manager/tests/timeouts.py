@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the timeouts module."""
+
+import unittest
+
+from manager.timeouts import AdaptiveEpochTimeout, DecayingHistogram
+
+
+class TestDecayingHistogram(unittest.TestCase):
+    """Unit tests for the DecayingHistogram class."""
+
+    def test_percentiles(self):
+        """Tests the percentile estimates."""
+        histogram = DecayingHistogram(bucket_ratio=1.05)
+        self.assertIsNone(histogram.percentile(50))
+
+        for value in range(1, 101):
+            histogram.record(value / 100)
+        self.assertEqual(histogram.total_count, 100)
+        self.assertAlmostEqual(histogram.percentile(50), 0.5, delta=0.05 * 0.5)
+        self.assertAlmostEqual(histogram.percentile(99), 0.99, delta=0.05 * 0.99)
+        self.assertGreaterEqual(histogram.percentile(100), 1.0)
+
+        # after decaying the old values, the new values dominate the estimates
+        histogram.decay(0.01)
+        for _ in range(100):
+            histogram.record(10.0)
+        self.assertAlmostEqual(histogram.percentile(50), 10.0, delta=0.05 * 10.0)
+
+
+class TestAdaptiveEpochTimeout(unittest.TestCase):
+    """Unit tests for the AdaptiveEpochTimeout class."""
+
+    def test_timeouts(self):
+        """Tests the timeout calculation with floor, ceiling and backoff."""
+        timeout = AdaptiveEpochTimeout(
+            initial_timeout=60.0, min_timeout=1.0, max_timeout=100.0, backoff=2.0, safety_factor=3.0)
+        self.assertEqual(timeout.get_timeout(0), 60.0)
+        self.assertEqual(timeout.get_timeout(1), 100.0)
+
+        for _ in range(10):
+            for ready_time in [0.5, 1.0, 2.0]:
+                timeout.record_ready_time(ready_time)
+            timeout.record_epoch_duration(2.0)
+        self.assertEqual(timeout.epoch_duration_ewma, 2.0)
+        self.assertAlmostEqual(timeout.get_timeout(0), 6.0, delta=0.6)
+        self.assertAlmostEqual(timeout.get_timeout(2), 24.0, delta=2.4)
+        self.assertEqual(timeout.get_timeout(10), 100.0)
+
+        # very fast epochs are limited by the floor value
+        for _ in range(100):
+            timeout.record_ready_time(0.001)
+            timeout.record_epoch_duration(0.001)
+        self.assertLess(timeout.epoch_duration_ewma, 0.01)
+        self.assertEqual(timeout.get_timeout(0), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
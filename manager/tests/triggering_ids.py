@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""Unit tests for the triggering_ids module."""
+
+import json
+import unittest
+
+from manager.triggering_ids import (
+    get_triggering_ids_digest, get_triggering_ids_message, is_digest_id, parse_digest_id, verify_triggering_ids)
+
+
+class TestTriggeringIds(unittest.TestCase):
+    """Unit tests for the compact triggering message ids."""
+
+    def test_digest_id(self):
+        """Tests the creation and the verification of the digest ids."""
+        message_ids = ["component_{:d}-5".format(index) for index in range(10000)]
+        digest_id = get_triggering_ids_digest(message_ids)
+
+        self.assertTrue(digest_id.startswith("sha256:10000:"))
+        self.assertLess(len(digest_id), 100)
+        self.assertTrue(is_digest_id(digest_id))
+        self.assertEqual(parse_digest_id(digest_id), (10000, digest_id.split(":")[-1]))
+        self.assertTrue(verify_triggering_ids(digest_id, message_ids))
+
+        self.assertFalse(verify_triggering_ids(digest_id, message_ids[:-1]))
+        self.assertFalse(verify_triggering_ids(digest_id, list(reversed(message_ids))))
+        self.assertFalse(verify_triggering_ids(digest_id, message_ids[:-1] + ["component_9999-6"]))
+
+        for message_id in ["component-5", "sha256:abc:def", "md5:1:abc", ""]:
+            with self.subTest(message_id=message_id):
+                self.assertFalse(is_digest_id(message_id))
+                self.assertFalse(verify_triggering_ids(message_id, []))
+
+    def test_triggering_ids_message(self):
+        """Tests that the triggering ids message contains the full list of ids."""
+        message_ids = ["first-3", "second-3"]
+        digest_id = get_triggering_ids_digest(message_ids)
+        message_json = json.loads(get_triggering_ids_message("sim", "manager", 3, digest_id, message_ids))
+
+        self.assertEqual(message_json, {
+            "Type": "TriggeringMessageIds",
+            "SimulationId": "sim",
+            "SourceProcessId": "manager",
+            "EpochNumber": 3,
+            "Digest": digest_id,
+            "TriggeringMessageIds": message_ids
+        })
+        self.assertTrue(verify_triggering_ids(message_json["Digest"], message_json["TriggeringMessageIds"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains helper functions for the event-driven time advance in which idle epochs are skipped.
+
+   A component can report in the Description attribute of its ready status message the next simulated time
+   at which it needs to act, e.g. "NextActionTime=2020-01-01T12:00:00.000Z". If every component has reported
+   such a time, the next epoch is extended to cover the idle period up to the earliest reported time.
+   The extended epoch ends at the start of the regular epoch that contains the earliest reported time, so that
+   the action happens in a regular epoch, the epoch boundaries stay aligned with the regular epochs and
+   the simulated time remains continuous.
+"""
+
+import datetime
+import re
+from typing import Optional
+
+from tools.datetime_tools import to_utc_datetime_object
+
+NEXT_ACTION_TIME_KEY = "NextActionTime"
+NEXT_ACTION_TIME_PATTERN = re.compile(NEXT_ACTION_TIME_KEY + r"=([^\s;,]+)")
+
+
+def parse_next_action_time(description: Optional[str]) -> Optional[datetime.datetime]:
+    """Returns the next action time reported in the given status message description.
+       Returns None, if the description does not contain a valid next action time."""
+    if not description:
+        return None
+    time_match = NEXT_ACTION_TIME_PATTERN.search(description)
+    if time_match is None:
+        return None
+    try:
+        return to_utc_datetime_object(time_match.group(1))
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def get_epoch_end_time(start_time: datetime.datetime, epoch_length: datetime.timedelta,
+                       next_action_time: Optional[datetime.datetime],
+                       max_end_time: Optional[datetime.datetime] = None) -> datetime.datetime:
+    """Returns the end time for the epoch starting at start_time.
+       Without next_action_time, the end time is start_time + epoch_length. Otherwise, the epoch ends at the start
+       of the regular epoch that contains next_action_time, or it is a regular epoch, if next_action_time is within
+       the first regular epoch. The end time is limited to max_end_time, if it is given.
+    """
+    epoch_count = 1
+    if next_action_time is not None and next_action_time > start_time:
+        epoch_count = max((next_action_time - start_time) // epoch_length, 1)
+
+    end_time = start_time + epoch_count * epoch_length
+    if max_end_time is not None and end_time > max_end_time > start_time:
+        return max_end_time
+    return end_time
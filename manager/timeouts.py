@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains classes for determining the epoch resend timeouts from the observed epoch durations."""
+
+import bisect
+import math
+from typing import List, Optional
+
+
+class DecayingHistogram:
+    """Histogram with logarithmically spaced buckets for estimating the percentiles of positive values.
+       The counts of the older values can be reduced by calling decay, so that the estimates follow
+       the recent values. Uses a constant amount of memory regardless of the number of recorded values."""
+
+    def __init__(self, min_value: float = 0.001, max_value: float = 3600.0, bucket_ratio: float = 1.1):
+        bucket_count = math.ceil(math.log(max_value / min_value) / math.log(bucket_ratio)) + 1
+        self.__upper_bounds: List[float] = [min_value * bucket_ratio ** index for index in range(bucket_count)]
+        self.__counts: List[float] = [0.0] * (bucket_count + 1)
+        self.__total_count = 0.0
+
+    @property
+    def total_count(self) -> float:
+        """The total (decayed) count of the recorded values."""
+        return self.__total_count
+
+    def record(self, value: float):
+        """Records a new value to the histogram."""
+        self.__counts[bisect.bisect_left(self.__upper_bounds, value)] += 1.0
+        self.__total_count += 1.0
+
+    def decay(self, factor: float):
+        """Multiplies the counts of all the recorded values with the given factor."""
+        self.__counts = [count * factor for count in self.__counts]
+        self.__total_count *= factor
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Returns an estimate for the given percentile (0-100) of the recorded values as the upper bound of
+           the bucket containing the percentile. Returns None, if there are no recorded values."""
+        if self.__total_count <= 0.0:
+            return None
+
+        target_count = self.__total_count * percentile / 100
+        cumulative_count = 0.0
+        for bucket_index, bucket_count in enumerate(self.__counts):
+            cumulative_count += bucket_count
+            if cumulative_count >= target_count and bucket_count > 0.0:
+                return self.__upper_bounds[min(bucket_index, len(self.__upper_bounds) - 1)]
+        return self.__upper_bounds[-1]
+
+
+class AdaptiveEpochTimeout:
+    """Calculates the time to wait for the status messages before resending the epoch message.
+
+       Keeps an exponentially weighted moving average (EWMA) of the epoch durations and a decaying histogram of
+       the times from the start of the epoch to the ready messages from the components. The timeout is
+       the larger of the EWMA and the chosen ready time percentile multiplied by the safety factor and by
+       the backoff factor for each previous resend. The timeout is limited between the given floor and ceiling.
+       Before any epochs have been completed, the initial timeout is used as the base value."""
+
+    def __init__(self, initial_timeout: float, min_timeout: float, max_timeout: float, backoff: float = 2.0,
+                 safety_factor: float = 3.0, percentile: float = 99.0, ewma_weight: float = 0.2,
+                 histogram_decay: float = 0.9):
+        self.__initial_timeout = initial_timeout
+        self.__min_timeout = min_timeout
+        self.__max_timeout = max(max_timeout, min_timeout)
+        self.__backoff = backoff
+        self.__safety_factor = safety_factor
+        self.__percentile = percentile
+        self.__ewma_weight = ewma_weight
+        self.__histogram_decay = histogram_decay
+
+        self.__epoch_duration_ewma: Optional[float] = None
+        self.__ready_times = DecayingHistogram()
+
+    @property
+    def epoch_duration_ewma(self) -> Optional[float]:
+        """The moving average of the epoch durations in seconds, or None if no epochs have been completed."""
+        return self.__epoch_duration_ewma
+
+    @property
+    def ready_time_percentile(self) -> Optional[float]:
+        """The estimate for the chosen percentile of the component ready times in seconds."""
+        return self.__ready_times.percentile(self.__percentile)
+
+    def record_ready_time(self, ready_time: float):
+        """Records the time in seconds from the start of an epoch to a ready message from a component."""
+        self.__ready_times.record(ready_time)
+
+    def record_epoch_duration(self, epoch_duration: float):
+        """Records the time in seconds from the start of an epoch to the ready message from the last component."""
+        if self.__epoch_duration_ewma is None:
+            self.__epoch_duration_ewma = epoch_duration
+        else:
+            self.__epoch_duration_ewma += self.__ewma_weight * (epoch_duration - self.__epoch_duration_ewma)
+        self.__ready_times.decay(self.__histogram_decay)
+
+    def get_timeout(self, resends: int) -> float:
+        """Returns the timeout in seconds for the epoch message when it has been resent the given number of times."""
+        if self.__epoch_duration_ewma is None:
+            base_timeout = self.__initial_timeout
+        else:
+            base_timeout = self.__safety_factor * max(self.__epoch_duration_ewma, self.ready_time_percentile or 0.0)
+
+        timeout = base_timeout * self.__backoff ** resends
+        return min(max(timeout, self.__min_timeout), self.__max_timeout)
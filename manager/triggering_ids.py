@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Copyright 2021 Tampere University and VTT Technical Research Centre of Finland
+# This software was developed as a part of the ProCemPlus project: https://www.senecc.fi/projects/procemplus
+# This source code is licensed under the MIT license. See LICENSE in the repository root directory.
+# Author(s): Ville Heikkilä <ville.heikkila@tuni.fi>
+
+"""This module contains helper functions for the compact representation of the triggering message ids.
+
+   In the compact representation, the TriggeringMessageIds attribute of an epoch message contains only
+   a single digest id of the form "sha256:<number of ids>:<hex digest>". The full list of ids is published
+   separately once for each epoch as a JSON object with the following attributes:
+   Type ("TriggeringMessageIds"), SimulationId, SourceProcessId, EpochNumber, Digest and TriggeringMessageIds.
+   A consumer can verify the received list against the digest id with the function verify_triggering_ids.
+"""
+
+import hashlib
+import json
+from typing import List, Optional, Tuple
+
+DIGEST_ID_PREFIX = "sha256"
+DIGEST_ID_SEPARATOR = ":"
+TRIGGERING_IDS_MESSAGE_TYPE = "TriggeringMessageIds"
+
+
+def get_triggering_ids_digest(message_ids: List[str]) -> str:
+    """Returns the digest id for the given list of message ids. The order of the ids affects the digest."""
+    digest = hashlib.sha256("\n".join(message_ids).encode("UTF-8")).hexdigest()
+    return DIGEST_ID_SEPARATOR.join([DIGEST_ID_PREFIX, str(len(message_ids)), digest])
+
+
+def parse_digest_id(message_id: str) -> Optional[Tuple[int, str]]:
+    """Returns the number of message ids and the hex digest from the given digest id.
+       Returns None, if the given id is not a digest id."""
+    id_parts = message_id.split(DIGEST_ID_SEPARATOR)
+    if len(id_parts) != 3 or id_parts[0] != DIGEST_ID_PREFIX or not id_parts[1].isdigit():
+        return None
+    return int(id_parts[1]), id_parts[2]
+
+
+def is_digest_id(message_id: str) -> bool:
+    """Returns True, if the given message id is a digest id for a list of triggering message ids."""
+    return parse_digest_id(message_id) is not None
+
+
+def verify_triggering_ids(digest_id: str, message_ids: List[str]) -> bool:
+    """Returns True, if the given list of message ids corresponds to the given digest id."""
+    parsed_digest_id = parse_digest_id(digest_id)
+    if parsed_digest_id is None or parsed_digest_id[0] != len(message_ids):
+        return False
+    return get_triggering_ids_digest(message_ids) == digest_id
+
+
+def get_triggering_ids_message(simulation_id: str, source_process_id: str, epoch_number: int,
+                               digest_id: str, message_ids: List[str]) -> bytes:
+    """Returns the message containing the full list of triggering message ids for an epoch in bytes format."""
+    return json.dumps({
+        "Type": TRIGGERING_IDS_MESSAGE_TYPE,
+        "SimulationId": simulation_id,
+        "SourceProcessId": source_process_id,
+        "EpochNumber": epoch_number,
+        "Digest": digest_id,
+        "TriggeringMessageIds": message_ids
+    }).encode("UTF-8")